@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+Controller-side action plugin for declarative Cribl modules.
+
+Cribl modules run against localhost and only talk to the Cribl API, so
+shipping them through AnsiballZ (zip build, temp-file copy and a new Python
+interpreter per task) costs far more than the API calls themselves.  This
+plugin imports the module on the controller and calls its run_module()
+in-process, reusing one CriblAPIClient (connection pool and token) per
+credentials for every task and loop item handled by the worker process.
+
+Declarative modules are routed here by C(plugin_routing) in meta/runtime.yml.
+Tasks that do not use a local connection, run asynchronously, target a
+module without run_module(), or whose no_log values cannot be collected are
+executed the usual way.
+"""
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import importlib
+import json
+
+from ansible.module_utils.basic import remove_values
+from ansible.module_utils.common.collections import is_iterable
+from ansible.plugins.action import ActionBase
+
+try:
+    from ansible.module_utils.common.arg_spec import ArgumentSpecValidator
+except ImportError:
+    # ansible < 2.11: modules are executed remotely
+    ArgumentSpecValidator = None
+
+
+# Clients shared between tasks, keyed by their connection settings
+_CLIENTS = {}
+
+# Connection options used to build (and key) shared clients
+CLIENT_OPTIONS = ('session', 'base_url', 'token', 'validate_certs', 'timeout')
+
+# AnsibleModule keyword arguments understood by ArgumentSpecValidator
+VALIDATOR_OPTIONS = ('mutually_exclusive', 'required_together', 'required_one_of',
+                     'required_if', 'required_by')
+
+
+class ModuleExit(BaseException):
+    """Raised by ControllerModule.exit_json/fail_json (like SystemExit in AnsibleModule)."""
+
+    def __init__(self, result):
+        super(ModuleExit, self).__init__(result.get('msg'))
+        self.result = result
+
+
+class ControllerModule:
+    """The subset of AnsibleModule used by declarative modules, running on the controller."""
+
+    def __init__(self, params, check_mode=False, diff=False, no_log_values=None):
+        self.params = params
+        self.check_mode = check_mode
+        self._diff = diff
+        self.no_log_values = no_log_values or set()
+        self.warnings = []
+
+    def warn(self, warning):
+        self.warnings.append(warning)
+
+    def exit_json(self, **kwargs):
+        kwargs.setdefault('changed', False)
+        self._exit(kwargs)
+
+    def fail_json(self, msg=None, **kwargs):
+        kwargs['failed'] = True
+        kwargs['msg'] = msg
+        self._exit(kwargs)
+
+    def _exit(self, result):
+        if self.warnings:
+            result['warnings'] = self.warnings
+        raise ModuleExit(remove_values(result, self.no_log_values))
+
+
+def _no_log_strings(value):
+    """Yield the strings to redact for the value of a no_log option."""
+    if isinstance(value, (bool, type(None))):
+        return
+    if isinstance(value, (str, bytes)):
+        if value:
+            yield value.decode('utf-8', 'replace') if isinstance(value, bytes) else value
+    elif isinstance(value, (int, float)):
+        yield str(value)
+    elif isinstance(value, dict):
+        for item in value.values():
+            for string in _no_log_strings(item):
+                yield string
+    elif is_iterable(value):
+        for item in value:
+            for string in _no_log_strings(item):
+                yield string
+    else:
+        raise TypeError(f'Cannot redact a value of type {type(value).__name__}')
+
+
+def list_no_log_values(argument_spec, params):
+    """
+    Collect the values of no_log options, including suboptions, to redact from results.
+
+    Returns:
+        set: Strings to redact
+
+    Raises:
+        TypeError: If a no_log value cannot be turned into strings to redact
+    """
+    values = set()
+    for name, spec in argument_spec.items():
+        value = params.get(name)
+        if value is None:
+            continue
+        if spec.get('no_log'):
+            values.update(_no_log_strings(value))
+        if spec.get('options'):
+            for item in value if isinstance(value, list) else [value]:
+                if isinstance(item, dict):
+                    values.update(list_no_log_values(spec['options'], item))
+    return values
+
+
+def validate_module_args(args, module_kwargs):
+    """
+    Validate task arguments against a module's AnsibleModule keyword arguments.
+
+    Returns:
+        tuple: (validated parameters, no_log values, list of error messages)
+
+    Raises:
+        TypeError: If the no_log values cannot be collected
+    """
+    validator = ArgumentSpecValidator(
+        module_kwargs['argument_spec'],
+        **dict((k, module_kwargs[k]) for k in VALIDATOR_OPTIONS if k in module_kwargs)
+    )
+    result = validator.validate(args)
+    params = result.validated_parameters
+    # Validated parameters include values set by fallbacks (e.g. environment variables)
+    no_log_values = list_no_log_values(module_kwargs['argument_spec'], params)
+    return params, no_log_values, result.error_messages
+
+
+def shared_client(module, params):
+    """Return the CriblAPIClient for the given connection settings, creating it once."""
+    key = json.dumps([params.get(option) for option in CLIENT_OPTIONS], sort_keys=True, default=str)
+    client = _CLIENTS.get(key)
+    if client is None:
+        if params.get('session'):
+            client = module.CriblAPIClient(session=params['session'])
+        else:
+            client = module.CriblAPIClient(
+                base_url=params.get('base_url'),
+                token=params.get('token'),
+                validate_certs=params['validate_certs'],
+                timeout=params['timeout']
+            )
+        _CLIENTS[key] = client
+    return client
+
+
+class ActionModule(ActionBase):
+    """Run declarative Cribl modules in the controller process."""
+
+    _supports_check_mode = True
+    _supports_async = True
+
+    def _load_module(self):
+        """Import the task's module, or return None if it cannot run in-process."""
+        if ArgumentSpecValidator is None or self._task.async_val:
+            return None
+        if getattr(self._connection, 'transport', None) != 'local':
+            return None
+
+        name = getattr(self._task, 'resolved_action', None) or self._task.action
+        parts = name.split('.')
+        if len(parts) != 3:
+            return None
+        try:
+            module = importlib.import_module(
+                f'ansible_collections.{parts[0]}.{parts[1]}.plugins.modules.{parts[2]}')
+        except ImportError:
+            return None
+        if not hasattr(module, 'run_module') or not hasattr(module, 'module_args'):
+            return None
+        return module
+
+    def run(self, tmp=None, task_vars=None):
+        result = super(ActionModule, self).run(tmp, task_vars)
+        del tmp  # tmp no longer has any effect
+
+        module = self._load_module()
+        if module is not None:
+            try:
+                params, no_log_values, errors = validate_module_args(self._task.args, module.module_args())
+            except Exception:
+                # Never run in-process without every value to redact; AnsibleModule reports the error
+                module = None
+        if module is None:
+            result.update(self._execute_module(task_vars=task_vars, wrap_async=self._task.async_val))
+            return result
+
+        if errors:
+            result.update(failed=True, msg='; '.join(errors))
+            return result
+
+        controller_module = ControllerModule(params, check_mode=self._play_context.check_mode,
+                                             diff=self._play_context.diff, no_log_values=no_log_values)
+        try:
+            module.run_module(controller_module, client=shared_client(module, params))
+            module_result = {'changed': False}
+        except ModuleExit as e:
+            module_result = e.result
+        except Exception as e:
+            module_result = {'failed': True, 'msg': f'Unexpected error: {str(e)}'}
+
+        result.update(module_result)
+        return result
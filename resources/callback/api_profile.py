@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+---
+name: api_profile
+type: aggregate
+short_description: Profile Cribl API calls per task and per endpoint
+description:
+    - Collects the metrics of every Cribl API request made by the play's modules and plugins:
+      request count, bytes sent and received, latency percentiles, logins and 401 token refreshes.
+    - Prints the slowest endpoints and the busiest tasks at the end of the play, and can write
+      the full report as JSON.
+    - The callback points the C(CRIBL_API_PROFILE) environment variable at a spool file that
+      the Cribl API client appends one line per request to. Requests are attributed to the task
+      running when they were made, so per-task figures assume the C(linear) strategy.
+version_added: "1.0.0"
+author:
+    - Cribl Ansible Collection Contributors
+requirements:
+    - enable in configuration with C(callbacks_enabled = cribl.core.api_profile)
+options:
+    top:
+        description:
+            - Number of endpoints and tasks listed in the summary.
+        type: int
+        default: 10
+        env:
+            - name: CRIBL_API_PROFILE_TOP
+        ini:
+            - section: callback_cribl_api_profile
+              key: top
+    output_file:
+        description:
+            - Path of a JSON file the full report is written to.
+        type: path
+        env:
+            - name: CRIBL_API_PROFILE_OUTPUT
+        ini:
+            - section: callback_cribl_api_profile
+              key: output_file
+'''
+
+import bisect
+import json
+import math
+import os
+import re
+import tempfile
+import time
+
+from ansible.plugins.callback import CallbackBase
+
+
+def percentile(values, pct):
+    """Return the nearest-rank percentile of a list of numbers."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, int(math.ceil(pct / 100.0 * len(ordered))))
+    return ordered[rank - 1]
+
+
+def normalize_endpoint(endpoint):
+    """Collapse the worker group of an endpoint so groups aggregate together."""
+    return re.sub(r'^/m/[^/]+', '/m/{group}', endpoint or '')
+
+
+def read_records(path):
+    """Read the request records of a spool file, skipping partial lines."""
+    records = []
+    try:
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+    except OSError:
+        pass
+    return records
+
+
+def summarize(records):
+    """
+    Aggregate request records.
+
+    Returns:
+        dict: Request count, bytes, latency percentiles (ms), logins, 401 refreshes and errors
+    """
+    requests = [r for r in records if r.get('method') != 'LOGIN']
+    latencies = [r.get('latency', 0) * 1000.0 for r in requests]
+    return {
+        'requests': len(requests),
+        'bytes_out': sum(r.get('bytes_out', 0) for r in requests),
+        'bytes_in': sum(r.get('bytes_in', 0) for r in requests),
+        'total_ms': round(sum(latencies), 1),
+        'p50_ms': round(percentile(latencies, 50), 1),
+        'p95_ms': round(percentile(latencies, 95), 1),
+        'p99_ms': round(percentile(latencies, 99), 1),
+        'logins': sum(1 for r in records if r.get('method') == 'LOGIN'),
+        'auth_retries': sum(1 for r in requests if r.get('auth_retry')),
+        'errors': sum(1 for r in requests if (r.get('status') or 0) >= 400),
+    }
+
+
+def build_report(records, tasks):
+    """
+    Aggregate records per endpoint and per task.
+
+    Args:
+        records: Request records from the spool file
+        tasks: List of (start time, task name) in start order
+
+    Returns:
+        dict: Report with total, endpoints and tasks keys
+    """
+    starts = [start for start, _ in tasks]
+    by_endpoint = {}
+    by_task = {}
+    for record in records:
+        if record.get('method') != 'LOGIN':
+            key = f"{record.get('method')} {normalize_endpoint(record.get('endpoint'))}"
+            by_endpoint.setdefault(key, []).append(record)
+        index = bisect.bisect_right(starts, record.get('time', 0)) - 1
+        by_task.setdefault(index, []).append(record)
+
+    endpoints = [dict(summarize(items), endpoint=key) for key, items in by_endpoint.items()]
+    endpoints.sort(key=lambda e: (e['p95_ms'], e['total_ms']), reverse=True)
+    task_report = []
+    for index in sorted(by_task):
+        name = tasks[index][1] if index >= 0 else '(before first task)'
+        task_report.append(dict(summarize(by_task[index]), task=name))
+    return {'total': summarize(records), 'endpoints': endpoints, 'tasks': task_report}
+
+
+class CallbackModule(CallbackBase):
+    """Aggregate Cribl API metrics per task and per endpoint."""
+
+    CALLBACK_VERSION = 2.0
+    CALLBACK_TYPE = 'aggregate'
+    CALLBACK_NAME = 'cribl.core.api_profile'
+    CALLBACK_NEEDS_ENABLED = True
+
+    def __init__(self, display=None):
+        super(CallbackModule, self).__init__(display=display)
+        self._tasks = []
+        # Workers and modules inherit the environment of the controller process
+        self._owns_spool = 'CRIBL_API_PROFILE' not in os.environ
+        if self._owns_spool:
+            fd, path = tempfile.mkstemp(prefix='cribl-api-profile-', suffix='.jsonl')
+            os.close(fd)
+            os.environ['CRIBL_API_PROFILE'] = path
+        self._spool = os.environ['CRIBL_API_PROFILE']
+
+    def _task_start(self, task):
+        self._tasks.append((time.time(), task.get_name()))
+
+    def v2_playbook_on_task_start(self, task, is_conditional):
+        self._task_start(task)
+
+    def v2_playbook_on_handler_task_start(self, task):
+        self._task_start(task)
+
+    def v2_playbook_on_stats(self, stats):
+        records = read_records(self._spool)
+        if self._owns_spool:
+            try:
+                os.unlink(self._spool)
+            except OSError:
+                pass
+        if not records:
+            return
+
+        report = build_report(records, self._tasks)
+        top = self.get_option('top')
+        total = report['total']
+
+        self._display.banner('CRIBL API PROFILE')
+        self._display.display(
+            f"{total['requests']} requests, {total['total_ms'] / 1000.0:.2f}s, "
+            f"{total['bytes_out']} bytes out, {total['bytes_in']} bytes in, "
+            f"{total['logins']} logins, {total['auth_retries']} 401 refreshes, {total['errors']} errors")
+
+        self._display.display('\nSlowest endpoints (ms):')
+        self._display.display(f"{'count':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'401':>5}  endpoint")
+        for entry in report['endpoints'][:top]:
+            self._display.display(
+                f"{entry['requests']:>7} {entry['p50_ms']:>8} {entry['p95_ms']:>8} {entry['p99_ms']:>8} "
+                f"{entry['auth_retries']:>5}  {entry['endpoint']}")
+
+        self._display.display('\nBusiest tasks:')
+        self._display.display(f"{'requests':>8} {'time ms':>10} {'logins':>6}  task")
+        for entry in sorted(report['tasks'], key=lambda t: t['total_ms'], reverse=True)[:top]:
+            self._display.display(
+                f"{entry['requests']:>8} {entry['total_ms']:>10} {entry['logins']:>6}  {entry['task']}")
+
+        output_file = self.get_option('output_file')
+        if output_file:
+            with open(output_file, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
@@ -0,0 +1,300 @@
+# -*- coding: utf-8 -*-
+
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+---
+name: cribl
+short_description: Cribl worker groups, Edge fleets and worker nodes inventory source
+description:
+    - Builds an inventory of Cribl worker nodes (and Edge nodes) from the leader.
+    - Worker groups and Edge fleets are listed from C(/master/groups) and become inventory groups;
+      worker nodes are listed from C(/master/workers), page by page and concurrently per group.
+    - Group tags become inventory groups, and C(keyed_groups), C(groups) and C(compose) can build more.
+    - Discovery results can be cached with any cache plugin, so large estates are not listed again on
+      every run.
+    - The inventory file name must end with C(cribl.yml) or C(cribl.yaml).
+version_added: "1.0.0"
+author:
+    - Cribl Ansible Collection Contributors
+extends_documentation_fragment:
+    - constructed
+    - inventory_cache
+options:
+    plugin:
+        description: Token that ensures this is a source file for the plugin.
+        required: true
+        choices: ['cribl.core.cribl']
+    base_url:
+        description:
+            - Base URL of the Cribl leader.
+        type: str
+        required: true
+        env:
+            - name: CRIBL_URL
+    username:
+        description:
+            - Username for password authentication.
+        type: str
+        env:
+            - name: CRIBL_USERNAME
+    password:
+        description:
+            - Password for password authentication.
+        type: str
+        env:
+            - name: CRIBL_PASSWORD
+    client_id:
+        description:
+            - OAuth2 client ID for Cribl Cloud.
+        type: str
+        env:
+            - name: CRIBL_CLIENT_ID
+    client_secret:
+        description:
+            - OAuth2 client secret for Cribl Cloud.
+        type: str
+        env:
+            - name: CRIBL_CLIENT_SECRET
+    token:
+        description:
+            - Bearer token, used instead of logging in.
+        type: str
+        env:
+            - name: CRIBL_TOKEN
+    validate_certs:
+        description:
+            - Whether to validate SSL certificates.
+        type: bool
+        default: false
+    timeout:
+        description:
+            - Timeout for API requests in seconds.
+        type: int
+        default: 30
+    worker_groups:
+        description:
+            - Worker group and fleet IDs to include. All groups are included when omitted.
+        type: list
+        elements: str
+    include_fleets:
+        description:
+            - Include Edge fleets and their nodes.
+        type: bool
+        default: true
+    include_workers:
+        description:
+            - Add worker nodes as hosts. When disabled, only empty groups with group variables are created.
+        type: bool
+        default: true
+    page_size:
+        description:
+            - Number of worker nodes requested per page.
+        type: int
+        default: 500
+    parallelism:
+        description:
+            - Maximum number of groups whose worker nodes are listed concurrently.
+        type: int
+        default: 8
+requirements:
+    - python >= 3.6
+    - requests
+'''
+
+EXAMPLES = r'''
+# cribl.yml
+plugin: cribl.core.cribl
+base_url: https://leader.example.com:9000
+username: admin
+password: "{{ lookup('env', 'CRIBL_PASSWORD') }}"
+include_fleets: true
+cache: true
+cache_plugin: ansible.builtin.jsonfile
+cache_connection: ~/.cache/cribl_inventory
+cache_timeout: 900
+keyed_groups:
+  - key: cribl_status
+    prefix: cribl_status
+compose:
+  ansible_host: cribl_info.hostname
+'''
+
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from ansible.errors import AnsibleError
+from ansible.plugins.inventory import BaseInventoryPlugin, Cacheable, Constructable
+
+from ansible_collections.cribl.core.plugins.module_utils.cribl_api import (
+    CriblAPIClient,
+    CriblAPIError
+)
+
+
+def _items(response):
+    """Return the items of a list response."""
+    if isinstance(response, dict):
+        return response.get('items') or []
+    return response or []
+
+
+def _tags(group):
+    """Return the tags of a group, which the API reports as a list or a comma-separated string."""
+    tags = group.get('tags') or []
+    if isinstance(tags, str):
+        tags = tags.split(',')
+    return [tag.strip() for tag in tags if tag and tag.strip()]
+
+
+def list_workers(client, group_id, page_size=500):
+    """
+    List the worker nodes of a group, following the API's limit/offset paging.
+
+    Returns:
+        list: Worker node items
+    """
+    workers = []
+    while True:
+        response = client.get('/master/workers', params={
+            'filterExp': f"group=='{group_id}'",
+            'limit': page_size,
+            'offset': len(workers),
+        })
+        items = _items(response)
+        workers.extend(items)
+        total = response.get('count') if isinstance(response, dict) else None
+        if not items or len(items) < page_size or (total is not None and len(workers) >= total):
+            return workers
+
+
+def discover(client, worker_groups=None, include_fleets=True, include_workers=True,
+             page_size=500, parallelism=8):
+    """
+    List groups and fleets and, concurrently per group, their worker nodes.
+
+    Returns:
+        dict: Cacheable discovery result with groups and workers (by group ID) keys
+    """
+    groups = []
+    for group in _items(client.get('/master/groups')):
+        if not isinstance(group, dict) or not group.get('id'):
+            continue
+        if group.get('isFleet') and not include_fleets:
+            continue
+        if worker_groups and group['id'] not in worker_groups:
+            continue
+        groups.append(group)
+
+    workers = {}
+    if include_workers and groups:
+        if hasattr(client, 'set_pool_size'):
+            client.set_pool_size(max(1, parallelism))
+        with ThreadPoolExecutor(max_workers=max(1, min(parallelism, len(groups)))) as executor:
+            ids = [group['id'] for group in groups]
+            for group_id, items in zip(ids, executor.map(lambda g: list_workers(client, g, page_size), ids)):
+                workers[group_id] = items
+
+    return {'groups': groups, 'workers': workers}
+
+
+class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
+    """Cribl worker groups, Edge fleets and worker nodes inventory."""
+
+    NAME = 'cribl.core.cribl'
+
+    def verify_file(self, path):
+        """Accept only inventory files named like *cribl.yml / *cribl.yaml."""
+        if super(InventoryModule, self).verify_file(path):
+            return path.endswith(('cribl.yml', 'cribl.yaml'))
+        return False
+
+    def parse(self, inventory, loader, path, cache=True):
+        super(InventoryModule, self).parse(inventory, loader, path, cache)
+        self._read_config_data(path)
+
+        cache_key = self.get_cache_key(path)
+        user_cache_setting = self.get_option('cache')
+        attempt_to_read_cache = user_cache_setting and cache
+        cache_needs_update = user_cache_setting and not cache
+
+        results = None
+        if attempt_to_read_cache:
+            try:
+                results = self._cache[cache_key]
+            except KeyError:
+                cache_needs_update = True
+
+        if results is None:
+            try:
+                results = discover(
+                    self._client(),
+                    worker_groups=self.get_option('worker_groups'),
+                    include_fleets=self.get_option('include_fleets'),
+                    include_workers=self.get_option('include_workers'),
+                    page_size=self.get_option('page_size'),
+                    parallelism=self.get_option('parallelism'),
+                )
+            except CriblAPIError as e:
+                raise AnsibleError(f'Failed to discover Cribl inventory: {str(e)}')
+
+        if cache_needs_update:
+            self._cache[cache_key] = results
+
+        self._populate(results)
+
+    def _client(self):
+        """Create the API client from the plugin options."""
+        return CriblAPIClient(
+            base_url=self.get_option('base_url'),
+            username=self.get_option('username'),
+            password=self.get_option('password'),
+            client_id=self.get_option('client_id'),
+            client_secret=self.get_option('client_secret'),
+            token=self.get_option('token'),
+            validate_certs=self.get_option('validate_certs'),
+            timeout=self.get_option('timeout'),
+        )
+
+    def _group_name(self, prefix, name):
+        return self._sanitize_group_name(f"{prefix}_{re.sub(r'[^A-Za-z0-9_]', '_', name)}")
+
+    def _populate(self, results):
+        """Add groups and hosts from a discovery result."""
+        strict = self.get_option('strict')
+
+        for group in results['groups']:
+            kind = 'cribl_fleet' if group.get('isFleet') else 'cribl_group'
+            group_name = self.inventory.add_group(self._group_name(kind, group['id']))
+            self.inventory.add_child(self.inventory.add_group(f'{kind}s'), group_name)
+            self.inventory.set_variable(group_name, 'cribl_group_id', group['id'])
+            self.inventory.set_variable(group_name, 'cribl_is_fleet', bool(group.get('isFleet')))
+            self.inventory.set_variable(group_name, 'cribl_config_version', group.get('configVersion'))
+            tag_groups = [self.inventory.add_group(self._group_name('cribl_tag', tag)) for tag in _tags(group)]
+
+            for worker in results['workers'].get(group['id'], []):
+                info = worker.get('info') or {}
+                host = info.get('hostname') or worker.get('id')
+                if not host:
+                    continue
+                self.inventory.add_host(host, group=group_name)
+                for tag_group in tag_groups:
+                    self.inventory.add_child(tag_group, host)
+
+                hostvars = {
+                    'cribl_worker_id': worker.get('id'),
+                    'cribl_worker_group': group['id'],
+                    'cribl_is_fleet': bool(group.get('isFleet')),
+                    'cribl_status': worker.get('status'),
+                    'cribl_last_seen': worker.get('lastMsgTime'),
+                    'cribl_info': info,
+                }
+                for key, value in hostvars.items():
+                    self.inventory.set_variable(host, key, value)
+
+                self._set_composite_vars(self.get_option('compose'), hostvars, host, strict=strict)
+                self._add_host_to_composed_groups(self.get_option('groups'), hostvars, host, strict=strict)
+                self._add_host_to_keyed_groups(self.get_option('keyed_groups'), hostvars, host, strict=strict)
@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+---
+name: cribl_config
+short_description: Read Cribl configuration from the leader
+description:
+    - Returns the current configuration of Cribl resources, for use in templates and conditionals.
+    - Reads go through one API client per set of credentials, shared by every lookup in the process.
+    - Results are memoized in memory by the process templating the task, so a resource is read
+      once per task (and loop) however often the task looks it up. Ansible templates each task in
+      a new worker process; set C(cache_ttl) to also share results between tasks and runs through
+      an on-disk cache.
+    - With C(query), only the selected part of each resource is returned and kept in the cache.
+version_added: "1.0.0"
+author:
+    - Cribl Ansible Collection Contributors
+options:
+    _terms:
+        description:
+            - Resources to read, each as C(<type>/<id>) (for example C(output/s3)), C(<type>) for all
+              resources of a type, or an API endpoint starting with C(/).
+            - Types are the declarative resource types (see M(cribl.core.config_apply)).
+        type: list
+        elements: str
+        required: true
+    session:
+        description:
+            - Existing session from the auth_session module.
+        type: dict
+    base_url:
+        description:
+            - Base URL of the Cribl leader.
+        type: str
+        env:
+            - name: CRIBL_URL
+    username:
+        description:
+            - Username for password authentication.
+        type: str
+        env:
+            - name: CRIBL_USERNAME
+    password:
+        description:
+            - Password for password authentication.
+        type: str
+        env:
+            - name: CRIBL_PASSWORD
+    token:
+        description:
+            - Bearer token, used instead of logging in.
+        type: str
+        env:
+            - name: CRIBL_TOKEN
+    validate_certs:
+        description:
+            - Whether to validate SSL certificates.
+        type: bool
+        default: false
+    timeout:
+        description:
+            - Timeout for API requests in seconds.
+        type: int
+        default: 30
+    worker_group:
+        description:
+            - Worker Group ID the resources belong to.
+        type: str
+    query:
+        description:
+            - JMESPath expression applied to each resource; only its result is returned and cached.
+            - Requires the jmespath Python library.
+        type: str
+    default:
+        description:
+            - Value returned for resources that do not exist.
+        type: raw
+    cache_ttl:
+        description:
+            - Seconds results are cached on disk in C(cache_dir), shared between tasks and runs.
+            - C(0) keeps results in memory only, for the current task.
+        type: int
+        default: 0
+    cache_dir:
+        description:
+            - Directory of the on-disk cache.
+        type: path
+        default: ~/.cache/cribl_config
+        env:
+            - name: CRIBL_LOOKUP_CACHE_DIR
+requirements:
+    - python >= 3.6
+    - requests
+    - jmespath (for C(query))
+'''
+
+EXAMPLES = r'''
+- name: Use an output's host in a template
+  ansible.builtin.debug:
+    msg: "{{ lookup('cribl.core.cribl_config', 'output/splunk', worker_group='default',
+             session=cribl_session.session, query='host') }}"
+
+- name: Names of all pipelines, cached for five minutes
+  ansible.builtin.set_fact:
+    pipelines: "{{ query('cribl.core.cribl_config', 'pipeline', worker_group='default',
+                         query='[].id', cache_ttl=300) | first }}"
+
+- name: Config version of a worker group
+  ansible.builtin.set_fact:
+    version: "{{ lookup('cribl.core.cribl_config', 'worker_group/default', query='configVersion') }}"
+'''
+
+RETURN = r'''
+_raw:
+    description: One entry per term, the resource (or list of resources) or the query result
+    type: list
+    elements: raw
+'''
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+from ansible.errors import AnsibleError
+from ansible.plugins.lookup import LookupBase
+
+from ansible_collections.cribl.core.plugins.module_utils.cribl_api import (
+    CriblAPIClient,
+    CriblAPIError
+)
+from ansible_collections.cribl.core.plugins.module_utils.cribl_declarative import (
+    scoped_endpoint
+)
+from ansible_collections.cribl.core.plugins.module_utils.cribl_resource_types import (
+    RESOURCE_TYPES
+)
+from ansible_collections.cribl.core.plugins.module_utils.cribl_state import (
+    read_json,
+    write_json_atomic
+)
+
+try:
+    import jmespath
+    HAS_JMESPATH = True
+except ImportError:
+    HAS_JMESPATH = False
+
+
+# Connection options used to build (and key) shared clients
+CLIENT_OPTIONS = ('session', 'base_url', 'username', 'password', 'token', 'validate_certs', 'timeout')
+
+# Clients and results shared by every lookup in the process
+_CLIENTS = {}
+_RESULTS = {}
+_LOCK = threading.Lock()
+
+# Marks a missing resource in the caches (None may be a query result)
+MISSING = {'__cribl_missing__': True}
+
+
+def resolve_term(term, worker_group=None):
+    """
+    Resolve a lookup term to an API endpoint.
+
+    Returns:
+        tuple: (endpoint, whether the term names a single resource)
+    """
+    if term.startswith('/'):
+        return scoped_endpoint(term, worker_group), True
+    resource_type, _, resource_id = term.partition('/')
+    if resource_type not in RESOURCE_TYPES:
+        raise AnsibleError(f"Unknown Cribl resource type '{resource_type}' in '{term}'")
+    endpoint = scoped_endpoint(RESOURCE_TYPES[resource_type]['endpoint'], worker_group)
+    if resource_id:
+        return f"{endpoint}/{resource_id}", True
+    return endpoint, False
+
+
+def unwrap(response, single):
+    """Return the resource (or list of resources) of a response, or MISSING."""
+    if response is None:
+        return MISSING
+    if isinstance(response, dict) and 'items' in response:
+        items = response.get('items') or []
+        if single:
+            return items[0] if items else MISSING
+        return items
+    return response
+
+
+class LookupModule(LookupBase):
+
+    def run(self, terms, variables=None, **kwargs):
+        self.set_options(var_options=variables, direct=kwargs)
+
+        query = self.get_option('query')
+        if query and not HAS_JMESPATH:
+            raise AnsibleError('The query option of cribl.core.cribl_config requires the jmespath Python library')
+
+        params = dict((option, self.get_option(option)) for option in CLIENT_OPTIONS)
+        base_url = (params['session'] or {}).get('base_url') or params['base_url']
+        worker_group = self.get_option('worker_group')
+        default = self.get_option('default')
+
+        results = []
+        for term in terms:
+            endpoint, single = resolve_term(term, worker_group)
+            value = self._read(params, (base_url, endpoint, query), endpoint, single, query)
+            results.append(default if value == MISSING else value)
+        return results
+
+    def _read(self, params, key, endpoint, single, query):
+        """Return a (projected) resource from the memory cache, the disk cache or the API."""
+        with _LOCK:
+            if key in _RESULTS:
+                return _RESULTS[key]
+
+        ttl = self.get_option('cache_ttl')
+        path = None
+        if ttl > 0:
+            digest = hashlib.sha256(json.dumps(key).encode('utf-8')).hexdigest()
+            path = os.path.join(self.get_option('cache_dir'), f'{digest}.json')
+            cached = read_json(path, None)
+            if cached and time.time() - cached.get('time', 0) < ttl:
+                with _LOCK:
+                    _RESULTS[key] = cached['value']
+                return cached['value']
+
+        try:
+            value = unwrap(self._client(params).get_or_none(endpoint), single)
+        except CriblAPIError as e:
+            raise AnsibleError(f'Failed to read {endpoint}: {str(e)}')
+        if query and value != MISSING:
+            value = jmespath.search(query, value)
+
+        with _LOCK:
+            _RESULTS[key] = value
+        if path is not None:
+            write_json_atomic(path, {'time': time.time(), 'value': value})
+        return value
+
+    def _client(self, params):
+        """Return the shared client for the connection options, creating it once."""
+        key = json.dumps([params[option] for option in CLIENT_OPTIONS], sort_keys=True, default=str)
+        with _LOCK:
+            client = _CLIENTS.get(key)
+            if client is None:
+                if params['session']:
+                    client = CriblAPIClient(session=params['session'])
+                else:
+                    client = CriblAPIClient(
+                        base_url=params['base_url'],
+                        username=params['username'],
+                        password=params['password'],
+                        token=params['token'],
+                        validate_certs=params['validate_certs'],
+                        timeout=params['timeout']
+                    )
+                _CLIENTS[key] = client
+        return client
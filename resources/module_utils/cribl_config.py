@@ -0,0 +1,619 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+Multi-resource desired-state helpers for Cribl Ansible modules.
+
+Builds a dependency graph across resource types from known reference fields
+and reconciles each topological level concurrently through CriblResource.
+"""
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import yaml
+
+from .cribl_api import CriblAPIError
+from .cribl_declarative import resource_class_for
+from .cribl_resource_types import RESOURCE_TYPES
+from .cribl_state import get_scope_version, state_hash, write_json_atomic
+
+
+class CriblConfigError(CriblAPIError):
+    """Exception raised for invalid desired-state documents."""
+    pass
+
+
+# Fields that reference other resources, as (path, referenced type).
+# A "[]" path segment descends into every element of a list.
+REFERENCE_FIELDS = {
+    'route': [
+        ('routes[].output', 'output'),
+        ('routes[].pipeline', 'pipeline'),
+        ('output', 'output'),
+        ('pipeline', 'pipeline'),
+    ],
+    'input': [
+        ('pipeline', 'pipeline'),
+        ('connections[].output', 'output'),
+        ('connections[].pipeline', 'pipeline'),
+    ],
+    'output': [
+        ('pipeline', 'pipeline'),
+    ],
+}
+
+# Resource types that must exist before any resource of the given type,
+# even when no explicit reference field links them.
+TYPE_DEPENDENCIES = {
+    'input': ('secret', 'certificate'),
+    'output': ('secret', 'certificate'),
+}
+
+# Version of the plan file layout written by ConfigPlanner
+PLAN_FORMAT = 1
+
+# Directory of a desired-state tree holding resources outside worker groups
+GLOBAL_SCOPE = '_global'
+
+DESIRED_FILE_EXTENSIONS = ('.yml', '.yaml', '.json')
+
+
+def resolve_resource_type(name):
+    """
+    Resolve a document key to a registered resource type.
+
+    Accepts the singular type name (e.g. 'output') or its plural form ('outputs').
+    """
+    if name in RESOURCE_TYPES:
+        return name
+    if name.endswith('s') and name[:-1] in RESOURCE_TYPES:
+        return name[:-1]
+    raise CriblConfigError(f"Unknown resource type '{name}'")
+
+
+def resolve_path(obj, path):
+    """
+    Return every value found at a dotted path.
+
+    Args:
+        obj: Resource configuration
+        path: Dotted path, e.g. 'routes[].output'
+
+    Returns:
+        list: Matching values (empty if the path does not exist)
+    """
+    values = [obj]
+    for part in path.split('.'):
+        descend = part.endswith('[]')
+        key = part[:-2] if descend else part
+        next_values = []
+        for value in values:
+            if not isinstance(value, dict) or key not in value:
+                continue
+            child = value[key]
+            if descend:
+                if isinstance(child, list):
+                    next_values.extend(child)
+            else:
+                next_values.append(child)
+        values = next_values
+    return [v for v in values if v is not None]
+
+
+def nodes_key(name):
+    """Convert a 'type/id' display name back to a node key."""
+    resource_type, resource_id = name.split('/', 1)
+    return (resource_type, resource_id)
+
+
+def write_plan(path, plan):
+    """Atomically write a plan to a JSON file."""
+    write_json_atomic(path, plan)
+
+
+def read_plan(path):
+    """Read a plan written by write_plan."""
+    with open(path) as f:
+        plan = json.load(f)
+    if plan.get('format') != PLAN_FORMAT:
+        raise CriblConfigError(f"Unsupported plan format in {path}")
+    return plan
+
+
+def read_desired_tree(root):
+    """
+    Read a desired-state directory.
+
+    The layout is <root>/<worker group>/<type>/<id>.yml, with one resource
+    configuration per file (JSON files are accepted too).  Resources managed
+    outside worker groups live under the '_global' directory.  A missing
+    ID is taken from the file name.
+
+    Returns:
+        dict: Worker group ID (None for global) to desired-state document
+    """
+    if not os.path.isdir(root):
+        raise CriblConfigError(f"Desired-state directory {root} does not exist")
+
+    tree = {}
+    for scope in sorted(os.listdir(root)):
+        scope_dir = os.path.join(root, scope)
+        if scope.startswith('.') or not os.path.isdir(scope_dir):
+            continue
+        document = {}
+        for type_name in sorted(os.listdir(scope_dir)):
+            type_dir = os.path.join(scope_dir, type_name)
+            if type_name.startswith('.') or not os.path.isdir(type_dir):
+                continue
+            resource_type = resolve_resource_type(type_name)
+            id_param = RESOURCE_TYPES[resource_type]['id_param']
+            items = document.setdefault(resource_type, [])
+            for file_name in sorted(os.listdir(type_dir)):
+                stem, ext = os.path.splitext(file_name)
+                if ext not in DESIRED_FILE_EXTENSIONS:
+                    continue
+                item = _read_desired_file(os.path.join(type_dir, file_name))
+                item.setdefault(id_param, stem)
+                items.append(item)
+        tree[None if scope == GLOBAL_SCOPE else scope] = document
+    return tree
+
+
+def _read_desired_file(path):
+    """Read a single resource configuration from a YAML or JSON file."""
+    with open(path) as f:
+        if path.endswith('.json'):
+            data = json.load(f)
+        else:
+            data = yaml.safe_load(f)
+    if not isinstance(data, dict):
+        raise CriblConfigError(f"{path} must contain a single resource mapping")
+    return data
+
+
+class ConfigNode:
+    """A single resource in a desired-state document."""
+
+    def __init__(self, resource_type, resource_id, desired_state, state='present'):
+        self.resource_type = resource_type
+        self.resource_id = resource_id
+        self.desired_state = desired_state
+        self.state = state
+        self.spec = RESOURCE_TYPES[resource_type]
+        # Set when the node comes from a plan
+        self.action = None
+        self.observed_hash = None
+
+    @property
+    def key(self):
+        """Unique (type, id) key for this node."""
+        return (self.resource_type, self.resource_id)
+
+    @property
+    def name(self):
+        """Display name of this node ('type/id')."""
+        return f"{self.resource_type}/{self.resource_id}"
+
+    def references(self):
+        """Return the (type, id) keys this resource refers to."""
+        refs = set()
+        for path, ref_type in REFERENCE_FIELDS.get(self.resource_type, []):
+            for value in resolve_path(self.desired_state, path):
+                if isinstance(value, str) and value:
+                    refs.add((ref_type, value))
+        return refs
+
+
+def parse_document(document):
+    """
+    Parse a multi-type desired-state document into nodes.
+
+    The document maps resource types to lists of resource configurations:
+
+        {'output': [{'id': 's3', ...}], 'route': [{'id': 'default', ...}]}
+
+    An item may carry 'state: absent' to remove the resource.
+
+    Returns:
+        list: ConfigNode instances
+    """
+    if not isinstance(document, dict):
+        raise CriblConfigError("Desired-state document must be a mapping of resource types")
+
+    nodes = []
+    seen = set()
+    for type_name, items in document.items():
+        resource_type = resolve_resource_type(type_name)
+        id_param = RESOURCE_TYPES[resource_type]['id_param']
+
+        for item in items or []:
+            if not isinstance(item, dict):
+                raise CriblConfigError(f"Items of '{type_name}' must be mappings")
+
+            desired_state = dict(item)
+            state = 'present'
+            if desired_state.get('state') in ('present', 'absent'):
+                state = desired_state.pop('state')
+
+            resource_id = desired_state.get(id_param, desired_state.get('id'))
+            if not resource_id:
+                raise CriblConfigError(f"Item of '{type_name}' is missing '{id_param}'")
+            desired_state[id_param] = resource_id
+
+            node = ConfigNode(resource_type, resource_id, desired_state, state)
+            if node.key in seen:
+                raise CriblConfigError(f"Duplicate resource {resource_type}/{resource_id}")
+            seen.add(node.key)
+            nodes.append(node)
+
+    return nodes
+
+
+def build_dependency_graph(nodes):
+    """
+    Build the dependency graph between nodes of a document.
+
+    References to resources outside the document are assumed to exist already
+    and do not create edges.
+
+    Returns:
+        dict: Node key -> set of node keys it depends on
+    """
+    keys = set(node.key for node in nodes)
+    by_type = {}
+    for node in nodes:
+        by_type.setdefault(node.resource_type, []).append(node.key)
+
+    graph = {}
+    for node in nodes:
+        deps = set(ref for ref in node.references() if ref in keys)
+        for dep_type in TYPE_DEPENDENCIES.get(node.resource_type, ()):
+            deps.update(by_type.get(dep_type, []))
+        deps.discard(node.key)
+        graph[node.key] = deps
+    return graph
+
+
+def dependency_levels(nodes, graph=None):
+    """
+    Group nodes into topological levels.
+
+    Every node only depends on nodes of earlier levels, so all nodes of a level
+    can be applied concurrently.
+
+    Returns:
+        list: Lists of ConfigNode, one per level, sorted by key within a level
+    """
+    if graph is None:
+        graph = build_dependency_graph(nodes)
+    by_key = dict((node.key, node) for node in nodes)
+    remaining = dict((key, set(deps)) for key, deps in graph.items())
+
+    levels = []
+    while remaining:
+        ready = sorted(key for key, deps in remaining.items() if not deps)
+        if not ready:
+            cycle = ', '.join(f"{t}/{i}" for t, i in sorted(remaining))
+            raise CriblConfigError(f"Dependency cycle between resources: {cycle}")
+        levels.append([by_key[key] for key in ready])
+        for key in ready:
+            del remaining[key]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+    return levels
+
+
+class ConfigApplier:
+    """Apply a parsed desired-state document level by level."""
+
+    def __init__(self, module, client, worker_group=None, parallelism=8, state_store=None,
+                 change_journal=None):
+        """
+        Initialize the applier.
+
+        Args:
+            module: Ansible module instance (used for check mode)
+            client: CriblAPIClient instance shared by all workers
+            worker_group: Optional worker group ID for all resources
+            parallelism: Maximum number of concurrent API operations
+            state_store: Optional CriblStateStore shared by all workers
+            change_journal: Optional ChangeJournal recording changed worker groups
+        """
+        self.module = module
+        self.client = client
+        self.worker_group = worker_group
+        self.state_store = state_store
+        self.change_journal = change_journal
+        self.parallelism = max(1, parallelism)
+        if hasattr(client, 'set_pool_size'):
+            client.set_pool_size(self.parallelism)
+
+    def apply(self, nodes):
+        """
+        Reconcile all nodes.
+
+        Resources to create or update are applied in dependency order; resources
+        to remove are deleted afterwards in reverse dependency order.  When a
+        resource fails, every resource that depends on it is skipped.
+
+        Returns:
+            dict: Result with changed, failed and per-resource results
+        """
+        present = [node for node in nodes if node.state == 'present']
+        absent = [node for node in nodes if node.state == 'absent']
+
+        present_graph = build_dependency_graph(present)
+        absent_graph = build_dependency_graph(absent)
+
+        # Deleting must wait for the resources that depend on the target
+        dependents = dict((key, set()) for key in absent_graph)
+        for key, deps in absent_graph.items():
+            for dep in deps:
+                dependents[dep].add(key)
+
+        results = []
+        with ThreadPoolExecutor(max_workers=self.parallelism) as executor:
+            results.extend(self._run_levels(
+                executor, dependency_levels(present, present_graph), present_graph,
+                self._apply_node))
+            results.extend(self._run_levels(
+                executor, list(reversed(dependency_levels(absent, absent_graph))), dependents,
+                self._apply_node))
+
+        return {
+            'changed': any(r.get('changed') for r in results),
+            'failed': any(r.get('failed') for r in results),
+            'results': results,
+        }
+
+    def apply_plan(self, plan):
+        """
+        Execute a plan produced by ConfigPlanner without re-reading resources.
+
+        The worker group's config version is checked once; only when it moved
+        since planning (or is unavailable) is each resource re-read and its hash
+        compared with the observed hash recorded in the plan.
+
+        Returns:
+            dict: Result with changed, failed, verified and per-resource results
+
+        Raises:
+            CriblConfigError: If the plan was made for another server or worker group
+        """
+        base_url = getattr(self.client, 'base_url', None)
+        if plan.get('base_url') and str(plan['base_url']).rstrip('/') != str(base_url).rstrip('/'):
+            raise CriblConfigError(
+                f"Plan was created against {plan['base_url']}, not {base_url}")
+        if plan.get('worker_group') != self.worker_group:
+            raise CriblConfigError(
+                f"Plan was created for worker group {plan.get('worker_group')}, "
+                f"not {self.worker_group}")
+
+        verify = plan.get('scope_version') is None or \
+            get_scope_version(self.client, self.worker_group) != plan['scope_version']
+
+        nodes = {}
+        blockers = {}
+        for op in plan['operations']:
+            state = 'absent' if op['action'] == 'delete' else 'present'
+            node = ConfigNode(op['type'], op['id'], op.get('desired_state'), state)
+            node.action = op['action']
+            node.observed_hash = op.get('observed_hash')
+            nodes[node.name] = node
+            blockers[node.key] = set(nodes_key(name) for name in op.get('depends_on', []))
+
+        levels = [[nodes[name] for name in level] for level in plan['levels']]
+
+        def execute(node):
+            return self._execute_operation(node, verify)
+
+        with ThreadPoolExecutor(max_workers=self.parallelism) as executor:
+            results = self._run_levels(executor, levels, blockers, execute)
+
+        return {
+            'changed': any(r.get('changed') for r in results),
+            'failed': any(r.get('failed') for r in results),
+            'verified': verify,
+            'results': results,
+        }
+
+    def _execute_operation(self, node, verify):
+        """Execute a single planned operation."""
+        # Concurrent changes are detected against the observed hash, not the revision
+        resource = resource_class_for(node.spec['endpoint'])(
+            self.module, self.client, node.resource_id, node.spec['endpoint'],
+            worker_group=self.worker_group, raise_errors=True, change_journal=self.change_journal,
+            conflict_retries=0
+        )
+        try:
+            current = None
+            # Updates need the current state so resource classes can merge into it
+            if verify or node.action == 'update':
+                current = resource.get_current_state()
+            if verify:
+                if state_hash(current) != node.observed_hash:
+                    return self._result(node, failed=True,
+                                        msg=f'{node.name} was modified after the plan was created')
+
+            past = {'create': 'Created', 'update': 'Updated', 'delete': 'Deleted'}[node.action]
+            if self.module.check_mode:
+                return self._result(node, changed=True, msg=f'Would {node.action} {node.resource_id}')
+
+            if node.action == 'create':
+                resource.create_resource(node.desired_state)
+            elif node.action == 'update':
+                resource.update_resource(current, node.desired_state, node.spec['update_method'])
+            else:
+                resource.delete_resource(None)
+        except CriblAPIError as e:
+            return self._result(node, failed=True, msg=f'Failed to {node.action} {node.resource_id}: {str(e)}')
+
+        return self._result(node, changed=True, msg=f'{past} {node.resource_id}')
+
+    def _run_levels(self, executor, levels, blockers, func):
+        """Run levels in order; skip nodes whose blockers did not succeed."""
+        results = []
+        unsuccessful = set()
+        for level in levels:
+            runnable = []
+            for node in level:
+                if blockers.get(node.key, set()) & unsuccessful:
+                    unsuccessful.add(node.key)
+                    results.append(self._result(node, skipped=True,
+                                                msg='Skipped because a dependency failed'))
+                else:
+                    runnable.append(node)
+
+            for node, result in zip(runnable, executor.map(func, runnable)):
+                if result.get('failed'):
+                    unsuccessful.add(node.key)
+                results.append(result)
+        return results
+
+    def _apply_node(self, node):
+        """Reconcile a single node and return its result."""
+        resource = resource_class_for(node.spec['endpoint'])(
+            self.module, self.client, node.resource_id, node.spec['endpoint'],
+            worker_group=self.worker_group, raise_errors=True, state_store=self.state_store,
+            change_journal=self.change_journal
+        )
+        try:
+            if node.state == 'present':
+                outcome = resource.ensure_state(
+                    'present', node.desired_state, update_method=node.spec['update_method'])
+            else:
+                outcome = resource.ensure_state('absent')
+        except CriblAPIError as e:
+            return self._result(node, failed=True, msg=str(e))
+
+        result = self._result(node, changed=outcome.get('changed', False), msg=outcome.get('msg'))
+        if 'diff' in outcome:
+            result['diff'] = outcome['diff']
+        return result
+
+    def _result(self, node, changed=False, failed=False, skipped=False, msg=None):
+        """Build a per-resource result entry."""
+        result = {
+            'type': node.resource_type,
+            'id': node.resource_id,
+            'state': node.state,
+            'changed': changed,
+            'msg': msg,
+        }
+        if failed:
+            result['failed'] = True
+        if skipped:
+            result['skipped'] = True
+        return result
+
+
+class ConfigPlanner:
+    """Compute the operations needed to reach a desired-state document."""
+
+    def __init__(self, client, worker_group=None, parallelism=8):
+        """
+        Initialize the planner.
+
+        Args:
+            client: CriblAPIClient instance shared by all workers
+            worker_group: Optional worker group ID for all resources
+            parallelism: Maximum number of concurrent reads
+        """
+        self.client = client
+        self.worker_group = worker_group
+        self.parallelism = max(1, parallelism)
+        if hasattr(client, 'set_pool_size'):
+            client.set_pool_size(self.parallelism)
+
+    def plan(self, nodes):
+        """
+        Read the current state of every node once and compute operations.
+
+        Returns:
+            dict: Serializable plan with operations, execution levels and
+            content hashes of the observed state
+        """
+        scope_version = get_scope_version(self.client, self.worker_group)
+
+        with ThreadPoolExecutor(max_workers=self.parallelism) as executor:
+            observed = dict(zip(
+                [node.key for node in nodes],
+                executor.map(self._observe, nodes)
+            ))
+
+        operations = {}
+        summary = {'create': 0, 'update': 0, 'delete': 0, 'noop': 0}
+        for node in nodes:
+            action = self._action(node, observed[node.key])
+            summary[action] += 1
+            if action != 'noop':
+                operations[node.key] = {
+                    'type': node.resource_type,
+                    'id': node.resource_id,
+                    'action': action,
+                    'desired_state': node.desired_state if action != 'delete' else None,
+                    'observed_hash': state_hash(observed[node.key]),
+                }
+
+        present = [n for n in nodes if n.state == 'present']
+        absent = [n for n in nodes if n.state == 'absent']
+        present_graph = build_dependency_graph(present)
+        absent_graph = build_dependency_graph(absent)
+
+        # Operations wait on planned operations only; no-op dependencies are satisfied
+        for key, deps in present_graph.items():
+            if key in operations:
+                operations[key]['depends_on'] = sorted(
+                    f"{t}/{i}" for t, i in deps if (t, i) in operations)
+        for key in absent_graph:
+            if key in operations:
+                operations[key]['depends_on'] = sorted(
+                    f"{t}/{i}" for t, i in absent_graph
+                    if key in absent_graph[(t, i)] and (t, i) in operations)
+
+        levels = []
+        ordered = dependency_levels(present, present_graph) + \
+            list(reversed(dependency_levels(absent, absent_graph)))
+        for level in ordered:
+            names = [node.name for node in level if node.key in operations]
+            if names:
+                levels.append(names)
+
+        return {
+            'format': PLAN_FORMAT,
+            'created_at': time.time(),
+            'base_url': getattr(self.client, 'base_url', None),
+            'worker_group': self.worker_group,
+            'scope_version': scope_version,
+            'summary': summary,
+            'levels': levels,
+            'operations': [operations[nodes_key(name)] for level in levels for name in level],
+        }
+
+    def _observe(self, node):
+        """Read the current state of a node."""
+        resource = resource_class_for(node.spec['endpoint'])(
+            None, self.client, node.resource_id, node.spec['endpoint'],
+            worker_group=self.worker_group, raise_errors=True
+        )
+        return resource.get_current_state()
+
+    def _action(self, node, current):
+        """Determine the operation for a node given its observed state."""
+        if node.state == 'absent':
+            return 'delete' if current is not None else 'noop'
+        if current is None:
+            return 'create'
+        resource = resource_class_for(node.spec['endpoint'])(
+            None, self.client, node.resource_id, node.spec['endpoint'])
+        if resource.needs_update(current, node.desired_state):
+            return 'update'
+        return 'noop'
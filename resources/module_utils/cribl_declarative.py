@@ -12,14 +12,111 @@ Provides generic base classes for creating idempotent, state-based Cribl resourc
 from __future__ import (absolute_import, division, print_function)
 __metaclass__ = type
 
+from concurrent.futures import ThreadPoolExecutor
+
+from ansible.module_utils.basic import env_fallback
+
 # Import from the local cribl_api module (relative import works across collections)
 from .cribl_api import CriblAPIClient, CriblAPIError
+from .cribl_state import ChangeJournal, CriblStateStore, state_hash
+
+
+# Server-maintained fields ignored when comparing states
+METADATA_FIELDS = ('id', 'createdAt', 'updatedAt', 'version')
+
+# Status codes reporting a failed precondition or an edit conflict
+CONFLICT_STATUS_CODES = (409, 412)
+
+# Server-maintained fields identifying a resource revision, in order of preference
+REVISION_FIELDS = ('version', 'updatedAt')
+
+
+class CriblConflictError(CriblAPIError):
+    """Exception raised when a resource changed between being read and written."""
+    pass
+
+
+def state_revision(state):
+    """
+    Return the revision of a resource state.
+    
+    Returns:
+        tuple: (field, value) of the first revision field the server set, or
+        ('hash', content hash) for resources without one
+    """
+    if isinstance(state, dict):
+        for field in REVISION_FIELDS:
+            if state.get(field) is not None:
+                return field, state[field]
+    return 'hash', state_hash(state)
+
+
+def scoped_endpoint(endpoint_base, worker_group=None):
+    """
+    Return an endpoint scoped to a worker group.
+    
+    This transforms endpoints like /pipelines to /m/{worker_group}/pipelines.
+    """
+    if worker_group:
+        # Ensure endpoint_base starts with /
+        if not endpoint_base.startswith('/'):
+            endpoint_base = '/' + endpoint_base
+        return f"/m/{worker_group}{endpoint_base}".rstrip('/')
+    return endpoint_base.rstrip('/')
+
+
+def is_not_found(error):
+    """
+    Check whether an API error reports a missing resource.
+    
+    Only the status code and the parsed error body are inspected, so
+    messages such as "already exists" are never mistaken for a missing resource.
+    """
+    if error.status_code == 404:
+        return True
+    body = error.body
+    message = body.get('message') if isinstance(body, dict) else body
+    message = str(message or '').lower()
+    return 'does not exist' in message or 'not found' in message
+
+
+def normalize_state(value):
+    """Normalize a configuration value for comparison (unset values are dropped)."""
+    if isinstance(value, dict):
+        return dict((k, normalize_state(v)) for k, v in value.items() if v is not None)
+    if isinstance(value, list):
+        return [normalize_state(v) for v in value]
+    return value
+
+
+def diff_states(current_state, desired_state, ignore=METADATA_FIELDS):
+    """
+    Compare the fields set in a desired state with the current state.
+    
+    Fields the desired state does not set are not compared, and server
+    metadata fields are ignored.
+    
+    Returns:
+        dict: Differing fields mapped to {'before': current, 'after': desired}
+    """
+    current = normalize_state(current_state or {})
+    diff = {}
+    for key, value in normalize_state(desired_state or {}).items():
+        if key in ignore:
+            continue
+        if key not in current or current[key] != value:
+            diff[key] = {'before': current.get(key), 'after': value}
+    return diff
 
 
 class CriblResource:
     """Base class for declarative Cribl resources."""
     
-    def __init__(self, module, client, resource_id, endpoint_base, worker_group=None):
+    # Module options consumed by the resource class instead of the desired state
+    MODULE_OPTIONS = ()
+    
+    def __init__(self, module, client, resource_id, endpoint_base, worker_group=None,
+                 raise_errors=False, state_store=None, change_journal=None, conflict_retries=3):
         """
         Initialize a declarative Cribl resource.
         
@@ -29,21 +126,26 @@ class CriblResource:
             resource_id: Resource identifier
             endpoint_base: Base API endpoint (e.g., '/system/users', '/pipelines')
             worker_group: Optional worker group ID for group-specific resources
+            raise_errors: Raise CriblAPIError instead of calling fail_json
+                (required when several resources are reconciled concurrently)
+            state_store: Optional CriblStateStore used to skip reads of resources
+                unchanged since they were last applied
+            change_journal: Optional ChangeJournal recording worker groups with
+                uncommitted changes
+            conflict_retries: Number of times an update is re-read, re-diffed and
+                retried when the resource changed since it was read (0 disables
+                the version check and its extra read)
         """
         self.module = module
         self.client = client
         self.resource_id = resource_id
         self.worker_group = worker_group
+        self.raise_errors = raise_errors
+        self.state_store = state_store
+        self.change_journal = change_journal
+        self.conflict_retries = conflict_retries
         
-        # Prefix endpoint with worker group if specified
-        # This transforms endpoints like /pipelines to /m/{worker_group}/pipelines
-        if worker_group:
-            # Ensure endpoint_base starts with /
-            if not endpoint_base.startswith('/'):
-                endpoint_base = '/' + endpoint_base
-            self.endpoint_base = f"/m/{worker_group}{endpoint_base}".rstrip('/')
-        else:
-            self.endpoint_base = endpoint_base.rstrip('/')
+        self.endpoint_base = scoped_endpoint(endpoint_base, worker_group)
     
     def get_current_state(self):
         """
@@ -54,45 +156,40 @@ class CriblResource:
         """
         endpoint = f"{self.endpoint_base}/{self.resource_id}"
         try:
-            response = self.client.get(endpoint)
-            
-            # Cribl API returns list structure: {"count": N, "items": [...]}
-            # When resource doesn't exist, returns {"count": 0, "items": []}
-            if isinstance(response, dict):
-                if 'items' in response:
-                    items = response.get('items', [])
-                    count = response.get('count', 0)
-                    
-                    # Check if no items exist
-                    if count == 0 or not items or len(items) == 0:
-                        return None
-                    
-                    # Return first (and should be only) item
-                    return items[0]
-                elif 'count' in response and response.get('count', 0) == 0:
-                    return None
-            
-            # If response doesn't have items structure, return it as-is
-            # (some endpoints may return the resource directly)
-            return response
+            # 404 is returned as None without raising
+            response = self.client.get_or_none(endpoint)
         except CriblAPIError as e:
-            error_str = str(e)
-            
-            # Check for 404 or not found errors - these indicate resource doesn't exist
-            if "404" in error_str:
+            # Some endpoints report a missing resource with another status code
+            if is_not_found(e):
                 return None
-            if any(phrase in error_str.lower() for phrase in ["not found", "item not found", "does not exist", "entity with"]):
-                # "entity with" catches "Entity with ID does not exist" messages
-                # But NOT "already exists" which indicates resource DOES exist
-                if "already exists" not in error_str.lower():
-                    return None
             
             # For any other error, re-raise it (don't assume resource doesn't exist)
             # Include the endpoint in the error for debugging
-            raise CriblAPIError(f"Failed to get current state from {endpoint}: {error_str}")
+            raise CriblAPIError(f"Failed to get current state from {endpoint}: {str(e)}",
+                                status_code=e.status_code, endpoint=endpoint, body=e.body)
         except Exception as e:
             # Catch any other exception and re-raise with context
-            raise CriblAPIError(f"Failed to get current state from {endpoint}: {str(e)}")
+            raise CriblAPIError(f"Failed to get current state from {endpoint}: {str(e)}",
+                                endpoint=endpoint)
+        
+        # Cribl API returns list structure: {"count": N, "items": [...]}
+        # When resource doesn't exist, returns {"count": 0, "items": []}
+        if isinstance(response, dict):
+            if 'items' in response:
+                items = response.get('items', [])
+                
+                # Check if no items exist
+                if response.get('count', 0) == 0 or not items:
+                    return None
+                
+                # Return first (and should be only) item
+                return items[0]
+            elif 'count' in response and response.get('count', 0) == 0:
+                return None
+        
+        # If response doesn't have items structure, return it as-is
+        # (some endpoints may return the resource directly; None if not found)
+        return response
     
     def create_resource(self, desired_state):
         """
@@ -105,6 +202,7 @@ class CriblResource:
             dict: Created resource data
         """
         response = self.client.post(self.endpoint_base, data=desired_state)
+        self._journal_change()
         return response
     
     def update_resource(self, current_state, desired_state, method='PATCH'):
@@ -118,12 +216,22 @@ class CriblResource:
             
         Returns:
             dict: Updated resource data
+        
+        Raises:
+            CriblConflictError: If the version check is enabled and the resource's
+                revision (see state_revision) no longer matches current_state
         """
         endpoint = f"{self.endpoint_base}/{self.resource_id}"
+        if self.conflict_retries and current_state is not None:
+            # The API has no conditional updates, so check the revision just before writing
+            if state_revision(self.get_current_state()) != state_revision(current_state):
+                raise CriblConflictError(f'{self.resource_id} was modified since it was read',
+                                         status_code=409, endpoint=endpoint)
         if method.upper() == 'PUT':
             response = self.client.put(endpoint, data=desired_state)
         else:
             response = self.client.patch(endpoint, data=desired_state)
+        self._journal_change()
         return response
     
     def delete_resource(self, current_state):
@@ -138,6 +246,7 @@ class CriblResource:
         """
         endpoint = f"{self.endpoint_base}/{self.resource_id}"
         response = self.client.delete(endpoint)
+        self._journal_change()
         return response
     
     def needs_update(self, current_state, desired_state):
@@ -151,18 +260,57 @@ class CriblResource:
         Returns:
             bool: True if update is needed
         """
-        # Compare relevant fields (exclude metadata)
-        for key, value in desired_state.items():
-            if key in ['id', 'createdAt', 'updatedAt', 'version']:
-                continue
-            
-            if key not in current_state:
-                return True
-            
-            if current_state[key] != value:
-                return True
+        return bool(diff_states(current_state, desired_state))
+    
+    def describe_update(self, current_state, desired_state):
+        """
+        Describe a pending update for the module result.
+        
+        Returns:
+            dict: Extra result keys (the diff) for an update from current_state
+        """
+        return {'diff': {'before': current_state, 'after': desired_state}}
+    
+    def _fail(self, msg):
+        """Report a failure through the module, or raise when raise_errors is set."""
+        if self.raise_errors:
+            raise CriblAPIError(msg)
+        self.module.fail_json(msg=msg)
+    
+    def _update_with_retry(self, current_state, desired_state, update_method):
+        """
+        Update a resource, re-reading and re-diffing it after each conflict.
         
-        return False
+        Returns:
+            dict: Updated resource data, or None if the resource reached the
+            desired state through a concurrent change
+        """
+        attempt = 0
+        while True:
+            try:
+                return self.update_resource(current_state, desired_state, update_method)
+            except CriblAPIError as e:
+                if e.status_code not in CONFLICT_STATUS_CODES or attempt >= self.conflict_retries:
+                    raise
+            attempt += 1
+            current_state = self.get_current_state()
+            if current_state is None:
+                raise CriblConflictError(f'{self.resource_id} was deleted while being updated',
+                                         status_code=409, endpoint=self.endpoint_base)
+            if not self.needs_update(current_state, desired_state):
+                return None
+    
+    def _journal_change(self):
+        """Record a change under the worker group in the change journal, if any."""
+        if self.change_journal is not None and self.worker_group:
+            self.change_journal.record(getattr(self.client, 'base_url', None), self.worker_group,
+                                       f"{self.endpoint_base}/{self.resource_id}")
+    
+    def _record_state(self, desired_state, server_state=None):
+        """Fingerprint the applied desired state in the state store, if any."""
+        if self.state_store is not None and not self.module.check_mode:
+            self.state_store.record(self.client, self.worker_group, self.endpoint_base,
+                                    self.resource_id, desired_state, server_state)
     
     def ensure_state(self, state, desired_state=None, update_method='PATCH'):
         """
@@ -176,6 +324,17 @@ class CriblResource:
         Returns:
             dict: Result with changed, msg, and resource keys
         """
+        # Fast path: desired state unchanged since last apply and the worker
+        # group has not moved, so the resource does not need to be read
+        if state == 'present' and desired_state is not None and self.state_store is not None:
+            if self.state_store.is_unchanged(self.client, self.worker_group, self.endpoint_base,
+                                             self.resource_id, desired_state):
+                return {
+                    'changed': False,
+                    'msg': f'{self.resource_id} already in desired state (unchanged since last apply)',
+                    'resource': desired_state
+                }
+        
         current_state = self.get_current_state()
         
         if state == 'present':
@@ -193,40 +352,50 @@ class CriblResource:
                 
                 try:
                     resource = self.create_resource(desired_state)
+                    self._record_state(desired_state, resource)
                     return {
                         'changed': True,
                         'msg': f'Created {self.resource_id}',
                         'resource': resource
                     }
                 except CriblAPIError as e:
-                    self.module.fail_json(msg=f'Failed to create {self.resource_id}: {str(e)}')
+                    self._fail(f'Failed to create {self.resource_id}: {str(e)}')
             
             else:
                 # Resource exists - check if update needed
                 if self.needs_update(current_state, desired_state):
                     if self.module.check_mode:
-                        return {
+                        result = {
                             'changed': True,
                             'msg': f'Would update {self.resource_id}',
-                            'resource': desired_state,
-                            'diff': {
-                                'before': current_state,
-                                'after': desired_state
-                            }
+                            'resource': desired_state
                         }
+                        result.update(self.describe_update(current_state, desired_state))
+                        return result
                     
                     try:
-                        resource = self.update_resource(current_state, desired_state, update_method)
-                        return {
+                        resource = self._update_with_retry(current_state, desired_state, update_method)
+                        if resource is None:
+                            self._record_state(desired_state)
+                            return {
+                                'changed': False,
+                                'msg': f'{self.resource_id} already in desired state (changed concurrently)',
+                                'resource': desired_state
+                            }
+                        self._record_state(desired_state, resource)
+                        result = {
                             'changed': True,
                             'msg': f'Updated {self.resource_id}',
                             'resource': resource
                         }
+                        result.update(self.describe_update(current_state, desired_state))
+                        return result
                     except CriblAPIError as e:
-                        self.module.fail_json(msg=f'Failed to update {self.resource_id}: {str(e)}')
+                        self._fail(f'Failed to update {self.resource_id}: {str(e)}')
                 
                 else:
                     # No changes needed
+                    self._record_state(desired_state, current_state)
                     return {
                         'changed': False,
                         'msg': f'{self.resource_id} already in desired state',
@@ -251,12 +420,284 @@ class CriblResource:
                 
                 try:
                     self.delete_resource(current_state)
+                    if self.state_store is not None:
+                        self.state_store.forget(self.client, self.worker_group,
+                                                self.endpoint_base, self.resource_id)
                     return {
                         'changed': True,
                         'msg': f'Deleted {self.resource_id}'
                     }
                 except CriblAPIError as e:
-                    self.module.fail_json(msg=f'Failed to delete {self.resource_id}: {str(e)}')
+                    self._fail(f'Failed to delete {self.resource_id}: {str(e)}')
+
+
+def _matches(current, desired):
+    """Check that every value set in desired is present in current (server-added fields are ignored)."""
+    if isinstance(desired, dict):
+        return isinstance(current, dict) and all(
+            k in current and _matches(current[k], v) for k, v in desired.items())
+    if isinstance(desired, list):
+        return isinstance(current, list) and len(current) == len(desired) and all(
+            _matches(c, d) for c, d in zip(current, desired))
+    return current == desired
+
+
+def _merge(current, desired):
+    """Merge desired values over current ones, keeping fields only the server sets."""
+    if isinstance(current, dict) and isinstance(desired, dict):
+        merged = dict(current)
+        for key, value in desired.items():
+            merged[key] = _merge(current.get(key), value)
+        return merged
+    return desired
+
+
+# Function fields the server fills in with these values when they are not set
+FUNCTION_DEFAULTS = {'disabled': False, 'final': False, 'filter': 'true'}
+
+
+def function_keys(functions, key_field=None):
+    """
+    Return a stable key for each function of a pipeline.
+    
+    Functions are keyed by the value of key_field when they set it, and
+    otherwise by their function ID and its occurrence among functions with
+    the same ID (e.g. C(eval#0), C(eval#1)).
+    """
+    keys = []
+    seen = {}
+    for function in functions:
+        value = function.get(key_field) if key_field else None
+        if value is None:
+            function_id = function.get('id')
+            value = f"{function_id}#{seen.get(function_id, 0)}"
+            seen[function_id] = seen.get(function_id, 0) + 1
+        keys.append(str(value))
+    return keys
+
+
+def diff_functions(current_functions, desired_functions, key_field=None):
+    """
+    Compare pipeline functions by their stable keys (see function_keys).
+    
+    Fields the desired functions do not set, and server defaults such as
+    C(disabled: false), are not counted as differences.
+    
+    Returns:
+        dict: Lists of added, removed, modified and moved function keys
+    """
+    current_functions = [normalize_state(f) for f in current_functions or []]
+    desired_functions = [normalize_state(f) for f in desired_functions or []]
+    current = dict(zip(function_keys(current_functions, key_field), current_functions))
+    desired = dict(zip(function_keys(desired_functions, key_field), desired_functions))
+    
+    modified = []
+    for key, function in desired.items():
+        if key in current:
+            normalized = dict(FUNCTION_DEFAULTS)
+            normalized.update(current[key])
+            if not _matches(normalized, function):
+                modified.append(key)
+    common = [key for key in desired if key in current]
+    current_order = [key for key in current if key in desired]
+    return {
+        'added': [key for key in desired if key not in current],
+        'removed': [key for key in current if key not in desired],
+        'modified': modified,
+        'moved': [key for key, old in zip(common, current_order) if key != old],
+    }
+
+
+class CriblPipeline(CriblResource):
+    """
+    Declarative pipeline whose functions are compared and patched one by one.
+    
+    Functions are matched by a stable key (see function_keys), so a change
+    to one function reports and writes only that function's changes, and
+    fields the server normalizes never cause a write.
+    """
+    
+    MODULE_OPTIONS = ('function_key',)
+    
+    def __init__(self, *args, **kwargs):
+        """
+        Initialize the pipeline.
+        
+        Args:
+            function_key: Optional function field used as the stable function key
+            Other arguments are as for CriblResource.
+        """
+        self.function_key = kwargs.pop('function_key', None)
+        super(CriblPipeline, self).__init__(*args, **kwargs)
+    
+    def _split(self, state):
+        """Split a pipeline into its functions and its other fields."""
+        state = normalize_state(state or {})
+        conf = dict(state.get('conf') or {})
+        functions = conf.pop('functions', None)
+        others = dict((k, v) for k, v in state.items() if k != 'conf')
+        if conf or 'conf' in state:
+            others['conf'] = conf
+        return functions, others
+    
+    def _other_changes(self, current_state, desired_state):
+        """Return the non-function fields of desired_state that differ from current_state."""
+        _, current = self._split(current_state)
+        _, desired = self._split(desired_state)
+        return dict((k, {'before': current.get(k), 'after': v}) for k, v in desired.items()
+                    if k not in METADATA_FIELDS and not _matches(current.get(k), v))
+    
+    def function_changes(self, current_state, desired_state):
+        """Return the function-level changes (see diff_functions), or None if functions are not managed."""
+        desired_functions, _ = self._split(desired_state)
+        if desired_functions is None:
+            return None
+        current_functions, _ = self._split(current_state)
+        return diff_functions(current_functions, desired_functions, self.function_key)
+    
+    def needs_update(self, current_state, desired_state):
+        """Check if the pipeline fields or any of its functions need to be updated."""
+        changes = self.function_changes(current_state, desired_state)
+        if changes and any(changes.values()):
+            return True
+        return bool(self._other_changes(current_state, desired_state))
+    
+    def describe_update(self, current_state, desired_state):
+        """Describe only the changed functions and fields instead of the whole pipeline."""
+        before = {}
+        after = {}
+        for key, change in self._other_changes(current_state, desired_state).items():
+            before[key] = change['before']
+            after[key] = change['after']
+        result = {}
+        changes = self.function_changes(current_state, desired_state)
+        if changes is not None:
+            current_functions, _ = self._split(current_state)
+            desired_functions, _ = self._split(desired_state)
+            current = dict(zip(function_keys(current_functions, self.function_key), current_functions))
+            desired = dict(zip(function_keys(desired_functions, self.function_key), desired_functions))
+            changed = changes['added'] + changes['removed'] + changes['modified']
+            if changed:
+                before['functions'] = dict((k, current[k]) for k in changed if k in current)
+                after['functions'] = dict((k, desired[k]) for k in changed if k in desired)
+            if changes['moved']:
+                before['function_order'] = [k for k in current if k in desired]
+                after['function_order'] = [k for k in desired if k in current]
+            result['function_changes'] = changes
+        result['diff'] = {'before': before, 'after': after}
+        return result
+    
+    def update_resource(self, current_state, desired_state, method='PATCH'):
+        """Update the pipeline with its desired functions merged over the current ones."""
+        if current_state is not None:
+            desired_state = self._merge_functions(current_state, desired_state)
+        return super(CriblPipeline, self).update_resource(current_state, desired_state, method)
+    
+    def _merge_functions(self, current_state, desired_state):
+        """Build the full pipeline to write, keeping server-set fields of unchanged functions."""
+        desired_state = normalize_state(desired_state)
+        merged = _merge(current_state, dict((k, v) for k, v in desired_state.items() if k != 'conf'))
+        if 'conf' not in desired_state:
+            return merged
+        desired_conf = dict(desired_state['conf'])
+        desired_functions = desired_conf.pop('functions', None)
+        conf = _merge(current_state.get('conf') or {}, desired_conf)
+        if desired_functions is not None:
+            current_functions = (current_state.get('conf') or {}).get('functions') or []
+            current = dict(zip(function_keys(current_functions, self.function_key), current_functions))
+            conf['functions'] = [
+                _merge(current[key], function) if key in current else function
+                for key, function in zip(function_keys(desired_functions, self.function_key),
+                                         desired_functions)
+            ]
+        merged['conf'] = conf
+        return merged
+
+
+# Resource classes for endpoints that need more than field-level comparison
+RESOURCE_CLASSES = {
+    '/pipelines': CriblPipeline,
+}
+
+
+def resource_class_for(endpoint_base):
+    """Return the declarative resource class managing endpoint_base."""
+    return RESOURCE_CLASSES.get('/' + endpoint_base.strip('/'), CriblResource)
+
+
+def resolve_worker_groups(client, worker_groups):
+    """
+    Expand a worker_groups list, where C(all) stands for every group on the leader.
+    
+    Returns:
+        list: Unique worker group IDs in their given (or leader) order
+    """
+    resolved = []
+    for group in worker_groups:
+        if group == 'all':
+            response = client.get('/master/groups')
+            items = response.get('items', []) if isinstance(response, dict) else response or []
+            names = [item['id'] for item in items if isinstance(item, dict) and item.get('id')]
+        else:
+            names = [group]
+        for name in names:
+            if name not in resolved:
+                resolved.append(name)
+    return resolved
+
+
+def ensure_state_in_groups(module, client, resource_id, endpoint_base, worker_groups, state,
+                           desired_state=None, update_method='PATCH', parallelism=8,
+                           max_fail_percentage=0, state_store=None, change_journal=None,
+                           conflict_retries=3, resource_options=None):
+    """
+    Reconcile the same desired state in several worker groups concurrently.
+    
+    Args:
+        worker_groups: Worker group IDs (see resolve_worker_groups)
+        parallelism: Maximum number of groups reconciled concurrently
+        max_fail_percentage: Percentage of groups allowed to fail before the
+            whole result is marked failed
+        resource_options: Extra keyword arguments for the resource class
+            (see resource_class_for)
+        Other arguments are as for CriblResource and CriblResource.ensure_state.
+    
+    Returns:
+        dict: Result with changed, failed, msg and per-group results keys
+    """
+    parallelism = max(1, parallelism)
+    if hasattr(client, 'set_pool_size'):
+        client.set_pool_size(parallelism)
+    
+    def reconcile(worker_group):
+        resource = resource_class_for(endpoint_base)(
+            module, client, resource_id, endpoint_base, worker_group=worker_group,
+            raise_errors=True, state_store=state_store, change_journal=change_journal,
+            conflict_retries=conflict_retries, **(resource_options or {}))
+        try:
+            result = resource.ensure_state(state, dict(desired_state) if desired_state else None,
+                                           update_method=update_method)
+            result['failed'] = False
+        except CriblAPIError as e:
+            result = {'changed': False, 'failed': True, 'msg': str(e)}
+        result['worker_group'] = worker_group
+        return result
+    
+    if worker_groups:
+        with ThreadPoolExecutor(max_workers=min(parallelism, len(worker_groups))) as executor:
+            results = list(executor.map(reconcile, worker_groups))
+    else:
+        results = []
+    
+    changed_count = sum(1 for r in results if r['changed'])
+    failed_count = sum(1 for r in results if r['failed'])
+    failed_percentage = 100.0 * failed_count / len(results) if results else 0
+    return {
+        'changed': changed_count > 0,
+        'failed': failed_percentage > max_fail_percentage,
+        'msg': f'{resource_id}: {changed_count} of {len(results)} worker groups changed, {failed_count} failed',
+        'results': results,
+    }
 
 
 def create_declarative_module_args():
@@ -274,5 +715,37 @@ def create_declarative_module_args():
         timeout=dict(type='int', default=30),
         state=dict(type='str', default='present', choices=['present', 'absent']),
         worker_group=dict(type='str', required=False),
+        worker_groups=dict(type='list', elements='str', required=False),
+        parallelism=dict(type='int', default=8),
+        max_fail_percentage=dict(type='int', default=0),
+        state_file=dict(type='path', required=False, fallback=(env_fallback, ['CRIBL_STATE_FILE'])),
+        state_check_ttl=dict(type='int', default=0),
+        change_journal=dict(type='path', required=False, fallback=(env_fallback, ['CRIBL_CHANGE_JOURNAL'])),
+        conflict_retries=dict(type='int', default=3),
     )
 
+
+def create_state_store(module):
+    """
+    Create a state store from the module's state_file option.
+    
+    Returns:
+        CriblStateStore: Store instance, or None when no state file is configured
+    """
+    path = module.params.get('state_file')
+    if not path:
+        return None
+    return CriblStateStore(path, check_ttl=module.params.get('state_check_ttl') or 0)
+
+
+def create_change_journal(module):
+    """
+    Create a change journal from the module's change_journal option.
+    
+    Returns:
+        ChangeJournal: Journal instance, or None when no journal is configured
+    """
+    path = module.params.get('change_journal')
+    if not path:
+        return None
+    return ChangeJournal(path)
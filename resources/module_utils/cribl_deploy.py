@@ -0,0 +1,153 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+Commit and deploy helpers for Cribl worker groups.
+
+In distributed mode, changes made under C(/m/{worker_group}) only reach the
+workers after the group's configuration is committed and deployed.  The
+GroupDeployer batches that into one commit and one deploy per group.
+"""
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .cribl_api import CriblAPIError
+from .cribl_state import get_scope_version
+
+
+def _first_item(response):
+    """Unwrap the first element of a Cribl C({count, items}) response."""
+    if isinstance(response, dict) and 'items' in response:
+        items = response.get('items') or []
+        return items[0] if items else {}
+    return response if isinstance(response, dict) else {}
+
+
+def _same_version(deployed, committed):
+    """Compare config versions, which may be abbreviated commit IDs."""
+    if not deployed or not committed:
+        return False
+    return deployed.startswith(committed) or committed.startswith(deployed)
+
+
+class GroupDeployer:
+    """Commit and deploy worker groups concurrently."""
+
+    def __init__(self, client, message, parallelism=8, deploy=True, wait=True,
+                 deploy_timeout=300, poll_interval=1.0, max_poll_interval=10.0,
+                 check_mode=False, state_store=None):
+        """
+        Initialize the deployer.
+
+        Args:
+            client: CriblAPIClient instance shared by all workers
+            message: Commit message
+            parallelism: Maximum number of groups processed concurrently
+            deploy: Deploy the commit after committing
+            wait: Wait for the workers to pick up the deployed version
+            deploy_timeout: Seconds to wait for a deploy to complete
+            poll_interval: Initial seconds between deploy status checks
+            max_poll_interval: Upper bound of the exponential poll backoff
+            check_mode: Report what would be done without changing anything
+            state_store: Optional CriblStateStore whose entries are carried over
+                to each group's deployed config version once the deploy is
+                complete (only when deploying and waiting)
+        """
+        self.client = client
+        self.message = message
+        self.parallelism = max(1, parallelism)
+        self.deploy = deploy
+        self.wait = wait
+        self.deploy_timeout = deploy_timeout
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.check_mode = check_mode
+        self.state_store = state_store
+        if hasattr(client, 'set_pool_size'):
+            client.set_pool_size(self.parallelism)
+
+    def commit(self, worker_group):
+        """
+        Commit pending configuration changes of a worker group.
+
+        Returns:
+            str: The commit ID, or None when there was nothing to commit
+        """
+        response = self.client.post('/version/commit', data={
+            'message': self.message,
+            'group': worker_group,
+        })
+        return _first_item(response).get('commit')
+
+    def deploy_version(self, worker_group, version):
+        """Deploy a committed version to a worker group."""
+        return self.client.patch(f'/master/groups/{worker_group}/deploy', data={'version': version})
+
+    def wait_for_deploy(self, worker_group, version):
+        """
+        Poll the worker group until the version is deployed, backing off exponentially.
+
+        Raises:
+            CriblAPIError: If the deploy does not complete within deploy_timeout
+        """
+        deadline = time.time() + self.deploy_timeout
+        interval = self.poll_interval
+        while True:
+            group = _first_item(self.client.get(f'/master/groups/{worker_group}'))
+            if _same_version(group.get('configVersion'), version) and not group.get('deployingWorkerCount'):
+                return group
+            if time.time() + interval > deadline:
+                raise CriblAPIError(
+                    f"Timed out after {self.deploy_timeout}s waiting for {worker_group} to deploy {version}")
+            time.sleep(interval)
+            interval = min(interval * 2, self.max_poll_interval)
+
+    def run(self, worker_groups):
+        """
+        Commit and deploy each worker group once, concurrently.
+
+        Returns:
+            dict: changed, failed and per-group results
+        """
+        groups = sorted(set(worker_groups))
+        with ThreadPoolExecutor(max_workers=self.parallelism) as executor:
+            results = list(executor.map(self._process, groups))
+        return {
+            'changed': any(r['changed'] for r in results),
+            'failed': any(r['failed'] for r in results),
+            'results': results,
+        }
+
+    def _process(self, worker_group):
+        """Commit, deploy and wait for a single worker group."""
+        result = {'worker_group': worker_group, 'changed': False, 'failed': False,
+                  'commit': None, 'deployed': False}
+        if self.check_mode:
+            result.update(changed=True, msg=f'Would commit and deploy {worker_group}')
+            return result
+
+        try:
+            previous = get_scope_version(self.client, worker_group) if self.state_store is not None else None
+            version = self.commit(worker_group)
+            if not version:
+                result['msg'] = f'Nothing to commit in {worker_group}'
+                return result
+            result.update(changed=True, commit=version, msg=f'Committed {worker_group} at {version}')
+
+            if self.deploy:
+                self.deploy_version(worker_group, version)
+                if self.wait:
+                    group = self.wait_for_deploy(worker_group, version)
+                    # configVersion only moves once the deploy lands
+                    if self.state_store is not None:
+                        self.state_store.rebase(self.client, worker_group, previous, group.get('configVersion'))
+                result.update(deployed=True, msg=f'Committed and deployed {worker_group} at {version}')
+        except CriblAPIError as e:
+            result.update(failed=True, msg=f'Failed to commit and deploy {worker_group}: {str(e)}')
+        return result
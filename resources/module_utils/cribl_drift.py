@@ -0,0 +1,168 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+Read-only drift detection for Cribl Ansible modules.
+
+Lists each resource collection once per worker group, concurrently, and
+compares the listed resources with a desired-state tree.
+"""
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+from concurrent.futures import ThreadPoolExecutor
+
+from .cribl_api import CriblAPIError
+from .cribl_declarative import (
+    diff_states, is_not_found, resolve_worker_groups, resource_class_for, scoped_endpoint
+)
+from .cribl_resource_types import RESOURCE_TYPES
+
+
+def list_collection(client, endpoint, worker_group=None):
+    """
+    List every resource of a collection.
+
+    Returns:
+        list: Resource configurations, or None if the collection does not
+        exist in this scope
+    """
+    response = client.get_or_none(scoped_endpoint(endpoint, worker_group))
+    if response is None:
+        return None
+    if isinstance(response, dict):
+        return response.get('items', [])
+    return response or []
+
+
+class DriftScanner:
+    """Compare a desired-state tree with the live configuration, never writing."""
+
+    def __init__(self, client, parallelism=8):
+        """
+        Initialize the scanner.
+
+        Args:
+            client: CriblAPIClient instance shared by all workers
+            parallelism: Maximum number of concurrent list requests
+        """
+        self.client = client
+        self.parallelism = max(1, parallelism)
+        if hasattr(client, 'set_pool_size'):
+            client.set_pool_size(self.parallelism)
+
+    def scan(self, tree, worker_groups=None, resource_types=None, report_unmanaged=False):
+        """
+        Scan for drift.
+
+        Args:
+            tree: Worker group (None for global) to desired-state document,
+                as returned by read_desired_tree
+            worker_groups: Scopes to scan (defaults to every worker group on the
+                leader plus the scopes in the tree)
+            resource_types: Resource types to scan (defaults to the types in
+                each scope's document, or all types with report_unmanaged)
+            report_unmanaged: Also report live resources missing from the tree
+
+        Returns:
+            dict: summary counts, per-resource drift entries and listing errors
+        """
+        scopes = self._default_scopes(tree) if worker_groups is None else list(worker_groups)
+        tasks = []
+        for scope in scopes:
+            document = tree.get(scope, {})
+            if resource_types is not None:
+                types = list(resource_types)
+            elif report_unmanaged:
+                types = list(RESOURCE_TYPES)
+            else:
+                types = list(document)
+            for resource_type in types:
+                tasks.append((scope, resource_type, document.get(resource_type, [])))
+
+        with ThreadPoolExecutor(max_workers=self.parallelism) as executor:
+            outcomes = list(executor.map(lambda task: self._scan_collection(*task, report_unmanaged), tasks))
+
+        summary = {'in_sync': 0, 'drifted': 0, 'missing': 0, 'unmanaged': 0, 'errors': 0}
+        drift = []
+        errors = []
+        for in_sync, entries, error in outcomes:
+            summary['in_sync'] += in_sync
+            for entry in entries:
+                summary[entry['status']] += 1
+                drift.append(entry)
+            if error:
+                summary['errors'] += 1
+                errors.append(error)
+        return {'summary': summary, 'drift': drift, 'errors': errors}
+
+    def _default_scopes(self, tree):
+        """Return the global scope (if in the tree), every group on the leader, then the tree's other groups."""
+        try:
+            groups = resolve_worker_groups(self.client, ['all'])
+        except CriblAPIError as e:
+            # Single-instance deployments have no worker groups
+            if not is_not_found(e):
+                raise
+            groups = []
+        scopes = [None] if None in tree else []
+        scopes.extend(groups)
+        scopes.extend(scope for scope in tree if scope not in scopes)
+        return scopes
+
+    def _scan_collection(self, worker_group, resource_type, desired_items, report_unmanaged):
+        """List one collection and compare it with its desired items."""
+        spec = RESOURCE_TYPES[resource_type]
+        id_param = spec['id_param']
+        try:
+            live_items = list_collection(self.client, spec['endpoint'], worker_group)
+        except CriblAPIError as e:
+            return 0, [], {'worker_group': worker_group, 'type': resource_type, 'msg': str(e)}
+        if live_items is None:
+            if not desired_items:
+                return 0, [], None
+            live_items = []
+
+        live = dict((item.get(id_param, item.get('id')), item) for item in live_items
+                    if isinstance(item, dict))
+        in_sync = 0
+        entries = []
+        for desired in desired_items:
+            if desired.get('state', 'present') == 'absent':
+                desired_id = desired.get(id_param)
+                if desired_id in live:
+                    entries.append(self._entry(worker_group, resource_type, desired_id, 'drifted',
+                                               {'state': {'before': 'present', 'after': 'absent'}}))
+                else:
+                    in_sync += 1
+                continue
+            desired = dict((k, v) for k, v in desired.items() if k != 'state')
+            resource_id = desired.get(id_param)
+            current = live.get(resource_id)
+            if current is None:
+                entries.append(self._entry(worker_group, resource_type, resource_id, 'missing'))
+                continue
+            # Ask the resource class, so drift agrees with what an apply would change
+            resource = resource_class_for(spec['endpoint'])(
+                None, self.client, resource_id, spec['endpoint'], worker_group=worker_group)
+            if resource.needs_update(current, desired):
+                entries.append(self._entry(worker_group, resource_type, resource_id, 'drifted',
+                                           diff_states(current, desired)))
+            else:
+                in_sync += 1
+
+        if report_unmanaged:
+            managed = set(item.get(id_param) for item in desired_items)
+            for resource_id in sorted(set(live) - managed, key=str):
+                entries.append(self._entry(worker_group, resource_type, resource_id, 'unmanaged'))
+        return in_sync, entries, None
+
+    @staticmethod
+    def _entry(worker_group, resource_type, resource_id, status, diff=None):
+        entry = {'worker_group': worker_group, 'type': resource_type, 'id': resource_id, 'status': status}
+        if diff:
+            entry['diff'] = diff
+        return entry
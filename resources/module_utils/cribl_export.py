@@ -0,0 +1,178 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+Configuration export for Cribl Ansible modules.
+
+Lists every resource collection once per worker group, concurrently, and
+writes one normalized file per resource in the desired-state tree layout
+read by cribl_config.read_desired_tree, so an export can be applied again.
+"""
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import yaml
+
+from .cribl_api import CriblAPIError
+from .cribl_config import DESIRED_FILE_EXTENSIONS, GLOBAL_SCOPE
+from .cribl_declarative import METADATA_FIELDS, normalize_state
+from .cribl_drift import list_collection
+from .cribl_resource_types import RESOURCE_TYPES
+
+
+# Server-maintained fields left out of exported files (the ID is kept)
+EXPORT_IGNORED_FIELDS = tuple(f for f in METADATA_FIELDS if f != 'id')
+
+EXPORT_FORMATS = {'yaml': '.yml', 'json': '.json'}
+
+
+def render_resource(resource, fmt='yaml'):
+    """Render a resource as stably sorted YAML or JSON text."""
+    data = normalize_state(dict((k, v) for k, v in resource.items() if k not in EXPORT_IGNORED_FIELDS))
+    if fmt == 'json':
+        return json.dumps(data, indent=2, sort_keys=True) + '\n'
+    return yaml.safe_dump(data, default_flow_style=False, sort_keys=True)
+
+
+def resource_file_name(resource_id, fmt='yaml'):
+    """Return a file name for a resource ID that is safe on every platform."""
+    return re.sub(r'[^A-Za-z0-9_.@-]', '_', str(resource_id)) + EXPORT_FORMATS[fmt]
+
+
+def content_hash(data):
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+def file_hash(path):
+    """Return the content hash of a file, or None if it does not exist."""
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def write_text_atomic(path, data):
+    """Write text to a file via a temporary file and rename."""
+    directory = os.path.dirname(os.path.abspath(path))
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class ConfigExporter:
+    """Snapshot the live configuration of worker groups to a directory tree."""
+
+    def __init__(self, client, root, fmt='yaml', parallelism=8, prune=False, check_mode=False):
+        """
+        Initialize the exporter.
+
+        Args:
+            client: CriblAPIClient instance shared by all workers
+            root: Directory the tree is written to
+            fmt: File format, 'yaml' or 'json'
+            parallelism: Maximum number of concurrent list requests
+            prune: Remove files of resources that no longer exist
+            check_mode: Report what would change without writing
+        """
+        self.client = client
+        self.root = root
+        self.fmt = fmt
+        self.parallelism = max(1, parallelism)
+        self.prune = prune
+        self.check_mode = check_mode
+        if hasattr(client, 'set_pool_size'):
+            client.set_pool_size(self.parallelism)
+
+    def export(self, worker_groups, resource_types=None):
+        """
+        Export resources.
+
+        Each collection is written as soon as it has been listed, so only one
+        collection per worker is held in memory.
+
+        Args:
+            worker_groups: Scopes to export (None for global resources)
+            resource_types: Resource types to export (defaults to every
+                registered type with a fixed endpoint)
+
+        Returns:
+            dict: summary counts, changed files and listing errors
+        """
+        if resource_types is None:
+            resource_types = [t for t, spec in sorted(RESOURCE_TYPES.items()) if '{' not in spec['endpoint']]
+        jobs = [(scope, resource_type) for scope in worker_groups for resource_type in resource_types]
+
+        with ThreadPoolExecutor(max_workers=self.parallelism) as executor:
+            results = list(executor.map(self._export_collection, jobs))
+
+        summary = {'resources': 0, 'added': 0, 'updated': 0, 'unchanged': 0, 'removed': 0, 'errors': 0}
+        files = []
+        errors = []
+        for result in results:
+            if 'error' in result:
+                summary['errors'] += 1
+                errors.append(result['error'])
+                continue
+            summary['resources'] += result['resources']
+            summary['unchanged'] += result['unchanged']
+            for change in result['files']:
+                summary[change['status']] += 1
+                files.append(change)
+        return {'summary': summary, 'files': files, 'errors': errors}
+
+    def _export_collection(self, job):
+        """List one collection in one scope and write its files."""
+        scope, resource_type = job
+        spec = RESOURCE_TYPES[resource_type]
+        try:
+            items = list_collection(self.client, spec['endpoint'], scope)
+        except CriblAPIError as e:
+            return {'error': {'worker_group': scope, 'type': resource_type, 'msg': str(e)}}
+
+        result = {'resources': 0, 'unchanged': 0, 'files': []}
+        if items is None:
+            # The collection does not exist in this scope
+            return result
+
+        directory = os.path.join(self.root, scope or GLOBAL_SCOPE, resource_type)
+        written = set()
+        for item in items:
+            resource_id = item.get(spec['id_param']) if isinstance(item, dict) else None
+            if resource_id is None:
+                continue
+            result['resources'] += 1
+            name = resource_file_name(resource_id, self.fmt)
+            written.add(name)
+            path = os.path.join(directory, name)
+            data = render_resource(item, self.fmt)
+            existing = file_hash(path)
+            if existing == content_hash(data):
+                result['unchanged'] += 1
+                continue
+            if not self.check_mode:
+                write_text_atomic(path, data)
+            result['files'].append({'path': path, 'status': 'added' if existing is None else 'updated'})
+
+        if self.prune and os.path.isdir(directory):
+            for name in sorted(os.listdir(directory)):
+                if name in written or os.path.splitext(name)[1] not in DESIRED_FILE_EXTENSIONS:
+                    continue
+                path = os.path.join(directory, name)
+                if not self.check_mode:
+                    os.remove(path)
+                result['files'].append({'path': path, 'status': 'removed'})
+        return result
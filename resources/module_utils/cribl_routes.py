@@ -0,0 +1,184 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+Route table helpers for Cribl Ansible modules.
+
+Cribl keeps the routes of a worker group in a single route table
+(C(/routes/{id})) holding an ordered C(routes) array.  These helpers merge
+individual route entries into that array in memory so a whole set of
+entries can be applied with one read and one write.
+"""
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+from .cribl_api import CriblAPIError
+from .cribl_declarative import CONFLICT_STATUS_CODES, CriblResource, diff_states
+
+
+# Entry keys that place a route instead of configuring it
+POSITION_KEYS = ('position', 'before', 'after', 'state')
+
+
+def route_key(route):
+    """Return the key identifying a route entry (its name, or its ID)."""
+    return route.get('name') or route.get('id')
+
+
+def _index_of(routes, key):
+    for index, route in enumerate(routes):
+        if route_key(route) == key:
+            return index
+    return None
+
+
+def _target_index(routes, key, index, position, before, after):
+    """Return where a route should be inserted into routes (from which it was removed)."""
+    anchor = before or after
+    if anchor:
+        anchor_index = _index_of(routes, anchor)
+        if anchor_index is None:
+            raise CriblAPIError(f"Route '{key}' is positioned relative to unknown route '{anchor}'")
+        return anchor_index if before else anchor_index + 1
+    if position == 'first':
+        return 0
+    if position == 'last' or index is None:
+        return len(routes)
+    return index
+
+
+def merge_route_entries(routes, entries, purge=False):
+    """
+    Merge route entries into a route table's routes array.
+
+    Each entry is a route configuration identified by its C(name) (or C(id)).
+    Existing routes are updated in place with the fields set in the entry,
+    new routes are appended.  An entry may also set:
+
+        position: 'first' or 'last'
+        before / after: name of another route to place it next to
+        state: 'absent' to remove the route
+
+    Args:
+        routes: Current routes array
+        entries: Route entries, applied in order
+        purge: Remove routes not named in entries
+
+    Returns:
+        tuple: (merged routes array, dict of added/updated/moved/removed route keys)
+    """
+    table = [dict(route) for route in routes]
+    wanted = set()
+    for entry in entries:
+        config = dict((k, v) for k, v in entry.items() if k not in POSITION_KEYS and v is not None)
+        key = route_key(config)
+        if not key:
+            raise CriblAPIError("Route entries require a name or id")
+        if entry.get('position') not in (None, 'first', 'last'):
+            raise CriblAPIError(f"Invalid position '{entry['position']}' for route '{key}'")
+        if entry.get('before') and entry.get('after'):
+            raise CriblAPIError(f"Route '{key}' cannot set both before and after")
+
+        index = _index_of(table, key)
+        if entry.get('state', 'present') == 'absent':
+            if index is not None:
+                table.pop(index)
+            continue
+
+        wanted.add(key)
+        if index is None:
+            route = config
+            route.setdefault('id', key)
+        else:
+            route = table.pop(index)
+            route.update(config)
+        table.insert(_target_index(table, key, index, entry.get('position'),
+                                   entry.get('before'), entry.get('after')), route)
+
+    if purge:
+        table = [route for route in table if route_key(route) in wanted]
+
+    return table, summarize_route_changes(routes, table)
+
+
+def summarize_route_changes(before, after):
+    """
+    Describe the differences between two routes arrays.
+
+    Returns:
+        dict: Lists of added, updated, moved and removed route keys
+    """
+    old = dict((route_key(r), r) for r in before)
+    new = dict((route_key(r), r) for r in after)
+    common = [route_key(r) for r in after if route_key(r) in old]
+    old_order = [route_key(r) for r in before if route_key(r) in new]
+    return {
+        'added': [k for k in new if k not in old],
+        'updated': [k for k in common if diff_states(old[k], new[k]) or diff_states(new[k], old[k])],
+        'moved': [k for k, j in zip(common, old_order) if k != j],
+        'removed': [k for k in old if k not in new],
+    }
+
+
+class RouteTable:
+    """Apply route entries to a route table with one read and one write."""
+
+    def __init__(self, module, client, table_id='default', worker_group=None,
+                 conflict_retries=3, change_journal=None):
+        """
+        Initialize the route table.
+
+        Args:
+            module: Ansible module instance (used for check mode)
+            client: CriblAPIClient instance
+            table_id: Route table ID
+            worker_group: Optional worker group ID
+            conflict_retries: Number of times the merge is redone on a fresh table
+                when the server rejects the write with a conflict
+            change_journal: Optional ChangeJournal recording changed worker groups
+        """
+        self.module = module
+        self.conflict_retries = conflict_retries
+        # The table read by apply() is written as is; conflicts are re-merged here
+        self.resource = CriblResource(module, client, table_id, '/routes', worker_group=worker_group,
+                                      raise_errors=True, change_journal=change_journal,
+                                      conflict_retries=0)
+
+    def apply(self, entries, purge=False):
+        """
+        Merge entries into the table and write it once if anything changed.
+
+        Returns:
+            dict: Result with changed, msg, changes and routes keys
+        """
+        resource = self.resource
+        attempt = 0
+        while True:
+            current = resource.get_current_state()
+            if current is None:
+                raise CriblAPIError(f"Route table '{resource.resource_id}' does not exist")
+
+            routes, changes = merge_route_entries(current.get('routes') or [], entries, purge=purge)
+            result = {'changed': any(changes.values()), 'changes': changes, 'routes': routes}
+            if not result['changed']:
+                result['msg'] = f"Route table {resource.resource_id} already in desired state"
+                return result
+            result['diff'] = {'before': {'routes': current.get('routes') or []}, 'after': {'routes': routes}}
+            if self.module.check_mode:
+                result['msg'] = f"Would update route table {resource.resource_id}"
+                return result
+
+            table = dict(current)
+            table['routes'] = routes
+            try:
+                resource.update_resource(current, table, 'PATCH')
+            except CriblAPIError as e:
+                if e.status_code not in CONFLICT_STATUS_CODES or attempt >= self.conflict_retries:
+                    raise
+                attempt += 1
+                continue
+            result['msg'] = f"Updated route table {resource.resource_id}"
+            return result
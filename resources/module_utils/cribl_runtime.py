@@ -0,0 +1,164 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+Generic runtime for the generated imperative Cribl modules.
+
+Each generated module only carries its documentation and a compact spec of
+the API operation it wraps:
+
+    MODULE_SPEC = {
+        'endpoint': '/system/inputs/{id}',
+        'method': 'PATCH',
+        'params': {
+            'id': dict(type='str', required=True, location='path'),
+            'type': dict(type='str', required=False, location='body'),
+        },
+    }
+
+Argument spec construction, path substitution and the API call are done
+here, once, instead of being repeated in every module.
+"""
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+from .cribl_api import CriblAPIClient, CriblAPIError
+
+
+# Options shared by every imperative module
+COMMON_ARGS = dict(
+    session=dict(type='dict', required=False),
+    base_url=dict(type='str', required=False),
+    token=dict(type='str', required=False, no_log=True),
+    validate_certs=dict(type='bool', default=False),
+    timeout=dict(type='int', default=30),
+    state=dict(type='str', default='present', choices=['present', 'absent']),
+    worker_group=dict(type='str', required=False),
+)
+
+# Keys of a MODULE_SPEC parameter that are not AnsibleModule options
+SPEC_ONLY_KEYS = ('location',)
+
+# Methods that only read, so never report a change
+READ_METHODS = ('GET',)
+
+
+def argument_spec(spec):
+    """Return the argument_spec of a module spec: common options plus its parameters."""
+    arguments = dict(COMMON_ARGS)
+    for name, param in spec.get('params', {}).items():
+        arguments[name] = dict((key, value) for key, value in param.items() if key not in SPEC_ONLY_KEYS)
+    return arguments
+
+
+def module_args(spec):
+    """Return the AnsibleModule keyword arguments of a module spec."""
+    return dict(
+        argument_spec=argument_spec(spec),
+        required_one_of=[['session', 'token']],
+        mutually_exclusive=[['session', 'base_url']],
+        supports_check_mode=True,
+    )
+
+
+def build_endpoint(spec, params):
+    """
+    Return the endpoint of a call: worker group prefix and path parameters substituted.
+
+    Args:
+        spec: Module spec
+        params: Module parameters
+
+    Raises:
+        CriblAPIError: If a path parameter is not set
+    """
+    endpoint = spec['endpoint']
+    worker_group = params.get('worker_group')
+    if worker_group:
+        endpoint = f"/m/{worker_group}{endpoint}"
+    for name, param in spec.get('params', {}).items():
+        if param.get('location') == 'path':
+            if params.get(name) is None:
+                raise CriblAPIError(f"Missing path parameter: {name}")
+            endpoint = endpoint.replace('{' + name + '}', str(params[name]))
+    return endpoint
+
+
+def build_data(spec, params):
+    """Return the parameters sent with the call (everything but path parameters that was set)."""
+    data = {}
+    for name, param in spec.get('params', {}).items():
+        if param.get('location') != 'path' and params.get(name) is not None:
+            data[name] = params[name]
+    return data
+
+
+def call(client, method, endpoint, data):
+    """
+    Perform an API call.
+
+    GET sends the data as query parameters, DELETE sends none.
+
+    Returns:
+        Tuple of (response, changed)
+    """
+    method = method.upper()
+    if method == 'GET':
+        response = client.get(endpoint, params=data if data else None)
+    elif method == 'DELETE':
+        response = client.delete(endpoint)
+    elif method in ('POST', 'PUT', 'PATCH'):
+        response = getattr(client, method.lower())(endpoint, data=data if data else None)
+    else:
+        raise CriblAPIError(f"Unsupported method: {method}")
+    return response, method not in READ_METHODS
+
+
+def run_module(module, spec, client=None):
+    """
+    Perform the module's API call and exit the module.
+
+    Args:
+        module: AnsibleModule created with module_args(spec)
+        spec: Module spec
+        client: Optional CriblAPIClient shared between tasks
+    """
+    params = module.params
+    method = spec['method'].upper()
+
+    try:
+        # Initialize client with session or token
+        if client is None and params.get('session'):
+            client = CriblAPIClient(session=params['session'])
+        elif client is None:
+            client = CriblAPIClient(
+                base_url=params.get('base_url'),
+                token=params.get('token'),
+                validate_certs=params['validate_certs'],
+                timeout=params['timeout']
+            )
+
+        endpoint = build_endpoint(spec, params)
+        data = build_data(spec, params)
+
+        if module.check_mode:
+            module.exit_json(
+                changed=True,
+                msg=f"Check mode: Would perform {method} request to {endpoint}",
+                endpoint=endpoint
+            )
+
+        response, changed = call(client, method, endpoint, data)
+        module.exit_json(
+            changed=changed,
+            msg=f"{method} request to {endpoint} successful",
+            response=response
+        )
+
+    except CriblAPIError as e:
+        module.fail_json(msg=str(e))
+    except Exception as e:
+        module.fail_json(msg=f"Unexpected error: {str(e)}")
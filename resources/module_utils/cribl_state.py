@@ -0,0 +1,388 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+Local state tracking for Cribl Ansible modules.
+
+Provides content hashing, cheap worker group version checks and a local
+state file that lets the declarative layer skip reads of resources whose
+desired state has not changed since they were last applied.
+"""
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import fcntl
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+from .cribl_api import CriblAPIError
+
+
+def state_hash(state):
+    """
+    Return a content hash of a resource state.
+
+    Returns:
+        str: sha256 of the canonical JSON encoding, or None for a missing resource
+    """
+    if state is None:
+        return None
+    encoded = json.dumps(state, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def get_scope_version(client, worker_group):
+    """
+    Return the config version of a worker group.
+
+    This is a single cheap request used to detect whether anything in the
+    group moved since it was last observed.
+
+    Returns:
+        str: The group's configVersion, or None when unavailable
+    """
+    if not worker_group:
+        return None
+    try:
+        response = client.get(f"/master/groups/{worker_group}")
+    except CriblAPIError:
+        return None
+    if isinstance(response, dict) and 'items' in response:
+        items = response.get('items') or []
+        response = items[0] if items else {}
+    if not isinstance(response, dict):
+        return None
+    return response.get('configVersion')
+
+
+def write_json_atomic(path, data):
+    """Write JSON to a file via a temporary file and rename."""
+    directory = os.path.dirname(os.path.abspath(path))
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.' + os.path.basename(path))
+    with os.fdopen(fd, 'w') as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+    os.rename(tmp_path, path)
+
+
+class StateFileLock:
+    """Context manager holding an exclusive lock next to a state file."""
+
+    def __init__(self, path):
+        self.lock_path = path + '.lock'
+        self.fd = None
+
+    def __enter__(self):
+        directory = os.path.dirname(os.path.abspath(self.lock_path))
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        self.fd = open(self.lock_path, 'w')
+        fcntl.flock(self.fd, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        fcntl.flock(self.fd, fcntl.LOCK_UN)
+        self.fd.close()
+
+
+def read_json(path, default):
+    """Read a JSON file, returning default when it is missing or unreadable."""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (IOError, OSError, ValueError):
+        return default
+
+
+class CriblStateStore:
+    """
+    Fingerprints of resources applied by the declarative layer.
+
+    Each entry maps (leader, worker group, endpoint, id) to the hash of the
+    desired state that was applied, the server's version/updatedAt and the
+    worker group's config version at that time.  When the desired hash still
+    matches and the group's config version has not moved, the resource can be
+    reported unchanged without reading it.
+
+    The store also keeps the manifests of desired-state trees synchronized by
+    ConfigSync (see cribl_sync): per leader, worker group and tree, the hash
+    of every file last applied and the group's config version at that time.
+
+    Updates are kept in memory and merged into the file by save(), so one
+    store can be shared by concurrent workers.
+    """
+
+    FORMAT = 1
+
+    def __init__(self, path, check_ttl=0):
+        """
+        Initialize the store.
+
+        Args:
+            path: Path of the JSON state file
+            check_ttl: Seconds a worker group version check stays valid across runs
+                (0 checks once per module run)
+        """
+        self.path = path
+        self.check_ttl = check_ttl
+        self._lock = threading.Lock()
+        self._data = None
+        self._pending = {}
+        self._scopes = {}
+        self._pending_scopes = {}
+        self._pending_syncs = {}
+
+    @staticmethod
+    def key(base_url, worker_group, endpoint, resource_id):
+        """Build the entry key for a resource."""
+        return '|'.join([base_url or '', worker_group or '', endpoint, str(resource_id)])
+
+    @staticmethod
+    def sync_key(base_url, worker_group, root):
+        """Build the manifest key for a desired-state tree synchronized to a worker group."""
+        return '|'.join([base_url or '', worker_group or '', os.path.abspath(root)])
+
+    def _read(self):
+        data = read_json(self.path, {})
+        if data.get('format') != self.FORMAT:
+            data = {'format': self.FORMAT, 'resources': {}, 'scopes': {}}
+        data.setdefault('syncs', {})
+        return data
+
+    def _load(self):
+        if self._data is None:
+            self._data = self._read()
+        return self._data
+
+    def lookup(self, key):
+        """Return the stored entry for a key, or None."""
+        with self._lock:
+            if key in self._pending:
+                return self._pending[key]
+            return self._load()['resources'].get(key)
+
+    def scope_version(self, client, worker_group):
+        """
+        Return the worker group's config version, checking the server at most once.
+
+        Results are cached for the lifetime of the store and, with check_ttl,
+        reused from the state file by later runs.
+        """
+        scope = '|'.join([getattr(client, 'base_url', '') or '', worker_group or ''])
+        with self._lock:
+            if scope in self._scopes:
+                return self._scopes[scope]
+            cached = self._load()['scopes'].get(scope)
+        if cached and self.check_ttl and time.time() - cached['checked_at'] < self.check_ttl:
+            version = cached['version']
+        else:
+            version = get_scope_version(client, worker_group)
+            with self._lock:
+                self._pending_scopes[scope] = {'version': version, 'checked_at': time.time()}
+        with self._lock:
+            self._scopes[scope] = version
+        return version
+
+    def is_unchanged(self, client, worker_group, endpoint, resource_id, desired_state):
+        """
+        Check whether a resource can be reported unchanged without reading it.
+
+        Returns:
+            bool: True when the desired state matches the last applied state and
+            the worker group has not moved since
+        """
+        entry = self.lookup(self.key(getattr(client, 'base_url', None), worker_group, endpoint, resource_id))
+        if not entry or entry.get('desired_hash') != state_hash(desired_state):
+            return False
+        version = self.scope_version(client, worker_group)
+        return version is not None and version == entry.get('scope_version')
+
+    def record(self, client, worker_group, endpoint, resource_id, desired_state, server_state=None):
+        """Record that a resource is in its desired state."""
+        version = self.scope_version(client, worker_group)
+        if version is None:
+            # Without a group version there is nothing cheap to verify against
+            return
+        server_state = server_state if isinstance(server_state, dict) else {}
+        entry = {
+            'desired_hash': state_hash(desired_state),
+            'server_version': server_state.get('version', server_state.get('updatedAt')),
+            'scope_version': version,
+            'recorded_at': time.time(),
+        }
+        key = self.key(getattr(client, 'base_url', None), worker_group, endpoint, resource_id)
+        with self._lock:
+            self._pending[key] = entry
+
+    def forget(self, client, worker_group, endpoint, resource_id):
+        """Forget a resource (e.g. after it was deleted)."""
+        key = self.key(getattr(client, 'base_url', None), worker_group, endpoint, resource_id)
+        with self._lock:
+            self._pending[key] = None
+
+    def sync_manifest(self, client, worker_group, root):
+        """
+        Return the manifest of a tree last synchronized to a worker group.
+
+        Returns:
+            dict: 'version' (the group's config version) and 'files' (relative
+            path to hash, type and ID), or None when the tree was never synchronized
+        """
+        key = self.sync_key(getattr(client, 'base_url', None), worker_group, root)
+        with self._lock:
+            if key in self._pending_syncs:
+                return self._pending_syncs[key]
+            return self._load()['syncs'].get(key)
+
+    def record_sync(self, client, worker_group, root, version, files):
+        """Record the manifest of a tree synchronized to a worker group."""
+        key = self.sync_key(getattr(client, 'base_url', None), worker_group, root)
+        with self._lock:
+            self._pending_syncs[key] = {'version': version, 'files': files, 'synced_at': time.time()}
+
+    def rebase(self, client, worker_group, old_version, new_version):
+        """
+        Move entries recorded at one worker group version to another.
+
+        Used after deploying a group, whose config version then moves
+        without the recorded resources having changed.  Tree manifests are
+        moved too, so the next synchronization only looks at changed files.
+        """
+        if old_version is None or new_version is None:
+            return
+        base_url = getattr(client, 'base_url', None)
+        prefix = '|'.join([base_url or '', worker_group or '', ''])
+        scope = '|'.join([base_url or '', worker_group or ''])
+        with self._lock:
+            entries = dict(self._load()['resources'])
+            entries.update(self._pending)
+            for key, entry in entries.items():
+                if key.startswith(prefix) and entry and entry.get('scope_version') == old_version:
+                    self._pending[key] = dict(entry, scope_version=new_version)
+            syncs = dict(self._load()['syncs'])
+            syncs.update(self._pending_syncs)
+            for key, entry in syncs.items():
+                if key.startswith(prefix) and entry.get('version') == old_version:
+                    self._pending_syncs[key] = dict(entry, version=new_version)
+            self._scopes[scope] = new_version
+            self._pending_scopes[scope] = {'version': new_version, 'checked_at': time.time()}
+
+    def save(self):
+        """Merge pending updates into the state file."""
+        with self._lock:
+            if not self._pending and not self._pending_scopes and not self._pending_syncs:
+                return
+            pending, self._pending = self._pending, {}
+            pending_scopes, self._pending_scopes = self._pending_scopes, {}
+            pending_syncs, self._pending_syncs = self._pending_syncs, {}
+
+        with StateFileLock(self.path):
+            data = self._read()
+            for key, entry in pending.items():
+                if entry is None:
+                    data['resources'].pop(key, None)
+                else:
+                    data['resources'][key] = entry
+            data['scopes'].update(pending_scopes)
+            data['syncs'].update(pending_syncs)
+            write_json_atomic(self.path, data)
+
+        with self._lock:
+            self._data = data
+
+
+class ChangeJournal:
+    """
+    Journal of worker groups with uncommitted changes.
+
+    Resources changed under a worker group are recorded by the declarative
+    layer so that a single commit and deploy can be made per group at the
+    end of a play (see the commit_deploy module).  Like CriblStateStore,
+    updates are kept in memory and merged into the file by save().
+    """
+
+    FORMAT = 1
+
+    def __init__(self, path):
+        """
+        Initialize the journal.
+
+        Args:
+            path: Path of the JSON journal file
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._pending = {}
+
+    @staticmethod
+    def key(base_url, worker_group):
+        """Build the entry key for a worker group."""
+        return '|'.join([base_url or '', worker_group])
+
+    def _read(self):
+        data = read_json(self.path, {})
+        if data.get('format') != self.FORMAT:
+            data = {'format': self.FORMAT, 'groups': {}}
+        return data
+
+    def record(self, base_url, worker_group, resource):
+        """Record that a resource (e.g. C(/m/default/routes/default)) changed in a worker group."""
+        if not worker_group:
+            return
+        key = self.key(base_url, worker_group)
+        with self._lock:
+            self._pending.setdefault(key, set()).add(resource)
+
+    def dirty_groups(self, base_url):
+        """
+        Return the worker groups with uncommitted changes on a leader.
+
+        Returns:
+            dict: Worker group ID to the sorted list of changed resources
+        """
+        prefix = self.key(base_url, '')
+        groups = {}
+        for key, entry in self._read()['groups'].items():
+            if key.startswith(prefix):
+                groups[key[len(prefix):]] = sorted(entry['resources'])
+        with self._lock:
+            for key, resources in self._pending.items():
+                if key.startswith(prefix):
+                    group = key[len(prefix):]
+                    groups[group] = sorted(set(groups.get(group, [])) | resources)
+        return groups
+
+    def save(self):
+        """Merge recorded changes into the journal file."""
+        with self._lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, {}
+
+        with StateFileLock(self.path):
+            data = self._read()
+            for key, resources in pending.items():
+                entry = data['groups'].setdefault(key, {'resources': []})
+                entry['resources'] = sorted(set(entry['resources']) | resources)
+                entry['updated_at'] = time.time()
+            write_json_atomic(self.path, data)
+
+    def clear(self, base_url, worker_groups):
+        """Remove worker groups from the journal once they are committed and deployed."""
+        keys = set(self.key(base_url, group) for group in worker_groups)
+        with self._lock:
+            for key in keys:
+                self._pending.pop(key, None)
+        with StateFileLock(self.path):
+            data = self._read()
+            for key in keys:
+                data['groups'].pop(key, None)
+            write_json_atomic(self.path, data)
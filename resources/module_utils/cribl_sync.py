@@ -0,0 +1,205 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+Incremental synchronization of desired-state trees for Cribl Ansible modules.
+
+Hashes every file of a tree laid out as read by cribl_config.read_desired_tree
+and compares the hashes with the manifest of the last synchronization kept in
+the state store.  Only changed files, or every file of a worker group whose
+config version moved, are parsed and reconciled.
+"""
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import hashlib
+import os
+
+from .cribl_config import (
+    DESIRED_FILE_EXTENSIONS,
+    GLOBAL_SCOPE,
+    ConfigApplier,
+    ConfigNode,
+    CriblConfigError,
+    _read_desired_file,
+    parse_document,
+    resolve_resource_type,
+)
+from .cribl_resource_types import RESOURCE_TYPES
+
+
+def scan_tree(root):
+    """
+    Hash every resource file of a desired-state tree without parsing it.
+
+    Returns:
+        dict: Worker group ID (None for global) to a mapping of file paths
+        relative to the group directory to (resource type, content hash)
+    """
+    if not os.path.isdir(root):
+        raise CriblConfigError(f"Desired-state directory {root} does not exist")
+
+    tree = {}
+    for scope in sorted(os.listdir(root)):
+        scope_dir = os.path.join(root, scope)
+        if scope.startswith('.') or not os.path.isdir(scope_dir):
+            continue
+        files = {}
+        for type_name in sorted(os.listdir(scope_dir)):
+            type_dir = os.path.join(scope_dir, type_name)
+            if type_name.startswith('.') or not os.path.isdir(type_dir):
+                continue
+            resource_type = resolve_resource_type(type_name)
+            for file_name in sorted(os.listdir(type_dir)):
+                if os.path.splitext(file_name)[1] not in DESIRED_FILE_EXTENSIONS:
+                    continue
+                with open(os.path.join(type_dir, file_name), 'rb') as f:
+                    digest = hashlib.sha256(f.read()).hexdigest()
+                files[f'{type_name}/{file_name}'] = (resource_type, digest)
+        tree[None if scope == GLOBAL_SCOPE else scope] = files
+    return tree
+
+
+class ConfigSync:
+    """Reconcile only the parts of a desired-state tree that changed since the last run."""
+
+    def __init__(self, module, client, root, state_store, parallelism=8, prune=False, full=False,
+                 change_journal=None, full_scopes=None):
+        """
+        Initialize the synchronizer.
+
+        Args:
+            module: Ansible module instance (used for check mode)
+            client: CriblAPIClient instance shared by all workers
+            root: Desired-state directory
+            state_store: CriblStateStore keeping the manifests
+            parallelism: Maximum number of concurrent API operations
+            prune: Delete resources whose files were removed from the tree
+            full: Reconcile every file, whatever the manifest says
+            change_journal: Optional ChangeJournal recording changed worker groups
+            full_scopes: Optional worker group IDs (None for global) whose every
+                file is reconciled, whatever the manifest says
+        """
+        self.module = module
+        self.client = client
+        self.root = root
+        self.state_store = state_store
+        self.parallelism = max(1, parallelism)
+        self.prune = prune
+        self.full = full
+        self.full_scopes = set(full_scopes or ())
+        self.change_journal = change_journal
+
+    def sync(self, worker_groups=None):
+        """
+        Synchronize the tree, one worker group directory after the other.
+
+        Args:
+            worker_groups: Optional worker group IDs (None for global) to limit
+                the synchronization to
+
+        Returns:
+            dict: Result with changed, failed, per-group summaries and
+            per-resource results
+        """
+        tree = scan_tree(self.root)
+        scopes = sorted(tree, key=lambda scope: (scope is not None, scope or ''))
+        if worker_groups is not None:
+            scopes = [scope for scope in scopes if scope in worker_groups]
+
+        groups = []
+        results = []
+        for scope in scopes:
+            summary, scope_results = self._sync_scope(scope, tree[scope])
+            groups.append(summary)
+            results.extend(scope_results)
+
+        return {
+            'changed': any(r.get('changed') for r in results),
+            'failed': any(r.get('failed') for r in results),
+            'groups': groups,
+            'results': results,
+        }
+
+    def _sync_scope(self, scope, files):
+        """Synchronize the files of one worker group directory."""
+        manifest = self.state_store.sync_manifest(self.client, scope, self.root) or {}
+        previous = manifest.get('files') or {}
+        version = self.state_store.scope_version(self.client, scope)
+
+        # Global resources have no config version, so server-side changes to them are
+        # never detected; only their files are compared unless the scope is reconciled in full
+        server_changed = scope is not None and (version is None or version != manifest.get('version'))
+        reconcile_all = self.full or scope in self.full_scopes or server_changed
+
+        nodes = []
+        node_files = {}
+        current = {}
+        for rel_path, (resource_type, digest) in sorted(files.items()):
+            entry = previous.get(rel_path)
+            if not reconcile_all and entry and entry['hash'] == digest:
+                current[(entry['type'], entry['id'])] = rel_path
+                continue
+
+            item = _read_desired_file(os.path.join(self.root, scope or GLOBAL_SCOPE, rel_path))
+            id_param = RESOURCE_TYPES[resource_type]['id_param']
+            item.setdefault(id_param, os.path.splitext(os.path.basename(rel_path))[0])
+            node = parse_document({resource_type: [item]})[0]
+            if node.key in node_files:
+                raise CriblConfigError(
+                    f"Duplicate resource {node.name} in {node_files[node.key]} and {rel_path}")
+            node_files[node.key] = rel_path
+            current[node.key] = rel_path
+            nodes.append(node)
+
+        removed = {}
+        for rel_path, entry in previous.items():
+            key = (entry['type'], entry['id'])
+            if key not in current:
+                removed[key] = rel_path
+        if self.prune:
+            nodes.extend(ConfigNode(t, i, None, 'absent') for t, i in sorted(removed))
+
+        if nodes:
+            applier = ConfigApplier(
+                self.module, self.client,
+                worker_group=scope,
+                parallelism=self.parallelism,
+                state_store=self.state_store,
+                change_journal=self.change_journal
+            )
+            results = applier.apply(nodes)['results']
+        else:
+            results = []
+
+        succeeded = set((r['type'], r['id']) for r in results if not r.get('failed') and not r.get('skipped'))
+        manifest_files = {}
+        for key, rel_path in current.items():
+            if key in node_files:
+                if key in succeeded:
+                    manifest_files[rel_path] = {'hash': files[rel_path][1], 'type': key[0], 'id': key[1]}
+            else:
+                manifest_files[rel_path] = previous[rel_path]
+        if self.prune:
+            # Deletions that did not succeed are retried by the next run
+            for key, rel_path in removed.items():
+                if key not in succeeded and rel_path not in files:
+                    manifest_files[rel_path] = previous[rel_path]
+
+        if not self.module.check_mode:
+            self.state_store.record_sync(self.client, scope, self.root, version, manifest_files)
+
+        for result in results:
+            result['worker_group'] = scope
+        summary = {
+            'worker_group': scope,
+            'files': len(files),
+            'reconciled': len(node_files),
+            'skipped': len(files) - len(node_files),
+            'removed': len(removed),
+            'server_changed': server_changed,
+        }
+        return summary, results
@@ -0,0 +1,238 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+---
+module: commit_deploy
+short_description: Commit and deploy Cribl worker groups once per play
+description:
+    - Commits the pending configuration of each worker group and deploys the commit to its workers.
+    - Worker groups are taken from C(worker_groups), or from the change journal written by declarative
+      modules and M(cribl.core.config_apply) tasks that ran with the same C(change_journal), so only
+      groups that were actually changed are committed.
+    - Makes one commit and one deploy per worker group, processing groups concurrently, and waits for
+      each deploy to complete, polling with exponential backoff.
+    - Supports check mode.
+version_added: "1.0.0"
+author:
+    - Cribl Ansible Collection Contributors
+extends_documentation_fragment:
+    - cribl.core.cribl
+options:
+    worker_groups:
+        description:
+            - Worker Group IDs to commit and deploy.
+            - If omitted, the worker groups recorded in C(change_journal) are used.
+        type: list
+        elements: str
+        required: false
+    change_journal:
+        description:
+            - Path of the change journal recording worker groups with uncommitted changes.
+            - Committed and deployed groups are removed from the journal.
+            - Can also be set with the C(CRIBL_CHANGE_JOURNAL) environment variable.
+        type: path
+        required: false
+    state_file:
+        description:
+            - Path of the state file used by declarative modules (see their C(state_file) option).
+            - Deploying moves a worker group's config version; entries recorded at the previous
+              version are carried over so unchanged resources are still skipped on the next run.
+            - Entries are only carried over when C(deploy) and C(wait) are enabled, once the deploy
+              has completed.
+            - Can also be set with the C(CRIBL_STATE_FILE) environment variable.
+        type: path
+        required: false
+    message:
+        description:
+            - Commit message.
+        type: str
+        default: Committed by Ansible
+    deploy:
+        description:
+            - Deploy the commit to the worker group after committing.
+        type: bool
+        default: true
+    wait:
+        description:
+            - Wait until the workers have picked up the deployed version.
+        type: bool
+        default: true
+    deploy_timeout:
+        description:
+            - Seconds to wait for each deploy to complete.
+        type: int
+        default: 300
+    parallelism:
+        description:
+            - Maximum number of worker groups committed and deployed concurrently.
+        type: int
+        default: 8
+requirements:
+    - python >= 3.6
+notes:
+    - Worker groups with nothing to commit are reported unchanged and not deployed.
+'''
+
+EXAMPLES = r'''
+- hosts: localhost
+  environment:
+    CRIBL_CHANGE_JOURNAL: "{{ playbook_dir }}/.cribl-changes.json"
+  tasks:
+    - name: Manage outputs in several worker groups
+      cribl.stream.output:
+        session: "{{ cribl_session.session }}"
+        worker_group: "{{ item.group }}"
+        id: "{{ item.id }}"
+        conf: "{{ item.conf }}"
+      loop: "{{ outputs }}"
+
+    - name: Commit and deploy every changed worker group once
+      cribl.core.commit_deploy:
+        session: "{{ cribl_session.session }}"
+        message: "Deploy outputs"
+
+- name: Commit and deploy explicit worker groups without waiting
+  cribl.core.commit_deploy:
+    session: "{{ cribl_session.session }}"
+    worker_groups:
+      - default
+      - edge
+    wait: false
+'''
+
+RETURN = r'''
+changed:
+    description: Whether any worker group was committed
+    type: bool
+    returned: always
+msg:
+    description: Summary of what was done
+    type: str
+    returned: always
+worker_groups:
+    description: Worker groups that were processed
+    type: list
+    elements: str
+    returned: always
+results:
+    description: Per worker group results
+    type: list
+    elements: dict
+    returned: always
+    sample: [{"worker_group": "default", "changed": true, "failed": false, "commit": "8c1f2e4", "deployed": true}]
+'''
+
+from ansible.module_utils.basic import AnsibleModule, env_fallback
+from ansible_collections.cribl.core.plugins.module_utils.cribl_api import (
+    CriblAPIClient,
+    CriblAPIError
+)
+from ansible_collections.cribl.core.plugins.module_utils.cribl_deploy import (
+    GroupDeployer
+)
+from ansible_collections.cribl.core.plugins.module_utils.cribl_state import (
+    ChangeJournal,
+    CriblStateStore
+)
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec=dict(
+            session=dict(type='dict', required=False),
+            base_url=dict(type='str', required=False),
+            token=dict(type='str', required=False, no_log=True),
+            validate_certs=dict(type='bool', default=False),
+            timeout=dict(type='int', default=30),
+            worker_groups=dict(type='list', elements='str', required=False),
+            change_journal=dict(type='path', required=False, fallback=(env_fallback, ['CRIBL_CHANGE_JOURNAL'])),
+            state_file=dict(type='path', required=False, fallback=(env_fallback, ['CRIBL_STATE_FILE'])),
+            message=dict(type='str', default='Committed by Ansible'),
+            deploy=dict(type='bool', default=True),
+            wait=dict(type='bool', default=True),
+            deploy_timeout=dict(type='int', default=300),
+            parallelism=dict(type='int', default=8),
+        ),
+        required_one_of=[['session', 'token'], ['worker_groups', 'change_journal']],
+        mutually_exclusive=[['session', 'base_url']],
+        supports_check_mode=True,
+    )
+
+    session = module.params.get('session')
+    base_url = module.params.get('base_url')
+    token = module.params.get('token')
+    validate_certs = module.params['validate_certs']
+    timeout = module.params['timeout']
+
+    try:
+        # Initialize client with session or token
+        if session:
+            client = CriblAPIClient(session=session)
+        else:
+            client = CriblAPIClient(
+                base_url=base_url,
+                token=token,
+                validate_certs=validate_certs,
+                timeout=timeout
+            )
+
+        journal = None
+        if module.params.get('change_journal'):
+            journal = ChangeJournal(module.params['change_journal'])
+
+        worker_groups = module.params.get('worker_groups')
+        if worker_groups is None:
+            worker_groups = sorted(journal.dirty_groups(client.base_url))
+
+        if not worker_groups:
+            module.exit_json(changed=False, msg='No worker groups with pending changes',
+                             worker_groups=[], results=[])
+
+        state_store = None
+        if module.params.get('state_file') and not module.check_mode:
+            state_store = CriblStateStore(module.params['state_file'])
+
+        deployer = GroupDeployer(
+            client,
+            module.params['message'],
+            parallelism=module.params['parallelism'],
+            deploy=module.params['deploy'],
+            wait=module.params['wait'],
+            deploy_timeout=module.params['deploy_timeout'],
+            check_mode=module.check_mode,
+            state_store=state_store
+        )
+        result = deployer.run(worker_groups)
+        if state_store is not None:
+            state_store.save()
+
+        if journal is not None and not module.check_mode:
+            done = [r['worker_group'] for r in result['results'] if not r['failed']]
+            if done:
+                journal.clear(client.base_url, done)
+
+        committed = sum(1 for r in result['results'] if r['commit'])
+        failed_count = sum(1 for r in result['results'] if r['failed'])
+        msg = f"Processed {len(worker_groups)} worker groups: {committed} committed, {failed_count} failed"
+
+        if result['failed']:
+            module.fail_json(msg=msg, changed=result['changed'], worker_groups=worker_groups,
+                             results=result['results'])
+
+        module.exit_json(msg=msg, changed=result['changed'], worker_groups=worker_groups,
+                         results=result['results'])
+
+    except CriblAPIError as e:
+        module.fail_json(msg=str(e))
+    except Exception as e:
+        module.fail_json(msg=f"Unexpected error: {str(e)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,266 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+---
+module: config_apply
+short_description: Apply a multi-type Cribl desired-state document or plan
+description:
+    - Declaratively manages many Cribl resources of different types in a single task.
+    - Either reconciles a desired-state document directly (C(config)) or executes a plan
+      file written by M(cribl.core.config_plan) (C(plan)).
+    - Builds a dependency graph from known reference fields (route C(output)/C(pipeline),
+      input C(pipeline) and C(connections)) so outputs and pipelines exist before the routes
+      and inputs that reference them, and secrets and certificates exist before inputs and outputs.
+    - Each level of the dependency graph is applied concurrently.
+    - Resources marked C(state=absent) are removed after all other changes, in reverse dependency order.
+    - Supports check mode and diff mode.
+version_added: "1.0.0"
+author:
+    - Cribl Ansible Collection Contributors
+extends_documentation_fragment:
+    - cribl.core.cribl
+options:
+    config:
+        description:
+            - Desired-state document mapping resource types to lists of resource configurations.
+            - Resource types are the declarative module names (e.g. C(output), C(pipeline), C(route)),
+              plural forms are accepted.
+            - Each item is the resource configuration as accepted by the Cribl API and must contain its ID.
+            - Set C(state=absent) on an item to remove the resource.
+            - Mutually exclusive with C(plan).
+        type: dict
+        required: false
+    plan:
+        description:
+            - Path to a plan file written by M(cribl.core.config_plan).
+            - The planned operations are executed without re-reading every resource.
+              The worker group's config version is checked once; only if it moved since
+              planning is each resource re-read and compared with the hash recorded in the plan.
+            - Resources modified after the plan was created fail instead of being overwritten.
+            - The plan must have been created against the same server and worker group.
+            - Mutually exclusive with C(config).
+        type: path
+        required: false
+    worker_group:
+        description:
+            - Worker Group ID to target for all resources in the document.
+            - If omitted, resources are managed globally (leader node or default context).
+            - With C(plan), defaults to the worker group recorded in the plan and must match it.
+        type: str
+        required: false
+    parallelism:
+        description:
+            - Maximum number of concurrent API operations within a dependency level.
+        type: int
+        default: 8
+    state_file:
+        description:
+            - Path of a local state file recording content hashes of applied resources.
+            - Resources whose desired state is unchanged since they were last applied are
+              reported unchanged without being read, as long as the worker group's config
+              version has not moved.
+            - Can also be set with the C(CRIBL_STATE_FILE) environment variable.
+            - Only used with C(config).
+        type: path
+        required: false
+    state_check_ttl:
+        description:
+            - Seconds a worker group config version check recorded in C(state_file) is reused
+              by later runs without asking the server again.
+            - C(0) checks once per task.
+        type: int
+        default: 0
+    change_journal:
+        description:
+            - Path of a change journal recording worker groups with uncommitted changes.
+            - Use M(cribl.core.commit_deploy) at the end of the play to commit and deploy each changed
+              worker group once.
+            - Can also be set with the C(CRIBL_CHANGE_JOURNAL) environment variable.
+        type: path
+        required: false
+requirements:
+    - python >= 3.6
+notes:
+    - References to resources not present in the document are assumed to exist already.
+    - When a resource fails, resources depending on it are skipped.
+'''
+
+EXAMPLES = r'''
+- name: Create authentication session
+  cribl.core.auth_session:
+    base_url: https://cribl.example.com
+    username: admin
+    password: secretpassword
+  register: cribl_session
+
+- name: Apply outputs, pipelines and routes in dependency order
+  cribl.stream.config_apply:
+    session: "{{ cribl_session.session }}"
+    worker_group: default
+    config:
+      output:
+        - id: s3_archive
+          type: s3
+          bucket: archive
+      pipeline:
+        - id: main
+          conf:
+            functions: []
+      route:
+        - id: default
+          routes:
+            - name: archive
+              filter: "true"
+              pipeline: main
+              output: s3_archive
+
+- name: Execute a reviewed plan
+  cribl.core.config_apply:
+    session: "{{ cribl_session.session }}"
+    plan: /tmp/cribl-plan.json
+'''
+
+RETURN = r'''
+changed:
+    description: Whether any resource was changed
+    type: bool
+    returned: always
+msg:
+    description: Summary of what was done
+    type: str
+    returned: always
+levels:
+    description: Resources grouped by dependency level, as C(type/id) strings
+    type: list
+    elements: list
+    returned: always
+verified:
+    description: Whether each planned resource was re-read because the worker group moved since planning
+    type: bool
+    returned: when plan is used
+results:
+    description: Per-resource results
+    type: list
+    elements: dict
+    returned: always
+    sample: [{"type": "output", "id": "s3_archive", "state": "present", "changed": true, "msg": "Created s3_archive"}]
+'''
+
+from ansible.module_utils.basic import AnsibleModule, env_fallback
+from ansible_collections.cribl.core.plugins.module_utils.cribl_api import (
+    CriblAPIClient,
+    CriblAPIError
+)
+from ansible_collections.cribl.core.plugins.module_utils.cribl_config import (
+    ConfigApplier,
+    dependency_levels,
+    parse_document,
+    read_plan
+)
+from ansible_collections.cribl.core.plugins.module_utils.cribl_declarative import (
+    create_change_journal,
+    create_state_store
+)
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec=dict(
+            session=dict(type='dict', required=False),
+            base_url=dict(type='str', required=False),
+            token=dict(type='str', required=False, no_log=True),
+            validate_certs=dict(type='bool', default=False),
+            timeout=dict(type='int', default=30),
+            config=dict(type='dict', required=False),
+            plan=dict(type='path', required=False),
+            worker_group=dict(type='str', required=False),
+            parallelism=dict(type='int', default=8),
+            state_file=dict(type='path', required=False, fallback=(env_fallback, ['CRIBL_STATE_FILE'])),
+            state_check_ttl=dict(type='int', default=0),
+            change_journal=dict(type='path', required=False, fallback=(env_fallback, ['CRIBL_CHANGE_JOURNAL'])),
+        ),
+        required_one_of=[['session', 'token'], ['config', 'plan']],
+        mutually_exclusive=[['session', 'base_url'], ['config', 'plan']],
+        supports_check_mode=True,
+    )
+
+    session = module.params.get('session')
+    base_url = module.params.get('base_url')
+    token = module.params.get('token')
+    validate_certs = module.params['validate_certs']
+    timeout = module.params['timeout']
+
+    try:
+        # Initialize client with session or token
+        if session:
+            client = CriblAPIClient(session=session)
+        else:
+            client = CriblAPIClient(
+                base_url=base_url,
+                token=token,
+                validate_certs=validate_certs,
+                timeout=timeout
+            )
+
+        extra = {}
+        change_journal = create_change_journal(module)
+        if module.params.get('plan'):
+            plan = read_plan(module.params['plan'])
+            applier = ConfigApplier(
+                module, client,
+                worker_group=module.params.get('worker_group') or plan.get('worker_group'),
+                parallelism=module.params['parallelism'],
+                change_journal=change_journal
+            )
+            levels = plan['levels']
+            result = applier.apply_plan(plan)
+            extra['verified'] = result['verified']
+            count = len(plan['operations'])
+        else:
+            nodes = parse_document(module.params['config'])
+            levels = [
+                [node.name for node in level]
+                for level in dependency_levels([n for n in nodes if n.state == 'present'])
+            ]
+
+            state_store = create_state_store(module)
+            applier = ConfigApplier(
+                module, client,
+                worker_group=module.params.get('worker_group'),
+                parallelism=module.params['parallelism'],
+                state_store=state_store,
+                change_journal=change_journal
+            )
+            result = applier.apply(nodes)
+            count = len(nodes)
+            if state_store is not None:
+                state_store.save()
+
+        if change_journal is not None:
+            change_journal.save()
+
+        changed_count = sum(1 for r in result['results'] if r.get('changed'))
+        failed_count = sum(1 for r in result['results'] if r.get('failed'))
+        msg = f"Applied {count} resources: {changed_count} changed, {failed_count} failed"
+
+        if result['failed']:
+            module.fail_json(msg=msg, changed=result['changed'], levels=levels,
+                             results=result['results'], **extra)
+
+        module.exit_json(msg=msg, changed=result['changed'], levels=levels,
+                         results=result['results'], **extra)
+
+    except CriblAPIError as e:
+        module.fail_json(msg=str(e))
+    except Exception as e:
+        module.fail_json(msg=f"Unexpected error: {str(e)}")
+
+
+if __name__ == '__main__':
+    main()
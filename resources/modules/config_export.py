@@ -0,0 +1,196 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+---
+module: config_export
+short_description: Export the Cribl configuration of worker groups to a directory
+description:
+    - Snapshots the live configuration to one file per resource, laid out as
+      C(<path>/<worker group>/<type>/<id>.yml), the layout read by M(cribl.core.drift_report).
+    - Lists each resource collection once per worker group, concurrently, and writes each
+      collection's files as soon as it is listed.
+    - Files are normalized (server timestamps removed, keys sorted), and files whose content
+      is unchanged are not rewritten, so exports can be committed to git and reviewed.
+version_added: "1.0.0"
+author:
+    - Cribl Ansible Collection Contributors
+extends_documentation_fragment:
+    - cribl.core.cribl
+options:
+    path:
+        description:
+            - Directory to export to. Created if missing.
+        type: path
+        required: true
+    worker_groups:
+        description:
+            - Worker groups to export. Use C(all) for every worker group on the leader and
+              C(_global) for resources outside worker groups.
+        type: list
+        elements: str
+        default: ['_global']
+    resource_types:
+        description:
+            - Resource types to export (the declarative module names, e.g. C(output), C(pipeline)).
+            - Defaults to every declarative resource type.
+        type: list
+        elements: str
+        required: false
+    format:
+        description:
+            - File format of the exported resources.
+        type: str
+        choices: ['yaml', 'json']
+        default: yaml
+    prune:
+        description:
+            - Remove files of resources that no longer exist from exported type directories.
+        type: bool
+        default: false
+    parallelism:
+        description:
+            - Maximum number of concurrent list requests.
+        type: int
+        default: 8
+requirements:
+    - python >= 3.6
+notes:
+    - Supports check mode; no files are written or removed.
+'''
+
+EXAMPLES = r'''
+- name: Back up every worker group
+  cribl.core.config_export:
+    session: "{{ cribl_session.session }}"
+    path: "{{ playbook_dir }}/backup"
+    worker_groups: [_global, all]
+    prune: true
+    parallelism: 16
+
+- name: Export pipelines and routes of one worker group as JSON
+  cribl.stream.config_export:
+    session: "{{ cribl_session.session }}"
+    path: /srv/cribl-config
+    worker_groups: [default]
+    resource_types: [pipeline, route]
+    format: json
+'''
+
+RETURN = r'''
+changed:
+    description: Whether any file was added, updated or removed
+    type: bool
+    returned: always
+msg:
+    description: Summary of the export
+    type: str
+    returned: always
+summary:
+    description: Number of exported resources, of added, updated, unchanged and removed files,
+        and of collections that could not be listed
+    type: dict
+    returned: always
+    sample: {"resources": 420, "added": 2, "updated": 1, "unchanged": 417, "removed": 0, "errors": 0}
+files:
+    description: Added, updated and removed files
+    type: list
+    elements: dict
+    returned: always
+    sample: [{"path": "backup/default/output/s3.yml", "status": "updated"}]
+errors:
+    description: Collections that could not be listed
+    type: list
+    elements: dict
+    returned: always
+'''
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.cribl.core.plugins.module_utils.cribl_api import (
+    CriblAPIClient,
+    CriblAPIError
+)
+from ansible_collections.cribl.core.plugins.module_utils.cribl_config import (
+    GLOBAL_SCOPE,
+    resolve_resource_type
+)
+from ansible_collections.cribl.core.plugins.module_utils.cribl_declarative import (
+    resolve_worker_groups
+)
+from ansible_collections.cribl.core.plugins.module_utils.cribl_export import (
+    ConfigExporter
+)
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec=dict(
+            session=dict(type='dict', required=False),
+            base_url=dict(type='str', required=False),
+            token=dict(type='str', required=False, no_log=True),
+            validate_certs=dict(type='bool', default=False),
+            timeout=dict(type='int', default=30),
+            path=dict(type='path', required=True),
+            worker_groups=dict(type='list', elements='str', default=[GLOBAL_SCOPE]),
+            resource_types=dict(type='list', elements='str', required=False),
+            format=dict(type='str', choices=['yaml', 'json'], default='yaml'),
+            prune=dict(type='bool', default=False),
+            parallelism=dict(type='int', default=8),
+        ),
+        required_one_of=[['session', 'token']],
+        mutually_exclusive=[['session', 'base_url']],
+        supports_check_mode=True,
+    )
+
+    session = module.params.get('session')
+    base_url = module.params.get('base_url')
+    token = module.params.get('token')
+    validate_certs = module.params['validate_certs']
+    timeout = module.params['timeout']
+
+    try:
+        # Initialize client with session or token
+        if session:
+            client = CriblAPIClient(session=session)
+        else:
+            client = CriblAPIClient(
+                base_url=base_url,
+                token=token,
+                validate_certs=validate_certs,
+                timeout=timeout
+            )
+
+        named = [g for g in module.params['worker_groups'] if g != GLOBAL_SCOPE]
+        worker_groups = resolve_worker_groups(client, named)
+        if GLOBAL_SCOPE in module.params['worker_groups']:
+            worker_groups.insert(0, None)
+
+        resource_types = None
+        if module.params.get('resource_types'):
+            resource_types = [resolve_resource_type(t) for t in module.params['resource_types']]
+
+        exporter = ConfigExporter(client, module.params['path'], fmt=module.params['format'],
+                                  parallelism=module.params['parallelism'],
+                                  prune=module.params['prune'], check_mode=module.check_mode)
+        report = exporter.export(worker_groups, resource_types=resource_types)
+
+        summary = report['summary']
+        msg = (f"Exported {summary['resources']} resources: {summary['added']} added, "
+               f"{summary['updated']} updated, {summary['unchanged']} unchanged, "
+               f"{summary['removed']} removed, {summary['errors']} collections not listed")
+
+        module.exit_json(changed=bool(report['files']), msg=msg, **report)
+
+    except CriblAPIError as e:
+        module.fail_json(msg=str(e))
+    except Exception as e:
+        module.fail_json(msg=f"Unexpected error: {str(e)}")
+
+
+if __name__ == '__main__':
+    main()
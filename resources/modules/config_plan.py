@@ -0,0 +1,168 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+---
+module: config_plan
+short_description: Compute the changes needed to reach a Cribl desired-state document
+description:
+    - Reads the current state of every resource in a multi-type desired-state document once
+      and computes the exact create, update and delete operations needed.
+    - Writes the operations to a JSON plan file together with content hashes of the observed
+      state and the worker group's config version.
+    - The plan can be reviewed and then executed with M(cribl.core.config_apply) using its
+      C(plan) option, which does not re-read every resource.
+    - Never modifies Cribl.
+version_added: "1.0.0"
+author:
+    - Cribl Ansible Collection Contributors
+extends_documentation_fragment:
+    - cribl.core.cribl
+options:
+    config:
+        description:
+            - Desired-state document, in the format accepted by M(cribl.core.config_apply).
+        type: dict
+        required: true
+    plan_file:
+        description:
+            - Path of the JSON plan file to write.
+            - Not written in check mode.
+        type: path
+        required: true
+    worker_group:
+        description:
+            - Worker Group ID to target for all resources in the document.
+            - If omitted, resources are managed globally (leader node or default context).
+        type: str
+        required: false
+    parallelism:
+        description:
+            - Maximum number of concurrent reads.
+        type: int
+        default: 8
+requirements:
+    - python >= 3.6
+notes:
+    - Resources that are already in their desired state are counted but not written to the plan.
+'''
+
+EXAMPLES = r'''
+- name: Plan changes for review
+  cribl.core.config_plan:
+    session: "{{ cribl_session.session }}"
+    worker_group: default
+    config: "{{ lookup('file', 'stream-config.yml') | from_yaml }}"
+    plan_file: /tmp/cribl-plan.json
+  register: cribl_plan
+
+- name: Apply the reviewed plan
+  cribl.core.config_apply:
+    session: "{{ cribl_session.session }}"
+    plan: /tmp/cribl-plan.json
+  when: cribl_plan.pending > 0
+'''
+
+RETURN = r'''
+changed:
+    description: Always false, planning never modifies Cribl
+    type: bool
+    returned: always
+msg:
+    description: Summary of the plan
+    type: str
+    returned: always
+pending:
+    description: Number of planned create, update and delete operations
+    type: int
+    returned: always
+summary:
+    description: Number of resources per action
+    type: dict
+    returned: always
+    sample: {"create": 1, "update": 2, "delete": 0, "noop": 40}
+plan:
+    description: The computed plan
+    type: dict
+    returned: always
+'''
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.cribl.core.plugins.module_utils.cribl_api import (
+    CriblAPIClient,
+    CriblAPIError
+)
+from ansible_collections.cribl.core.plugins.module_utils.cribl_config import (
+    ConfigPlanner,
+    parse_document,
+    write_plan
+)
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec=dict(
+            session=dict(type='dict', required=False),
+            base_url=dict(type='str', required=False),
+            token=dict(type='str', required=False, no_log=True),
+            validate_certs=dict(type='bool', default=False),
+            timeout=dict(type='int', default=30),
+            config=dict(type='dict', required=True),
+            plan_file=dict(type='path', required=True),
+            worker_group=dict(type='str', required=False),
+            parallelism=dict(type='int', default=8),
+        ),
+        required_one_of=[['session', 'token']],
+        mutually_exclusive=[['session', 'base_url']],
+        supports_check_mode=True,
+    )
+
+    session = module.params.get('session')
+    base_url = module.params.get('base_url')
+    token = module.params.get('token')
+    validate_certs = module.params['validate_certs']
+    timeout = module.params['timeout']
+
+    try:
+        # Initialize client with session or token
+        if session:
+            client = CriblAPIClient(session=session)
+        else:
+            client = CriblAPIClient(
+                base_url=base_url,
+                token=token,
+                validate_certs=validate_certs,
+                timeout=timeout
+            )
+
+        nodes = parse_document(module.params['config'])
+        planner = ConfigPlanner(
+            client,
+            worker_group=module.params.get('worker_group'),
+            parallelism=module.params['parallelism']
+        )
+        plan = planner.plan(nodes)
+
+        if not module.check_mode:
+            write_plan(module.params['plan_file'], plan)
+
+        summary = plan['summary']
+        pending = len(plan['operations'])
+        msg = (f"Plan: {summary['create']} to create, {summary['update']} to update, "
+               f"{summary['delete']} to delete, {summary['noop']} unchanged")
+
+        module.exit_json(changed=False, msg=msg, pending=pending, summary=summary, plan=plan)
+
+    except CriblAPIError as e:
+        module.fail_json(msg=str(e))
+    except Exception as e:
+        module.fail_json(msg=f"Unexpected error: {str(e)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,234 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+---
+module: config_sync
+short_description: Incrementally apply a Cribl desired-state directory
+description:
+    - Applies a desired-state directory laid out as C(<path>/<worker group>/<type>/<id>.yml), the
+      layout written by M(cribl.core.config_export) and read by M(cribl.core.drift_report).
+    - Hashes every file and compares it with the manifest of the last run kept in C(state_file).
+      Only files that changed are parsed and reconciled, unless the worker group's config version
+      moved since the last run, in which case every file of that group is reconciled.
+    - Resources of a worker group are applied concurrently in dependency order, like
+      M(cribl.core.config_apply).
+    - Resources outside worker groups (C(_global)) have no config version, so changes made to them
+      outside Ansible are not detected. They are reconciled when their files change, or always with
+      C(full) or C(full_worker_groups=[_global]).
+version_added: "1.0.0"
+author:
+    - Cribl Ansible Collection Contributors
+extends_documentation_fragment:
+    - cribl.core.cribl
+options:
+    path:
+        description:
+            - Desired-state directory, one resource configuration per file.
+            - Resource types are the declarative module names (e.g. C(output), C(pipeline)).
+            - A file may set C(state=absent) to remove its resource.
+        type: path
+        required: true
+    worker_groups:
+        description:
+            - Worker group directories to synchronize. Use C(_global) for resources outside worker groups.
+            - Defaults to every directory in C(path).
+        type: list
+        elements: str
+        required: false
+    prune:
+        description:
+            - Delete resources whose files were removed from C(path) since the last run.
+            - Without C(prune), such resources are left in place and forgotten.
+        type: bool
+        default: false
+    full:
+        description:
+            - Reconcile every file, whatever the manifest says.
+        type: bool
+        default: false
+    full_worker_groups:
+        description:
+            - Worker group directories whose every file is reconciled, whatever the manifest says.
+            - Use C(_global) to catch changes made outside Ansible to resources outside worker groups
+              without reconciling every worker group.
+        type: list
+        elements: str
+        required: false
+    parallelism:
+        description:
+            - Maximum number of concurrent API operations.
+        type: int
+        default: 8
+    state_file:
+        description:
+            - Local state file holding the manifest of the last run, shared with the declarative modules.
+            - Can also be set with the C(CRIBL_STATE_FILE) environment variable.
+        type: path
+        required: true
+    state_check_ttl:
+        description:
+            - Seconds a worker group config version check stays valid across runs.
+        type: int
+        default: 0
+    change_journal:
+        description:
+            - Journal file recording worker groups with uncommitted changes, for M(cribl.core.commit_deploy).
+            - Can also be set with the C(CRIBL_CHANGE_JOURNAL) environment variable.
+        type: path
+        required: false
+requirements:
+    - python >= 3.6
+notes:
+    - Supports check mode; the manifest is not updated.
+    - Use the same C(state_file) with M(cribl.core.commit_deploy), so that committing a worker group
+      does not cause the next run to reconcile every file of the group.
+'''
+
+EXAMPLES = r'''
+- name: Apply what changed in the repository since the last run
+  cribl.core.config_sync:
+    session: "{{ cribl_session.session }}"
+    path: "{{ playbook_dir }}/cribl"
+    state_file: "{{ playbook_dir }}/.cribl_state.json"
+    change_journal: "{{ playbook_dir }}/.cribl_journal.json"
+    prune: true
+
+- name: Commit and deploy the changed worker groups
+  cribl.stream.commit_deploy:
+    session: "{{ cribl_session.session }}"
+    state_file: "{{ playbook_dir }}/.cribl_state.json"
+    change_journal: "{{ playbook_dir }}/.cribl_journal.json"
+'''
+
+RETURN = r'''
+changed:
+    description: Whether any resource was changed
+    type: bool
+    returned: always
+msg:
+    description: Summary of the synchronization
+    type: str
+    returned: always
+groups:
+    description: Per worker group directory, the number of files, of reconciled, skipped and removed
+        files, and whether the group's config version moved since the last run
+    type: list
+    elements: dict
+    returned: always
+    sample: [{"worker_group": "default", "files": 420, "reconciled": 2, "skipped": 418,
+              "removed": 0, "server_changed": false}]
+results:
+    description: Per-resource results of the reconciled resources
+    type: list
+    elements: dict
+    returned: always
+'''
+
+from ansible.module_utils.basic import AnsibleModule, env_fallback
+from ansible_collections.cribl.core.plugins.module_utils.cribl_api import (
+    CriblAPIClient,
+    CriblAPIError
+)
+from ansible_collections.cribl.core.plugins.module_utils.cribl_config import (
+    GLOBAL_SCOPE
+)
+from ansible_collections.cribl.core.plugins.module_utils.cribl_declarative import (
+    create_change_journal,
+    create_state_store
+)
+from ansible_collections.cribl.core.plugins.module_utils.cribl_sync import (
+    ConfigSync
+)
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec=dict(
+            session=dict(type='dict', required=False),
+            base_url=dict(type='str', required=False),
+            token=dict(type='str', required=False, no_log=True),
+            validate_certs=dict(type='bool', default=False),
+            timeout=dict(type='int', default=30),
+            path=dict(type='path', required=True),
+            worker_groups=dict(type='list', elements='str', required=False),
+            prune=dict(type='bool', default=False),
+            full=dict(type='bool', default=False),
+            full_worker_groups=dict(type='list', elements='str', required=False),
+            parallelism=dict(type='int', default=8),
+            state_file=dict(type='path', required=True, fallback=(env_fallback, ['CRIBL_STATE_FILE'])),
+            state_check_ttl=dict(type='int', default=0),
+            change_journal=dict(type='path', required=False, fallback=(env_fallback, ['CRIBL_CHANGE_JOURNAL'])),
+        ),
+        required_one_of=[['session', 'token']],
+        mutually_exclusive=[['session', 'base_url']],
+        supports_check_mode=True,
+    )
+
+    session = module.params.get('session')
+    base_url = module.params.get('base_url')
+    token = module.params.get('token')
+    validate_certs = module.params['validate_certs']
+    timeout = module.params['timeout']
+
+    try:
+        # Initialize client with session or token
+        if session:
+            client = CriblAPIClient(session=session)
+        else:
+            client = CriblAPIClient(
+                base_url=base_url,
+                token=token,
+                validate_certs=validate_certs,
+                timeout=timeout
+            )
+
+        worker_groups = None
+        if module.params.get('worker_groups'):
+            worker_groups = [None if g == GLOBAL_SCOPE else g for g in module.params['worker_groups']]
+
+        full_scopes = [None if g == GLOBAL_SCOPE else g for g in module.params.get('full_worker_groups') or []]
+
+        state_store = create_state_store(module)
+        change_journal = create_change_journal(module)
+        syncer = ConfigSync(
+            module, client, module.params['path'], state_store,
+            parallelism=module.params['parallelism'],
+            prune=module.params['prune'],
+            full=module.params['full'],
+            change_journal=change_journal,
+            full_scopes=full_scopes
+        )
+        result = syncer.sync(worker_groups)
+
+        state_store.save()
+        if change_journal is not None:
+            change_journal.save()
+
+        reconciled = sum(g['reconciled'] for g in result['groups'])
+        skipped = sum(g['skipped'] for g in result['groups'])
+        changed_count = sum(1 for r in result['results'] if r.get('changed'))
+        failed_count = sum(1 for r in result['results'] if r.get('failed'))
+        msg = (f"Reconciled {reconciled} files ({skipped} unchanged skipped): "
+               f"{changed_count} changed, {failed_count} failed")
+
+        if result['failed']:
+            module.fail_json(msg=msg, changed=result['changed'], groups=result['groups'],
+                             results=result['results'])
+
+        module.exit_json(msg=msg, changed=result['changed'], groups=result['groups'],
+                         results=result['results'])
+
+    except CriblAPIError as e:
+        module.fail_json(msg=str(e))
+    except Exception as e:
+        module.fail_json(msg=f"Unexpected error: {str(e)}")
+
+
+if __name__ == '__main__':
+    main()
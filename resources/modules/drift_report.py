@@ -0,0 +1,205 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+---
+module: drift_report
+short_description: Report drift between a Cribl desired-state directory and the live configuration
+description:
+    - Compares a desired-state directory with the live configuration of every worker group.
+    - Lists each resource collection once per worker group, concurrently, instead of reading every
+      resource individually, and compares the fields set in the desired state.
+    - Reports counts of in-sync, drifted, missing and unmanaged resources plus per-resource diffs.
+    - Never modifies Cribl.
+version_added: "1.0.0"
+author:
+    - Cribl Ansible Collection Contributors
+extends_documentation_fragment:
+    - cribl.core.cribl
+options:
+    path:
+        description:
+            - Desired-state directory laid out as C(<path>/<worker group>/<type>/<id>.yml),
+              one resource configuration per file.
+            - Resources managed outside worker groups live under C(<path>/_global).
+            - Resource types are the declarative module names (e.g. C(output), C(pipeline)).
+        type: path
+        required: true
+    worker_groups:
+        description:
+            - Worker groups to scan. Use C(all) for every worker group on the leader and
+              C(_global) for resources outside worker groups.
+            - Defaults to every worker group on the leader, plus C(_global) and any other worker
+              groups present in C(path). Groups without files are only scanned with
+              C(report_unmanaged) or C(resource_types).
+        type: list
+        elements: str
+        required: false
+    resource_types:
+        description:
+            - Resource types to scan.
+            - Defaults to the types present for each worker group in C(path), or every known
+              declarative resource type with C(report_unmanaged).
+        type: list
+        elements: str
+        required: false
+    report_unmanaged:
+        description:
+            - Also report live resources that are not in the desired-state directory.
+        type: bool
+        default: false
+    parallelism:
+        description:
+            - Maximum number of concurrent list requests.
+        type: int
+        default: 8
+requirements:
+    - python >= 3.6
+notes:
+    - Supports check mode; the module never makes changes in any mode.
+'''
+
+EXAMPLES = r'''
+- name: Scan for drift
+  cribl.core.drift_report:
+    session: "{{ cribl_session.session }}"
+    path: "{{ playbook_dir }}/cribl"
+  register: drift
+
+- name: Fail when anything drifted
+  ansible.builtin.assert:
+    that: not drift.drifted
+    fail_msg: "{{ drift.summary }}"
+
+- name: Include resources created outside Ansible in every worker group
+  cribl.core.drift_report:
+    session: "{{ cribl_session.session }}"
+    path: "{{ playbook_dir }}/cribl"
+    worker_groups: all
+    report_unmanaged: true
+    parallelism: 16
+'''
+
+RETURN = r'''
+changed:
+    description: Always false, the scan never modifies Cribl
+    type: bool
+    returned: always
+msg:
+    description: Summary of the scan
+    type: str
+    returned: always
+drifted:
+    description: Whether any resource is drifted, missing or unmanaged
+    type: bool
+    returned: always
+summary:
+    description: Number of resources per status, and number of collections that could not be listed
+    type: dict
+    returned: always
+    sample: {"in_sync": 120, "drifted": 2, "missing": 1, "unmanaged": 0, "errors": 0}
+drift:
+    description: Resources that are not in sync, with per-field diffs for drifted resources
+    type: list
+    elements: dict
+    returned: always
+    sample: [{"worker_group": "default", "type": "output", "id": "s3", "status": "drifted",
+              "diff": {"bucket": {"before": "old", "after": "new"}}}]
+errors:
+    description: Collections that could not be listed
+    type: list
+    elements: dict
+    returned: always
+'''
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.cribl.core.plugins.module_utils.cribl_api import (
+    CriblAPIClient,
+    CriblAPIError
+)
+from ansible_collections.cribl.core.plugins.module_utils.cribl_config import (
+    GLOBAL_SCOPE,
+    read_desired_tree,
+    resolve_resource_type
+)
+from ansible_collections.cribl.core.plugins.module_utils.cribl_declarative import (
+    resolve_worker_groups
+)
+from ansible_collections.cribl.core.plugins.module_utils.cribl_drift import (
+    DriftScanner
+)
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec=dict(
+            session=dict(type='dict', required=False),
+            base_url=dict(type='str', required=False),
+            token=dict(type='str', required=False, no_log=True),
+            validate_certs=dict(type='bool', default=False),
+            timeout=dict(type='int', default=30),
+            path=dict(type='path', required=True),
+            worker_groups=dict(type='list', elements='str', required=False),
+            resource_types=dict(type='list', elements='str', required=False),
+            report_unmanaged=dict(type='bool', default=False),
+            parallelism=dict(type='int', default=8),
+        ),
+        required_one_of=[['session', 'token']],
+        mutually_exclusive=[['session', 'base_url']],
+        supports_check_mode=True,
+    )
+
+    session = module.params.get('session')
+    base_url = module.params.get('base_url')
+    token = module.params.get('token')
+    validate_certs = module.params['validate_certs']
+    timeout = module.params['timeout']
+
+    try:
+        # Initialize client with session or token
+        if session:
+            client = CriblAPIClient(session=session)
+        else:
+            client = CriblAPIClient(
+                base_url=base_url,
+                token=token,
+                validate_certs=validate_certs,
+                timeout=timeout
+            )
+
+        tree = read_desired_tree(module.params['path'])
+
+        worker_groups = None
+        if module.params.get('worker_groups'):
+            named = [g for g in module.params['worker_groups'] if g != GLOBAL_SCOPE]
+            worker_groups = resolve_worker_groups(client, named)
+            if GLOBAL_SCOPE in module.params['worker_groups']:
+                worker_groups.insert(0, None)
+
+        resource_types = None
+        if module.params.get('resource_types'):
+            resource_types = [resolve_resource_type(t) for t in module.params['resource_types']]
+
+        scanner = DriftScanner(client, parallelism=module.params['parallelism'])
+        report = scanner.scan(tree, worker_groups=worker_groups, resource_types=resource_types,
+                              report_unmanaged=module.params['report_unmanaged'])
+
+        summary = report['summary']
+        msg = (f"{summary['in_sync']} in sync, {summary['drifted']} drifted, {summary['missing']} missing, "
+               f"{summary['unmanaged']} unmanaged, {summary['errors']} collections not listed")
+
+        module.exit_json(changed=False, msg=msg, drifted=bool(report['drift']), **report)
+
+    except CriblAPIError as e:
+        module.fail_json(msg=str(e))
+    except Exception as e:
+        module.fail_json(msg=f"Unexpected error: {str(e)}")
+
+
+if __name__ == '__main__':
+    main()
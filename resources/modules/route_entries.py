@@ -0,0 +1,186 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+---
+module: route_entries
+short_description: Manage individual entries of a Cribl route table
+description:
+    - Declaratively manages any number of entries of a route table in a single task.
+    - The route table is read once, the entries are merged and reordered in memory, and the
+      table is written back with exactly one request, only when anything changed.
+    - Routes not named in C(entries) are kept unless C(purge) is set.
+    - Supports check mode and diff mode.
+version_added: "1.0.0"
+author:
+    - Cribl Ansible Collection Contributors
+extends_documentation_fragment:
+    - cribl.core.cribl
+options:
+    table_id:
+        description:
+            - Route table ID.
+        type: str
+        default: default
+    entries:
+        description:
+            - Route entries, applied in order.
+            - Each entry is a route configuration (C(name), C(filter), C(pipeline), C(output),
+              C(final), ...) identified by its C(name), or by its C(id) if it has no name.
+            - Existing routes are updated with the fields set in the entry; new routes are appended
+              unless positioned.
+            - C(position) (C(first) or C(last)), C(before) or C(after) (name of another route)
+              place the route in the table.
+            - Set C(state=absent) on an entry to remove the route.
+        type: list
+        elements: dict
+        required: true
+    purge:
+        description:
+            - Remove routes that are not named in C(entries).
+        type: bool
+        default: false
+    worker_group:
+        description:
+            - Worker Group ID of the route table.
+            - If omitted, the route table is managed globally (leader node or default context).
+        type: str
+        required: false
+    conflict_retries:
+        description:
+            - Number of times the entries are merged again into a freshly read table when the server
+              rejects the write because the table was changed concurrently (409 or 412).
+            - C(0) disables the retries.
+        type: int
+        default: 3
+    change_journal:
+        description:
+            - Path of a change journal recording worker groups with uncommitted changes
+              (see M(cribl.core.commit_deploy)).
+            - Can also be set with the C(CRIBL_CHANGE_JOURNAL) environment variable.
+        type: path
+        required: false
+requirements:
+    - python >= 3.6
+'''
+
+EXAMPLES = r'''
+- name: Manage archive and metrics routes ahead of the catch-all route
+  cribl.stream.route_entries:
+    session: "{{ cribl_session.session }}"
+    worker_group: default
+    entries:
+      - name: archive
+        filter: "true"
+        pipeline: passthru
+        output: s3_archive
+        final: false
+        position: first
+      - name: metrics
+        filter: "__inputId.startsWith('prometheus')"
+        pipeline: metrics
+        output: default
+        before: default
+      - name: legacy
+        state: absent
+'''
+
+RETURN = r'''
+changed:
+    description: Whether the route table was changed
+    type: bool
+    returned: always
+msg:
+    description: Description of what was done
+    type: str
+    returned: always
+changes:
+    description: Names of added, updated, moved and removed routes
+    type: dict
+    returned: always
+    sample: {"added": ["metrics"], "updated": [], "moved": ["archive"], "removed": ["legacy"]}
+routes:
+    description: The routes array of the table after the change
+    type: list
+    elements: dict
+    returned: always
+'''
+
+from ansible.module_utils.basic import AnsibleModule, env_fallback
+from ansible_collections.cribl.core.plugins.module_utils.cribl_api import (
+    CriblAPIClient,
+    CriblAPIError
+)
+from ansible_collections.cribl.core.plugins.module_utils.cribl_declarative import (
+    create_change_journal
+)
+from ansible_collections.cribl.core.plugins.module_utils.cribl_routes import (
+    RouteTable
+)
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec=dict(
+            session=dict(type='dict', required=False),
+            base_url=dict(type='str', required=False),
+            token=dict(type='str', required=False, no_log=True),
+            validate_certs=dict(type='bool', default=False),
+            timeout=dict(type='int', default=30),
+            table_id=dict(type='str', default='default'),
+            entries=dict(type='list', elements='dict', required=True),
+            purge=dict(type='bool', default=False),
+            worker_group=dict(type='str', required=False),
+            conflict_retries=dict(type='int', default=3),
+            change_journal=dict(type='path', required=False, fallback=(env_fallback, ['CRIBL_CHANGE_JOURNAL'])),
+        ),
+        required_one_of=[['session', 'token']],
+        mutually_exclusive=[['session', 'base_url']],
+        supports_check_mode=True,
+    )
+
+    session = module.params.get('session')
+    base_url = module.params.get('base_url')
+    token = module.params.get('token')
+    validate_certs = module.params['validate_certs']
+    timeout = module.params['timeout']
+
+    try:
+        # Initialize client with session or token
+        if session:
+            client = CriblAPIClient(session=session)
+        else:
+            client = CriblAPIClient(
+                base_url=base_url,
+                token=token,
+                validate_certs=validate_certs,
+                timeout=timeout
+            )
+
+        change_journal = create_change_journal(module)
+        table = RouteTable(
+            module, client,
+            table_id=module.params['table_id'],
+            worker_group=module.params.get('worker_group'),
+            conflict_retries=module.params['conflict_retries'],
+            change_journal=change_journal
+        )
+        result = table.apply(module.params['entries'], purge=module.params['purge'])
+
+        if change_journal is not None:
+            change_journal.save()
+        module.exit_json(**result)
+
+    except CriblAPIError as e:
+        module.fail_json(msg=str(e))
+    except Exception as e:
+        module.fail_json(msg=f"Unexpected error: {str(e)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -8,7 +8,7 @@ Supports both imperative (API-mapped) and declarative (idempotent) modules.
 Configuration is loaded from scripts/generator_config.yml
 
 Usage:
-    python scripts/generate_modules.py [--schema PATH_TO_SCHEMA]
+    python scripts/generate_modules.py [--schema PATH_TO_SCHEMA] [--since OLD_SCHEMA]
 """
 
 import sys
@@ -17,15 +17,6 @@ import re
 import argparse
 from pathlib import Path
 
-# PyYAML's SafeLoader treats a bare "=" key as the YAML 1.1 special "default
-# value" tag (tag:yaml.org,2002:value) and aborts with a ConstructorError.
-# The Cribl OpenAPI schema contains literal "=" scalars, so register a
-# constructor that loads them as plain strings.
-yaml.SafeLoader.add_constructor(
-    'tag:yaml.org,2002:value',
-    lambda loader, node: loader.construct_scalar(node),
-)
-
 # Add scripts directory to path
 sys.path.insert(0, str(Path(__file__).parent))
 
@@ -34,17 +25,27 @@ from generator import (
     ModuleGenerator,
     DeclarativeGenerator,
     CollectionManager,
+    CRUDDetector,
     DeclarativeTestGenerator
 )
+from generator.output import GeneratedFiles
+from generator.pipeline import BoundedWriter, ModuleTask, render_modules
+from generator.spec_cache import load_spec
+from generator.spec_diff import SpecDiff
 
 
 class CriblModuleGenerator:
     """Main generator orchestrator."""
 
+    # Files listed per status in the end-of-run summary
+    MAX_LISTED_CHANGES = 50
+
     def __init__(self, spec_file: str, output_dir: str):
         self.parser = OpenAPIParser(spec_file)
         self.output_dir = Path(output_dir)
-        self.collection_manager = CollectionManager(self.output_dir)
+        # Tracks written files so unchanged ones are not rewritten
+        self.files = GeneratedFiles(self.output_dir)
+        self.collection_manager = CollectionManager(self.output_dir, files=self.files)
         self.stats = {
             'core': [],
             'stream': [],
@@ -52,9 +53,40 @@ class CriblModuleGenerator:
             'search': [],
             'lake': []
         }
+        # Set by diff_since(): only modules affected by the diff are generated again
+        self.previous_parser = None
+        self.diff = None
+        self.changes = {'imperative': None, 'declarative': None}
+        # Declarative modules per product, routed in meta/runtime.yml by finish()
+        self.declarative_modules = {}
+
+    def diff_since(self, old_spec_file: str) -> SpecDiff:
+        """
+        Compare the spec with an older one.
+
+        Later generation steps then only render the modules of added or
+        changed operations (including operations whose referenced schemas
+        changed) and keep the existing files of the others.
+        """
+        if self.parser.spec is None:
+            self.parser.load()
+        self.previous_parser = OpenAPIParser(old_spec_file)
+        self.previous_parser.load()
+        self.diff = SpecDiff(self.previous_parser.spec, self.parser.spec)
+        print(f"Diff since {old_spec_file}: {len(self.diff.added)} operations added, "
+              f"{len(self.diff.removed)} removed, {len(self.diff.changed)} changed, "
+              f"{len(self.diff.changed_refs)} referenced schemas changed")
+        return self.diff
+
+    def generate_imperative_modules(self, filter_product: str = None, jobs: int = None):
+        """
+        Generate imperative (API-mapped) modules.
 
-    def generate_imperative_modules(self, filter_product: str = None):
-        """Generate imperative (API-mapped) modules."""
+        Collection setup runs once per product; the modules are then rendered
+        in a process pool and written by a bounded writer, in spec order, so
+        the output is the same for any number of workers.  After diff_since(),
+        the existing modules of unaffected operations are kept as they are.
+        """
         self.parser.load()
         endpoints = self.parser.get_endpoints()
         
@@ -62,8 +94,79 @@ class CriblModuleGenerator:
         print(f"Generating Imperative Modules from {len(endpoints)} endpoints")
         print(f"{'='*70}\n")
         
+        affected = self.diff.affected if self.diff is not None else None
+        tasks, skipped_count = self._collect_module_tasks(endpoints, filter_product, affected)
+        
+        # Ensure collection structure exists, once per product
+        version = getattr(self, 'version', '1.0.0')
+        for product in dict.fromkeys(task.product for task in tasks):
+            self.collection_manager.create_structure(product, version)
+            self.collection_manager.copy_api_client(product)
+            self.collection_manager.copy_auth_session_module(product)
+            self.collection_manager.copy_static_resources(product)
+        
+        # Endpoints that map to the same module name: the last one wins
+        final = {}
+        for index, task in enumerate(tasks):
+            final[(task.product, task.module_name)] = index
+        
         generated_count = 0
+        kept_count = 0
+        indexes = []
+        to_render = []
+        for index, task in enumerate(tasks):
+            if task.params is None:
+                # Unaffected operation: keep its module unless it is missing
+                if final[(task.product, task.module_name)] != index or self.files.keep(self._module_file(task)):
+                    self.stats[task.product].append(task.module_name)
+                    generated_count += 1
+                    kept_count += 1
+                    continue
+                task = task._replace(params=self.parser.extract_parameters(task.operation, task.endpoint))
+            indexes.append(index)
+            to_render.append(task)
+        
+        with BoundedWriter() as writer:
+            for index, (task, code, error) in zip(indexes, render_modules(to_render, jobs)):
+                print(f"  [{task.product.upper():6}] {task.module_name:<50} {task.method.upper():6} {task.endpoint}")
+                if error is not None:
+                    print(f"    ERROR: {error}")
+                    continue
+                if final[(task.product, task.module_name)] == index:
+                    module_file = self._module_file(task)
+                    if self.files.needs_write(module_file, code):
+                        writer.write(module_file, code)
+                self.stats[task.product].append(task.module_name)
+                generated_count += 1
+        
+        if self.diff is not None:
+            print(f"  Kept {kept_count} modules of unchanged operations")
+            self.changes['imperative'] = self._module_changes(
+                self._imperative_modules(self.previous_parser, filter_product),
+                self._imperative_modules(self.parser, filter_product),
+                lambda operation: operation in affected)
+        self._print_summary(generated_count, skipped_count)
+        return generated_count
+
+    def _module_file(self, task: ModuleTask) -> Path:
+        return self.output_dir / task.product / 'plugins' / 'modules' / f"{task.module_name}.py"
+
+    def _collect_module_tasks(self, endpoints: dict, filter_product: str = None, affected: set = None):
+        """
+        Build the (endpoint, method) work items in spec order.
+
+        Args:
+            endpoints: Paths of the spec
+            filter_product: Only build the items of this product
+            affected: (endpoint, method) operations to render; the items of
+                other operations get no params (None renders all)
+
+        Returns:
+            Tuple of (list of ModuleTask, number of skipped operations)
+        """
+        tasks = []
         skipped_count = 0
+        namers = {}
         
         for endpoint, methods in endpoints.items():
             product = self.parser.categorize_endpoint(endpoint)
@@ -72,13 +175,9 @@ class CriblModuleGenerator:
             if filter_product and product != filter_product:
                 continue
             
-            # Ensure collection structure exists
-            version = getattr(self, 'version', '1.0.0')
-            self.collection_manager.create_structure(product, version)
-            self.collection_manager.copy_api_client(product)
-            self.collection_manager.copy_auth_session_module(product)
+            if product not in namers:
+                namers[product] = ModuleGenerator(None, product)
             
-            # Generate module for each HTTP method
             for method, operation in methods.items():
                 if not isinstance(operation, dict):
                     continue
@@ -87,31 +186,95 @@ class CriblModuleGenerator:
                     skipped_count += 1
                     continue
                 
-                generator = ModuleGenerator(
-                    self.output_dir / product / 'plugins' / 'modules',
-                    product
-                )
-                
-                module_name = generator.sanitize_name(f"{endpoint}_{method}")
                 summary, description = self.parser.get_operation_info(operation)
-                params = self.parser.extract_parameters(operation, endpoint)
-                
-                print(f"  [{product.upper():6}] {module_name:<50} {method.upper():6} {endpoint}")
-                
-                try:
-                    code = generator.generate(
-                        module_name, endpoint, method, operation,
-                        params, summary, description
-                    )
-                    generator.write_module(module_name, code)
-                    self.stats[product].append(module_name)
-                    generated_count += 1
-                    
-                except Exception as e:
-                    print(f"    ERROR: {e}")
+                params = None
+                if affected is None or (endpoint, method) in affected:
+                    params = self.parser.extract_parameters(operation, endpoint)
+                tasks.append(ModuleTask(
+                    product=product,
+                    module_name=namers[product].sanitize_name(f"{endpoint}_{method}"),
+                    endpoint=endpoint,
+                    method=method,
+                    operation=operation,
+                    params=params,
+                    summary=summary,
+                    description=description,
+                ))
         
-        self._print_summary(generated_count, skipped_count)
-        return generated_count
+        return tasks, skipped_count
+
+    def _imperative_modules(self, parser: OpenAPIParser, filter_product: str = None) -> dict:
+        """
+        Map each imperative module of a spec to the operation generating it.
+
+        Returns:
+            Dict of (product, module name) to (endpoint, method); the last
+            operation wins, as when writing the modules
+        """
+        modules = {}
+        namers = {}
+        for endpoint, methods in parser.get_endpoints().items():
+            product = parser.categorize_endpoint(endpoint)
+            if filter_product and product != filter_product:
+                continue
+            namer = namers.setdefault(product, ModuleGenerator(None, product))
+            for method, operation in methods.items():
+                if isinstance(operation, dict) and parser.should_generate(endpoint, method, operation):
+                    modules[(product, namer.sanitize_name(f"{endpoint}_{method}"))] = (endpoint, method)
+        return modules
+
+    @staticmethod
+    def _module_changes(old: dict, new: dict, is_affected) -> dict:
+        """
+        Compare the modules of the previous and the current spec.
+
+        Args:
+            old, new: Dicts of (product, module name) to the operation or
+                resource generating the module
+            is_affected: Whether the diff affects the source of a module
+
+        Returns:
+            Dict of 'added', 'removed' and 'changed' sorted (product, module name)
+        """
+        return {
+            'added': sorted(key for key in new if key not in old),
+            'removed': sorted(key for key in old if key not in new),
+            'changed': sorted(
+                key for key in new
+                if key in old and (new[key] != old[key] or is_affected(new[key]))),
+        }
+
+    @staticmethod
+    def _declarative_modules(resources: dict, filter_product: str = None) -> dict:
+        """Map each declarative module to the (base path, id path) of its resource."""
+        return dict(
+            ((product, resource['resource_name']), (resource['base_path'], resource['id_path']))
+            for product, found in resources.items()
+            if not filter_product or product == filter_product
+            for resource in found)
+
+    def print_changelog(self):
+        """Print the modules added, removed and changed since the previous spec."""
+        if self.diff is None:
+            return
+        old_version = self.previous_parser.spec.get('info', {}).get('version')
+        new_version = self.parser.spec.get('info', {}).get('version')
+        print(f"\n{'='*70}")
+        print(f"Changelog: {old_version} -> {new_version}")
+        print(f"{'='*70}")
+        for status, marker in (('added', '+'), ('removed', '-'), ('changed', '~')):
+            entries = []
+            for kind in ('imperative', 'declarative'):
+                changes = self.changes[kind] or {}
+                entries.extend((product, name, kind) for product, name in changes.get(status, []))
+            print(f"\n{status.title()} modules ({len(entries)}):")
+            for product, name, kind in sorted(entries):
+                suffix = ' (declarative)' if kind == 'declarative' else ''
+                print(f"  {marker} cribl.{product}.{name}{suffix}")
+        if self.diff.changed_refs:
+            print(f"\nChanged schemas ({len(self.diff.changed_refs)}):")
+            for ref in self.diff.changed_refs:
+                print(f"  ~ {ref}")
 
     def generate_declarative_modules(self, filter_product: str = None):
         """Generate declarative (idempotent) modules."""
@@ -124,19 +287,33 @@ class CriblModuleGenerator:
             self.parser.load()
         
         products = [filter_product] if filter_product else None
-        generator = DeclarativeGenerator(self.output_dir, parser=self.parser)
+        generator = DeclarativeGenerator(self.output_dir, parser=self.parser, files=self.files)
         
         # Generate modules (auto-detects CRUD resources)
-        modules = generator.generate_all(products)
+        affected_paths = self.diff.affected_paths if self.diff is not None else None
+        modules = generator.generate_all(products, affected_paths)
         
-        # Copy base classes
+        # Copy base classes and hand-written runtime files
         generator.copy_base_classes(products)
+        for product in products or list(self.stats.keys()):
+            self.collection_manager.copy_static_resources(product)
+            self.declarative_modules[product] = [m['module_name'] for m in modules if m['product'] == product]
+        
+        # Only the tests of products whose declarative modules changed are regenerated
+        test_products = None
+        if self.diff is not None:
+            self.changes['declarative'] = self._module_changes(
+                self._declarative_modules(CRUDDetector(self.previous_parser).detect_resources(), filter_product),
+                self._declarative_modules(generator.detected_resources, filter_product),
+                lambda paths: bool(set(paths) & affected_paths))
+            test_products = sorted(set(
+                product for keys in self.changes['declarative'].values() for product, _ in keys))
         
         # Generate tests
-        if modules:
+        if (modules and test_products is None) or test_products:
             print(f"\nGenerating tests for declarative modules...")
             test_generator = DeclarativeTestGenerator(Path('tests/unit'))
-            test_generator.generate_tests(modules)
+            test_generator.generate_tests(modules, test_products)
             
             # Generate integration playbook
             test_generator.generate_integration_playbook(
@@ -156,13 +333,50 @@ class CriblModuleGenerator:
                 self.collection_manager.generate_module_index(product, modules)
 
     def clean(self, filter_product: str = None):
-        """Clean generated modules."""
+        """
+        Clean generated modules before generating.
+
+        Only needed when no manifest exists yet; otherwise stale files are
+        removed after generation by finish().
+        """
+        if self.files.has_manifest:
+            return
+        
+        print("Cleaning existing modules...")
         products = [filter_product] if filter_product else ['core', 'stream', 'edge', 'search', 'lake']
         
         for product in products:
             print(f"Cleaning {product}...")
             self.collection_manager.clean_generated_modules(product)
 
+    def finish(self, filter_product: str = None, prune: bool = True):
+        """
+        Write meta/runtime.yml, remove stale files, save the manifest and
+        print what changed.
+
+        Args:
+            filter_product: Product generated by this run (all when None)
+            prune: Remove files of the previous run that were not generated again
+        """
+        products = [filter_product] if filter_product else ['core', 'stream', 'edge', 'search', 'lake']
+        # Written once, with the final list of declarative modules to route to the action plugin
+        for product in products:
+            if (self.output_dir / product).is_dir():
+                self.collection_manager.write_runtime_yml(product, self.declarative_modules.get(product))
+        if prune:
+            self.files.prune(self.output_dir / product for product in products)
+        self.files.save()
+        
+        summary = self.files.summary()
+        print(f"Files:   {summary['added']} added, {summary['changed']} changed, "
+              f"{summary['removed']} removed, {summary['unchanged']} unchanged")
+        for status, marker in (('added', '+'), ('changed', '~'), ('removed', '-')):
+            paths = self.files.changes(status)
+            for path in paths[:self.MAX_LISTED_CHANGES]:
+                print(f"  {marker} {path}")
+            if len(paths) > self.MAX_LISTED_CHANGES:
+                print(f"  {marker} ... and {len(paths) - self.MAX_LISTED_CHANGES} more")
+
     def _print_summary(self, generated: int, skipped: int):
         """Print generation summary."""
         print(f"\n{'='*70}")
@@ -178,6 +392,9 @@ def extract_version_from_schema(schema_path: str) -> str:
     """
     Extract version from OpenAPI schema file.
     Strips the -<hex> suffix if present.
+
+    The schema is loaded through the spec cache, so the parser reuses the
+    same parsed object instead of parsing the file a second time.
     
     Args:
         schema_path: Path to the OpenAPI schema file
@@ -186,8 +403,7 @@ def extract_version_from_schema(schema_path: str) -> str:
         Version string (e.g., '4.14.0')
     """
     try:
-        with open(schema_path, 'r', encoding='utf-8') as f:
-            schema = yaml.safe_load(f)
+        schema = load_spec(schema_path)
         
         version = schema.get('info', {}).get('version', '1.0.0')
         
@@ -256,6 +472,17 @@ Examples:
         type=str,
         help='Path to OpenAPI schema file (overrides generator_config.yml)'
     )
+    parser.add_argument(
+        '--since',
+        type=str,
+        metavar='OLD_SCHEMA',
+        help='Previous OpenAPI schema: only regenerate modules affected by the changes since it'
+    )
+    parser.add_argument(
+        '--jobs',
+        type=int,
+        help='Number of worker processes rendering modules (default: number of CPUs)'
+    )
     args = parser.parse_args()
     
     # Load configuration
@@ -286,14 +513,16 @@ Examples:
     # Ensure build directory exists
     Path(output_dir).parent.mkdir(parents=True, exist_ok=True)
     
-    # Clean if requested
+    # Clean if requested (stale files are pruned via the manifest after generation)
     if clean:
-        print("Cleaning existing modules...")
         generator.clean(product_filter)
     
+    if args.since:
+        generator.diff_since(args.since)
+    
     # Generate imperative modules
     if generate_imperative:
-        count = generator.generate_imperative_modules(product_filter)
+        count = generator.generate_imperative_modules(product_filter, jobs=args.jobs)
         
         # Generate indexes
         if count > 0:
@@ -303,6 +532,9 @@ Examples:
     if generate_declarative:
         generator.generate_declarative_modules(product_filter)
     
+    generator.finish(product_filter, prune=clean)
+    generator.print_changelog()
+    
     print("\n[SUCCESS] Generation complete!\n")
 
 
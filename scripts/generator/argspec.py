@@ -0,0 +1,178 @@
+"""
+Argument Spec Builder
+
+Converts resolved OpenAPI schemas into Ansible option definitions, with
+nested options, list elements, choices and required flags, and renders them
+as argument_spec code and DOCUMENTATION YAML.
+"""
+
+import json
+import re
+from typing import Dict, List, Optional
+
+from .schema_resolver import CYCLE_MARKER
+
+
+# Nested objects below this depth are free-form dicts
+MAX_OPTION_DEPTH = 3
+
+# Enums with more values are not turned into choices
+MAX_CHOICES = 100
+
+TYPE_MAP = {
+    'string': 'str',
+    'integer': 'int',
+    'number': 'float',
+    'boolean': 'bool',
+    'array': 'list',
+    'object': 'dict'
+}
+
+# Option types whose enum values become choices
+CHOICE_TYPES = {'str': str, 'int': int, 'float': (int, float)}
+
+
+def convert_type(schema) -> str:
+    """Convert an OpenAPI schema type to an Ansible option type."""
+    # Defend against non-dict schemas (e.g. JSON Schema boolean values).
+    if not isinstance(schema, dict):
+        return 'str'
+    schema_type = schema.get('type')
+    # OpenAPI 3.1 allows `type` to be a list (e.g. ['string', 'null']);
+    # use the first non-null type when that happens.
+    if isinstance(schema_type, list):
+        schema_type = next((t for t in schema_type if t != 'null'), None)
+    if schema_type is None and isinstance(schema.get('properties'), dict):
+        return 'dict'
+    return TYPE_MAP.get(schema_type, 'str')
+
+
+def description(schema) -> str:
+    """Return a schema's description (or title) on a single line."""
+    if not isinstance(schema, dict):
+        return ''
+    text = schema.get('description') or schema.get('title') or ''
+    return re.sub(r'\s+', ' ', str(text)).strip()
+
+
+def _choices(schema: Dict, option_type: str) -> Optional[List]:
+    enum = schema.get('enum')
+    if not isinstance(enum, list) or option_type not in CHOICE_TYPES:
+        return None
+    values = [value for value in enum if value is not None]
+    if not values or len(values) > MAX_CHOICES:
+        return None
+    # bool is an int subclass, but never a valid int/float choice here
+    if any(isinstance(value, bool) or not isinstance(value, CHOICE_TYPES[option_type]) for value in values):
+        return None
+    return values
+
+
+def _options(schema: Dict, depth: int) -> Optional[Dict[str, Dict]]:
+    """Return the suboptions of an object schema, or None when it must stay a free-form dict."""
+    properties = schema.get('properties')
+    if depth >= MAX_OPTION_DEPTH or not isinstance(properties, dict) or not properties:
+        return None
+    # Extra keys allowed (true or any schema, {} included), or several possible
+    # shapes: AnsibleModule would reject valid input
+    if schema.get('additionalProperties') not in (None, False) or schema.get('oneOf') or schema.get('anyOf'):
+        return None
+    required = schema.get('required') or []
+    options = {}
+    for name, prop in properties.items():
+        if not isinstance(prop, dict) or '$ref' in prop:
+            # Boolean schemas, cycles and unresolved references cannot be validated
+            return None
+        option = option_spec(prop, depth + 1)
+        # Properties with a server-side default may be omitted
+        if name in required and 'default' not in prop:
+            option['required'] = True
+        options[name] = option
+    return options
+
+
+def option_spec(schema, depth: int = 0) -> Dict:
+    """
+    Build the option definition of a resolved schema.
+
+    Returns:
+        Dict with type, description and, when the schema allows it, choices,
+        elements and nested options (themselves option definitions)
+    """
+    option = {'type': convert_type(schema), 'description': description(schema)}
+    if not isinstance(schema, dict) or schema.get(CYCLE_MARKER):
+        return option
+
+    if option['type'] == 'dict':
+        options = _options(schema, depth)
+        if options is not None:
+            option['options'] = options
+    elif option['type'] == 'list':
+        items = schema.get('items')
+        if isinstance(items, dict) and ('type' in items or 'properties' in items):
+            element = option_spec(items, depth)
+            option['elements'] = element['type']
+            if 'options' in element:
+                option['options'] = element['options']
+            if 'choices' in element:
+                option['choices'] = element['choices']
+    else:
+        choices = _choices(schema, option['type'])
+        if choices is not None:
+            option['choices'] = choices
+    return option
+
+
+def _spec_keywords(option: Dict, required: Optional[bool] = None) -> List[str]:
+    """Return the dict(...) keywords of an option; required is rendered when given or true."""
+    keywords = [f"type={option['type']!r}"]
+    if option.get('elements'):
+        keywords.append(f"elements={option['elements']!r}")
+    if required is not None:
+        keywords.append(f"required={required}")
+    elif option.get('required'):
+        keywords.append('required=True')
+    if option.get('choices'):
+        keywords.append(f"choices={option['choices']!r}")
+    return keywords
+
+
+def _format_dict_call(keywords: List[str], option: Dict, indent: int) -> str:
+    if not option.get('options'):
+        return f"dict({', '.join(keywords)})"
+    lines = [f"dict({', '.join(keywords)}, options={{"]
+    for sub_name, sub_option in option['options'].items():
+        lines.append(f"{' ' * (indent + 4)}{sub_name!r}: "
+                     f"{_format_dict_call(_spec_keywords(sub_option), sub_option, indent + 4)},")
+    lines.append(f"{' ' * indent}}})")
+    return '\n'.join(lines)
+
+
+def format_argspec(name: str, option: Dict, indent: int = 8, required: bool = False) -> str:
+    """
+    Render a top-level argument_spec entry (name=dict(...)).
+
+    Nested options are rendered as dict literals, one per line.
+    """
+    return f"{' ' * indent}{name}=" + _format_dict_call(_spec_keywords(option, required), option, indent)
+
+
+def format_doc(name: str, option: Dict, indent: int = 4, required: bool = False) -> List[str]:
+    """Render an option, with its suboptions, as DOCUMENTATION YAML lines."""
+    pad = ' ' * indent
+    lines = [
+        f"{pad}{name}:",
+        f"{pad}    description:",
+        f"{pad}        - {option.get('description') or f'The {name} parameter'}",
+        f"{pad}    type: {option['type']}",
+    ]
+    if option.get('elements'):
+        lines.append(f"{pad}    elements: {option['elements']}")
+    lines.append(f"{pad}    required: {str(bool(required or option.get('required'))).lower()}")
+    if option.get('choices'):
+        lines.append(f"{pad}    choices: [{', '.join(json.dumps(value) for value in option['choices'])}]")
+    if option.get('options'):
+        lines.append(f"{pad}    suboptions:")
+        for sub_name, sub_option in option['options'].items():
+            lines.extend(format_doc(sub_name, sub_option, indent + 8))
+    return lines
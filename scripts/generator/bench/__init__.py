@@ -0,0 +1,17 @@
+"""
+Generator Benchmarks
+
+Synthetic specifications and per-stage benchmarks of the generator, run with
+``make bench-generator`` (``python -m generator.bench`` from scripts/).
+"""
+
+from .synthetic_spec import synthetic_spec, write_spec
+from .runner import STAGES, compare, run_benchmarks
+
+__all__ = [
+    'synthetic_spec',
+    'write_spec',
+    'STAGES',
+    'compare',
+    'run_benchmarks',
+]
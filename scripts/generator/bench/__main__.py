@@ -0,0 +1,70 @@
+"""
+Run the generator benchmarks.
+
+Usage (from scripts/):
+    python -m generator.bench [--paths N] [--schemas M] [--update-baseline]
+
+Exits with status 1 when a stage regressed against the baseline.
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+from .runner import (
+    BASELINE_FILE, RSS_TOLERANCE, STAGES, TIME_TOLERANCE,
+    compare, format_results, load_baseline, run_benchmarks, save_baseline
+)
+from .synthetic_spec import write_spec
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the generator stages on a synthetic OpenAPI spec')
+    parser.add_argument('--paths', type=int, default=1000, help='Number of paths (default: 1000)')
+    parser.add_argument('--schemas', type=int, default=2000, help='Number of component schemas (default: 2000)')
+    parser.add_argument('--ref-depth', type=int, default=8, help='Length of $ref chains (default: 8)')
+    parser.add_argument('--enum-size', type=int, default=100, help='Values per enum (default: 100)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per stage, the fastest is kept (default: 3)')
+    parser.add_argument('--stages', nargs='+', choices=STAGES, help='Stages to run (default: all)')
+    parser.add_argument('--baseline', type=Path, default=BASELINE_FILE, help='Baseline JSON file')
+    parser.add_argument('--update-baseline', action='store_true', help='Store the results as the new baseline')
+    parser.add_argument('--time-tolerance', type=float, default=TIME_TOLERANCE,
+                        help=f'Allowed relative wall time increase (default: {TIME_TOLERANCE})')
+    parser.add_argument('--rss-tolerance', type=float, default=RSS_TOLERANCE,
+                        help=f'Allowed relative peak RSS increase (default: {RSS_TOLERANCE})')
+    parser.add_argument('--output', type=Path, help='Also write the results to this JSON file')
+    args = parser.parse_args()
+
+    config = {'paths': args.paths, 'schemas': args.schemas,
+              'ref_depth': args.ref_depth, 'enum_size': args.enum_size}
+
+    with tempfile.TemporaryDirectory(prefix='cribl-bench-') as workdir:
+        spec_file = write_spec(Path(workdir) / 'spec.yml', **config)
+        print(f"Synthetic spec: {config} ({spec_file.stat().st_size / (1024 * 1024):.1f} MiB)")
+        results = run_benchmarks(spec_file, Path(workdir), args.stages, args.repeat)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'config': config, 'stages': results}, f, indent=2, sort_keys=True)
+
+    if args.update_baseline:
+        print(format_results(results))
+        save_baseline(args.baseline, config, results)
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+
+    baseline = load_baseline(args.baseline, config)
+    print(format_results(results, baseline))
+    regressions = compare(results, baseline, args.time_tolerance, args.rss_tolerance)
+    if regressions:
+        print("\nRegressions:")
+        for message in regressions:
+            print(f"  {message}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
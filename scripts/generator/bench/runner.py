@@ -0,0 +1,235 @@
+"""
+Generator Benchmarks
+
+Runs each generator stage on a synthetic specification in a fresh process,
+records its wall time and the process's peak RSS, and compares the results
+with a stored baseline.
+"""
+
+import contextlib
+import io
+import json
+import os
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from .. import spec_cache
+from ..declarative_generator import DeclarativeGenerator
+from ..module_generator import ModuleGenerator
+from ..openapi_parser import OpenAPIParser
+from ..crud_detector import CRUDDetector
+from ..output import GeneratedFiles
+from ..pipeline import ModuleTask, render_module
+from ..schema_resolver import SchemaResolver
+
+
+BASELINE_FILE = Path(__file__).resolve().parent / 'baseline.json'
+
+# Stages in run order; load parses the spec, the others read it from the spec cache
+STAGES = ['load', 'load_cached', 'resolve', 'detect', 'render', 'declarative', 'write', 'rewrite']
+
+# Default relative slowdown (wall time) and growth (peak RSS) reported as a regression
+TIME_TOLERANCE = 0.5
+RSS_TOLERANCE = 0.25
+
+
+def peak_rss_mb() -> float:
+    """Return the peak resident set size of this process in MiB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    if sys.platform == 'darwin':
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def _loaded_parser(spec_file: str) -> OpenAPIParser:
+    parser = OpenAPIParser(spec_file)
+    parser.load()
+    return parser
+
+
+def _module_tasks(parser: OpenAPIParser) -> List[ModuleTask]:
+    """Build the imperative module work items of every operation."""
+    tasks = []
+    namers = {}
+    for endpoint, methods in parser.get_endpoints().items():
+        product = parser.categorize_endpoint(endpoint)
+        namer = namers.setdefault(product, ModuleGenerator(None, product))
+        for method, operation in methods.items():
+            if not isinstance(operation, dict) or not parser.should_generate(endpoint, method, operation):
+                continue
+            summary, description = parser.get_operation_info(operation)
+            tasks.append(ModuleTask(
+                product, namer.sanitize_name(f"{endpoint}_{method}"), endpoint, method, operation,
+                parser.extract_parameters(operation, endpoint), summary, description))
+    return tasks
+
+
+def _rendered_files(spec_file: str, root: Path) -> Dict[Path, str]:
+    files = {}
+    for task in _module_tasks(_loaded_parser(spec_file)):
+        code, _ = render_module(task)
+        files[root / task.product / 'plugins' / 'modules' / f'{task.module_name}.py'] = code
+    return files
+
+
+def _write_all(root: Path, files: Dict[Path, str]):
+    tracker = GeneratedFiles(root)
+    for path, content in files.items():
+        tracker.write(path, content)
+    tracker.save()
+
+
+def _use_spec_cache(cache: Path):
+    """Point the spec cache at a directory and forget the specs loaded by this process."""
+    os.environ['CRIBL_SPEC_CACHE_DIR'] = str(cache)
+    spec_cache._LOADED.clear()
+
+
+def _fill_spec_cache(spec_file: str, workdir: str):
+    _use_spec_cache(Path(workdir) / 'spec-cache' / 'warm')
+    spec_cache.load_spec(spec_file)
+
+
+def _setup_stage(stage: str, spec_file: str, workdir: Path, run: int) -> Callable:
+    """
+    Prepare a stage's inputs (untimed) and return the callable to time.
+
+    Every run gets fresh inputs and output directories, so repeated runs
+    measure the same work.
+    """
+    if stage == 'load':
+        _use_spec_cache(workdir / 'spec-cache' / f'cold-{run}')
+        return OpenAPIParser(spec_file).load
+
+    _use_spec_cache(workdir / 'spec-cache' / 'warm')
+    if stage == 'load_cached':
+        return OpenAPIParser(spec_file).load
+
+    if stage == 'resolve':
+        spec = _loaded_parser(spec_file).spec
+        refs = [f'#/components/schemas/{name}' for name in spec.get('components', {}).get('schemas', {})]
+
+        def resolve():
+            resolver = SchemaResolver(spec)
+            for ref in refs:
+                resolver.resolve_ref(ref)
+        return resolve
+
+    if stage == 'detect':
+        return CRUDDetector(_loaded_parser(spec_file)).detect_resources
+
+    if stage == 'render':
+        tasks = _module_tasks(_loaded_parser(spec_file))
+        return lambda: [render_module(task) for task in tasks]
+
+    if stage == 'declarative':
+        generator = DeclarativeGenerator(workdir / 'declarative' / str(run), parser=_loaded_parser(spec_file))
+        return generator.generate_all
+
+    if stage in ('write', 'rewrite'):
+        root = workdir / stage / str(run)
+        files = _rendered_files(spec_file, root)
+        if stage == 'rewrite':
+            # Second run over unchanged output: nothing is written
+            _write_all(root, files)
+        return lambda: _write_all(root, files)
+
+    raise ValueError(f"Unknown stage: {stage}")
+
+
+def run_stage(stage: str, spec_file: str, workdir: str, repeat: int = 1) -> Dict:
+    """
+    Run one stage and measure it; meant to run in a fresh process.
+
+    The wall time is the fastest of repeat runs.  The peak RSS includes the
+    stage's inputs, which are built by the same process before timing starts.
+    """
+    workdir = Path(workdir)
+    timings = []
+    # The generator reports progress on stdout
+    with contextlib.redirect_stdout(io.StringIO()):
+        for run in range(max(1, repeat)):
+            func = _setup_stage(stage, spec_file, workdir, run)
+            # Flush files written so far so their writeback does not land in the timing
+            if hasattr(os, 'sync'):
+                os.sync()
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+    return {'wall_s': round(min(timings), 4), 'peak_rss_mb': round(peak_rss_mb(), 1)}
+
+
+def run_benchmarks(spec_file: str, workdir: Path, stages: List[str] = None, repeat: int = 3) -> Dict[str, Dict]:
+    """
+    Run stages in order, each in a fresh interpreter.
+
+    Returns:
+        Dict mapping stage to its wall time (s) and peak RSS (MiB)
+    """
+    results = {}
+    # Fill the spec cache first, so every stage's inputs come from it
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as executor:
+        executor.submit(_fill_spec_cache, str(spec_file), str(workdir)).result()
+    for stage in stages or STAGES:
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as executor:
+            results[stage] = executor.submit(run_stage, stage, str(spec_file), str(workdir), repeat).result()
+    return results
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict],
+            time_tolerance: float = TIME_TOLERANCE, rss_tolerance: float = RSS_TOLERANCE) -> List[str]:
+    """
+    Compare results with a baseline.
+
+    Returns:
+        One message per regression: a stage slower than the baseline by more
+        than time_tolerance, or whose peak RSS grew by more than rss_tolerance
+    """
+    regressions = []
+    for stage, result in results.items():
+        base = baseline.get(stage)
+        if not base:
+            continue
+        if result['wall_s'] > base['wall_s'] * (1 + time_tolerance):
+            regressions.append(f"{stage}: wall time {result['wall_s']:.3f}s vs baseline {base['wall_s']:.3f}s")
+        if result['peak_rss_mb'] > base['peak_rss_mb'] * (1 + rss_tolerance):
+            regressions.append(
+                f"{stage}: peak RSS {result['peak_rss_mb']:.1f}MiB vs baseline {base['peak_rss_mb']:.1f}MiB")
+    return regressions
+
+
+def format_results(results: Dict[str, Dict], baseline: Dict[str, Dict] = None) -> str:
+    """Format results as a table, with the change against the baseline when given."""
+    lines = [f"{'Stage':<14} {'Wall (s)':>10} {'Peak RSS (MiB)':>15} {'vs baseline':>12}"]
+    for stage, result in results.items():
+        change = ''
+        base = (baseline or {}).get(stage)
+        if base and base['wall_s']:
+            change = f"{(result['wall_s'] / base['wall_s'] - 1) * 100:+.0f}%"
+        lines.append(f"{stage:<14} {result['wall_s']:>10.3f} {result['peak_rss_mb']:>15.1f} {change:>12}")
+    return '\n'.join(lines)
+
+
+def load_baseline(path: Path, config: Dict) -> Dict[str, Dict]:
+    """Return the baseline stages, or an empty dict when missing or recorded with another config."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if data.get('config') != config:
+        print(f"Baseline {path} was recorded with {data.get('config')}, not comparing")
+        return {}
+    return data.get('stages', {})
+
+
+def save_baseline(path: Path, config: Dict, results: Dict[str, Dict]):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'config': config, 'stages': results}, f, indent=2, sort_keys=True)
+        f.write('\n')
@@ -0,0 +1,125 @@
+"""
+Synthetic OpenAPI Specifications
+
+Builds Cribl-like OpenAPI specifications of any size for benchmarking the
+generator: CRUD resources spread over every product, request schemas linked
+by deep $ref chains and allOf composition, and large enums.
+"""
+
+import random
+from pathlib import Path
+from typing import Dict
+
+import yaml
+
+
+# Path prefixes of each product, see OpenAPIParser.PRODUCT_PATTERNS
+PRODUCT_PREFIXES = ['/system', '/pipelines', '/edge', '/search', '/products/lake', '/master', '/lib']
+
+SCHEMA_REF = '#/components/schemas/{}'
+
+
+def _schema_name(index: int) -> str:
+    return f'Schema{index}'
+
+
+def _schema(index: int, schemas: int, ref_depth: int, enum_size: int, rng: random.Random) -> Dict:
+    """Return one component schema; schemas link to the next one until the chain reaches ref_depth."""
+    properties = {
+        'id': {'type': 'string', 'description': 'Unique ID'},
+        'description': {'type': 'string'},
+        'disabled': {'type': 'boolean', 'default': False},
+        'weight': {'type': 'integer', 'minimum': 0},
+        'tags': {'type': 'array', 'items': {'type': 'string'}},
+        'mode': {
+            'type': 'string',
+            'enum': [f'mode_{index}_{value}' for value in range(enum_size)],
+        },
+    }
+    for extra in range(rng.randint(2, 8)):
+        properties[f'field{extra}'] = {'type': rng.choice(['string', 'integer', 'number', 'boolean'])}
+
+    schema = {'type': 'object', 'required': ['id'], 'properties': properties}
+    if (index + 1) % ref_depth and index + 1 < schemas:
+        properties['child'] = {'$ref': SCHEMA_REF.format(_schema_name(index + 1))}
+        properties['children'] = {'type': 'array', 'items': {'$ref': SCHEMA_REF.format(_schema_name(index + 1))}}
+    if index % 3 == 0 and index + 1 < schemas:
+        # allOf composition with a schema from another chain
+        other = rng.randrange(schemas)
+        schema = {'allOf': [{'$ref': SCHEMA_REF.format(_schema_name(other))}, schema]}
+    return schema
+
+
+def _operation(summary: str, schema_index: int = None, id_param: bool = False) -> Dict:
+    operation = {
+        'summary': summary,
+        'responses': {'200': {'description': 'OK', 'content': {'application/json': {
+            'schema': {'type': 'object', 'properties': {'count': {'type': 'integer'}}}}}}},
+    }
+    parameters = []
+    if id_param:
+        parameters.append({'name': 'id', 'in': 'path', 'required': True, 'schema': {'type': 'string'}})
+    else:
+        parameters.append({'name': 'limit', 'in': 'query', 'schema': {'type': 'integer'}})
+    operation['parameters'] = parameters
+    if schema_index is not None:
+        operation['requestBody'] = {'content': {'application/json': {
+            'schema': {'$ref': SCHEMA_REF.format(_schema_name(schema_index))}}}}
+    return operation
+
+
+def synthetic_spec(paths: int = 1000, schemas: int = 2000, ref_depth: int = 8,
+                   enum_size: int = 100, seed: int = 0) -> Dict:
+    """
+    Build a synthetic OpenAPI specification.
+
+    Args:
+        paths: Number of paths; each pair of paths is a CRUD resource
+            (collection with GET/POST, item with GET/PATCH/DELETE)
+        schemas: Number of component schemas
+        ref_depth: Length of the $ref chains linking the schemas
+        enum_size: Number of values of each schema's enum property
+        seed: Random seed; the same arguments always build the same spec
+
+    Returns:
+        OpenAPI specification
+    """
+    rng = random.Random(seed)
+    ref_depth = max(1, ref_depth)
+
+    components = dict(
+        (_schema_name(index), _schema(index, schemas, ref_depth, enum_size, rng))
+        for index in range(schemas))
+
+    spec_paths = {}
+    for resource in range(max(1, paths // 2)):
+        prefix = PRODUCT_PREFIXES[resource % len(PRODUCT_PREFIXES)]
+        base = f'{prefix}/resource{resource}s'
+        schema_index = rng.randrange(schemas) if schemas else None
+        spec_paths[base] = {
+            'get': _operation(f'List resource{resource}s'),
+            'post': _operation(f'Create a resource{resource}', schema_index),
+        }
+        spec_paths[f'{base}/{{id}}'] = {
+            'get': _operation(f'Get a resource{resource}', id_param=True),
+            'patch': _operation(f'Update a resource{resource}', schema_index, id_param=True),
+            'delete': _operation(f'Delete a resource{resource}', id_param=True),
+        }
+
+    return {
+        'openapi': '3.0.3',
+        'info': {'title': 'Synthetic Cribl API', 'version': f'0.0.{paths}-{schemas}'},
+        'paths': spec_paths,
+        'components': {'schemas': components},
+    }
+
+
+def write_spec(path: Path, **kwargs) -> Path:
+    """Write a synthetic specification (see synthetic_spec for the arguments) as YAML."""
+    spec = synthetic_spec(**kwargs)
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    dumper = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+    with open(path, 'w', encoding='utf-8') as f:
+        yaml.dump(spec, f, Dumper=dumper, sort_keys=False)
+    return path
@@ -6,7 +6,7 @@ Manages Ansible collection structure and metadata files.
 
 from pathlib import Path
 from typing import List, Dict
-import shutil
+from .output import GeneratedFiles
 from .templates import AuthSessionTemplate
 
 
@@ -21,8 +21,39 @@ class CollectionManager:
         'lake': 'Ansible collection for managing Cribl Lake (data lakes, storage, datasets)'
     }
 
-    def __init__(self, base_dir: Path):
+    # Hand-written runtime files shipped from resources/.
+    # (source relative to resources/, target relative to collection, products or None for all)
+    STATIC_RESOURCES = [
+        ('module_utils/cribl_runtime.py', 'plugins/module_utils/cribl_runtime.py', None),
+        ('module_utils/cribl_state.py', 'plugins/module_utils/cribl_state.py', None),
+        ('module_utils/cribl_config.py', 'plugins/module_utils/cribl_config.py', None),
+        ('module_utils/cribl_deploy.py', 'plugins/module_utils/cribl_deploy.py', None),
+        ('module_utils/cribl_drift.py', 'plugins/module_utils/cribl_drift.py', None),
+        ('module_utils/cribl_export.py', 'plugins/module_utils/cribl_export.py', None),
+        ('module_utils/cribl_sync.py', 'plugins/module_utils/cribl_sync.py', None),
+        ('module_utils/cribl_routes.py', 'plugins/module_utils/cribl_routes.py', ['stream']),
+        ('modules/config_apply.py', 'plugins/modules/config_apply.py', ['core', 'stream']),
+        ('modules/config_plan.py', 'plugins/modules/config_plan.py', ['core', 'stream']),
+        ('modules/commit_deploy.py', 'plugins/modules/commit_deploy.py', ['core', 'stream']),
+        ('modules/drift_report.py', 'plugins/modules/drift_report.py', ['core', 'stream']),
+        ('modules/config_export.py', 'plugins/modules/config_export.py', ['core', 'stream']),
+        ('modules/config_sync.py', 'plugins/modules/config_sync.py', ['core', 'stream']),
+        ('modules/route_entries.py', 'plugins/modules/route_entries.py', ['stream']),
+        ('action/cribl_declarative.py', 'plugins/action/cribl_declarative.py', None),
+        ('inventory/cribl.py', 'plugins/inventory/cribl.py', ['core']),
+        ('lookup/cribl_config.py', 'plugins/lookup/cribl_config.py', ['core']),
+        ('callback/api_profile.py', 'plugins/callback/api_profile.py', ['core']),
+    ]
+
+    # Oldest ansible release supporting plugin_routing redirects in meta/runtime.yml
+    REQUIRES_ANSIBLE = '>=2.10'
+
+    RESOURCES_DIR = Path(__file__).resolve().parent.parent.parent / 'resources'
+
+    def __init__(self, base_dir: Path, files: GeneratedFiles = None):
         self.base_dir = base_dir
+        # Every file is written through the tracker, which skips unchanged content
+        self.files = files if files is not None else GeneratedFiles()
 
     def create_structure(self, product: str, version: str = '1.0.0'):
         """Create complete directory structure for a collection."""
@@ -30,6 +61,8 @@ class CollectionManager:
             self._get_path(product, 'plugins', 'modules'),
             self._get_path(product, 'plugins', 'module_utils'),
             self._get_path(product, 'plugins', 'doc_fragments'),
+            self._get_path(product, 'plugins', 'action'),
+            self._get_path(product, 'meta'),
             self._get_path(product, 'examples'),
         ]
         
@@ -48,8 +81,7 @@ class CollectionManager:
     def _create_init_files(self, product: str):
         """Create __init__.py files."""
         init_file = self._get_path(product, 'plugins', 'module_utils', '__init__.py')
-        with open(init_file, 'w', encoding='utf-8') as f:
-            f.write('''# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+        self.files.write(init_file, '''# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
 
 from __future__ import (absolute_import, division, print_function)
 __metaclass__ = type
@@ -58,8 +90,7 @@ __metaclass__ = type
     def _create_doc_fragment(self, product: str):
         """Create documentation fragment."""
         doc_file = self._get_path(product, 'plugins', 'doc_fragments', 'cribl.py')
-        with open(doc_file, 'w', encoding='utf-8') as f:
-            f.write(f'''# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+        self.files.write(doc_file, f'''# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
 
 from __future__ import (absolute_import, division, print_function)
 __metaclass__ = type
@@ -111,8 +142,7 @@ notes:
         galaxy_file = self._get_path(product, 'galaxy.yml')
         description = self.PRODUCT_DESCRIPTIONS.get(product, f'Cribl {product.title()} Collection')
         
-        with open(galaxy_file, 'w', encoding='utf-8') as f:
-            f.write(f'''---
+        self.files.write(galaxy_file, f'''---
 namespace: cribl
 name: {product}
 version: {version}
@@ -136,6 +166,31 @@ issues: https://github.com/AlexAsplund/ansible-collections-cribl/issues
 build_ignore: []
 ''')
 
+    def write_runtime_yml(self, product: str, declarative_modules: List[str] = None):
+        """
+        Write meta/runtime.yml.
+
+        Declarative modules are routed to the controller-side cribl_declarative
+        action plugin and listed in the C(cribl) action group, so
+        C(module_defaults: group/cribl.<product>.cribl) can set the session once.
+        """
+        runtime_file = self._get_path(product, 'meta', 'runtime.yml')
+        runtime_file.parent.mkdir(parents=True, exist_ok=True)
+        modules = sorted(set(declarative_modules or []))
+
+        lines = ['---', f"requires_ansible: '{self.REQUIRES_ANSIBLE}'"]
+        if modules:
+            lines.append('action_groups:')
+            lines.append('  cribl:')
+            lines.extend(f'    - {module}' for module in modules)
+            lines.append('plugin_routing:')
+            lines.append('  action:')
+            for module in modules:
+                lines.append(f'    {module}:')
+                lines.append(f'      redirect: cribl.{product}.cribl_declarative')
+
+        self.files.write(runtime_file, '\n'.join(lines) + '\n')
+
     def _create_collection_readme(self, product: str):
         """Create README.md for the collection."""
         readme_file = self._get_path(product, 'README.md')
@@ -167,8 +222,7 @@ build_ignore: []
         
         info = module_types.get(product, {'declarative': 'Various resources', 'imperative': 'API modules'})
         
-        with open(readme_file, 'w', encoding='utf-8') as f:
-            f.write(f'''# Ansible Collection - cribl.{product}
+        self.files.write(readme_file, f'''# Ansible Collection - cribl.{product}
 
 {description}
 
@@ -259,12 +313,11 @@ Cribl Ansible Collection Contributors
         # Try to copy from existing source
         for source in possible_sources:
             if source.exists() and source.resolve() != target.resolve():
-                shutil.copy(source, target)
+                self.files.write(target, source.read_text(encoding='utf-8'))
                 return
         
         # Create from template if no source found
-        with open(target, 'w', encoding='utf-8') as f:
-            f.write(self._get_api_client_template())
+        self.files.write(target, self._get_api_client_template())
     
     def copy_auth_session_module(self, product: str):
         """Copy auth_session module to collection."""
@@ -273,20 +326,41 @@ Cribl Ansible Collection Contributors
         # Generate auth_session module from template
         content = AuthSessionTemplate.create_auth_session_module(product)
         
-        with open(target, 'w', encoding='utf-8') as f:
-            f.write(content)
+        self.files.write(target, content)
+
+    def copy_static_resources(self, product: str):
+        """Copy hand-written modules and module_utils from resources/ to collection."""
+        for source, target, products in self.STATIC_RESOURCES:
+            if products is not None and product not in products:
+                continue
+            
+            source_file = self.RESOURCES_DIR / source
+            if not source_file.exists():
+                print(f"  [WARNING] Static resource not found: {source_file}")
+                continue
+            
+            # Sources are written against cribl.core; point imports and doc
+            # fragments at the collection they are copied into
+            content = source_file.read_text(encoding='utf-8')
+            content = content.replace('ansible_collections.cribl.core.', f'ansible_collections.cribl.{product}.')
+            content = content.replace('- cribl.core.cribl\n', f'- cribl.{product}.cribl\n')
+            
+            target_file = self._get_path(product, target)
+            target_file.parent.mkdir(parents=True, exist_ok=True)
+            self.files.write(target_file, content)
 
     def generate_module_index(self, product: str, modules: List[str]):
         """Generate MODULES.md index file."""
         index_file = self._get_path(product, 'MODULES.md')
         
-        with open(index_file, 'w', encoding='utf-8') as f:
-            f.write(f"# Cribl {product.title()} Collection - Module Index\n\n")
-            f.write(f"Total modules: {len(modules)}\n\n")
-            f.write("## Auto-Generated Modules\n\n")
-            
-            for module in sorted(modules):
-                f.write(f"- `{module}`\n")
+        content = f"# Cribl {product.title()} Collection - Module Index\n\n"
+        content += f"Total modules: {len(modules)}\n\n"
+        content += "## Auto-Generated Modules\n\n"
+        
+        for module in sorted(modules):
+            content += f"- `{module}`\n"
+        
+        self.files.write(index_file, content)
 
     def clean_generated_modules(self, product: str):
         """Remove generated module files."""
@@ -308,14 +382,33 @@ Cribl Ansible Collection Contributors
 from __future__ import (absolute_import, division, print_function)
 __metaclass__ = type
 
+import json
+import os
 import requests
+import threading
 import time
+from requests.adapters import HTTPAdapter
 from typing import Optional, Dict, Any
 
 
 class CriblAPIError(Exception):
     """Exception raised for Cribl API errors."""
-    pass
+    
+    def __init__(self, message: str, status_code: Optional[int] = None,
+                 endpoint: Optional[str] = None, body: Any = None):
+        """
+        Initialize the error.
+        
+        Args:
+            message: Error message
+            status_code: HTTP status code of the failed request, if any
+            endpoint: API endpoint of the failed request, if any
+            body: Parsed error response body (JSON, or text if not JSON)
+        """
+        super().__init__(message)
+        self.status_code = status_code
+        self.endpoint = endpoint
+        self.body = body
 
 
 class CriblSession:
@@ -439,6 +532,11 @@ class CriblAPIClient:
                 self.auth_type = 'password'
         
         self.http_session = requests.Session()
+        # Serializes token refresh when the client is shared between threads
+        self._auth_lock = threading.Lock()
+        # Request metrics are appended to this file when set (see the api_profile callback)
+        self.profile_file = os.environ.get('CRIBL_API_PROFILE')
+        self._profile_lock = threading.Lock()
         
         if not self.validate_certs:
             import urllib3
@@ -449,11 +547,15 @@ class CriblAPIClient:
         if self.token and self.session_obj and not self.session_obj.is_expired():
             return self.session_obj
         
-        # Route to appropriate auth method
-        if self.auth_type == 'oauth2':
-            return self.login_oauth2()
-        else:
-            return self.login_password()
+        started = time.time()
+        try:
+            # Route to appropriate auth method
+            if self.auth_type == 'oauth2':
+                return self.login_oauth2()
+            else:
+                return self.login_password()
+        finally:
+            self._record('LOGIN', f'/auth/{self.auth_type}', started)
     
     def login_password(self) -> CriblSession:
         """Traditional username/password authentication."""
@@ -469,7 +571,8 @@ class CriblAPIClient:
         )
         
         if response.status_code != 200:
-            raise CriblAPIError(f"Login failed: {response.status_code} {response.text}")
+            raise CriblAPIError(f"Login failed: {response.status_code} {response.text}",
+                                status_code=response.status_code, endpoint='/auth/login')
         
         data = response.json()
         self.token = data.get("token")
@@ -538,23 +641,38 @@ class CriblAPIClient:
         
         return self.session_obj
 
+    def set_pool_size(self, size: int):
+        """Resize the HTTP connection pool so `size` threads can share this client."""
+        adapter = HTTPAdapter(pool_connections=size, pool_maxsize=size)
+        self.http_session.mount('https://', adapter)
+        self.http_session.mount('http://', adapter)
+
     def _ensure_valid_token(self):
         """Ensure we have a valid token, refreshing if needed."""
-        if self.session_obj and self.session_obj.is_expired():
-            # Token expired, re-authenticate
-            self.session_obj = self.login()
-        elif not self.token:
-            # No token yet, login
-            self.login()
-
-    def _request(self, method: str, endpoint: str, **kwargs) -> Any:
-        """Make an API request with automatic token refresh."""
+        with self._auth_lock:
+            if self.session_obj and self.session_obj.is_expired():
+                # Token expired, re-authenticate
+                self.session_obj = self.login()
+            elif not self.token:
+                # No token yet, login
+                self.login()
+
+    def _refresh_token(self, rejected_token: Optional[str]):
+        """Re-authenticate after a 401 unless another thread already did."""
+        with self._auth_lock:
+            if self.token == rejected_token:
+                self.session_obj = self.login()
+
+    def _send(self, method: str, endpoint: str, **kwargs) -> requests.Response:
+        """Send an API request with automatic token refresh and return the raw response."""
         self._ensure_valid_token()
         
         url = f"{self.base_url}/api/v1{endpoint}"
         headers = kwargs.pop('headers', {})
-        headers['Authorization'] = f'Bearer {self.token}'
+        token = self.token
+        headers['Authorization'] = f'Bearer {token}'
         
+        started = time.time()
         response = self.http_session.request(
             method,
             url,
@@ -565,8 +683,9 @@ class CriblAPIClient:
         )
         
         # If we get 401, try refreshing token once
-        if response.status_code == 401:
-            self.session_obj = self.login()
+        auth_retry = response.status_code == 401
+        if auth_retry:
+            self._refresh_token(token)
             headers['Authorization'] = f'Bearer {self.token}'
             response = self.http_session.request(
                 method,
@@ -577,17 +696,63 @@ class CriblAPIClient:
                 **kwargs
             )
         
+        self._record(method, endpoint, started, response, kwargs.get('json'), auth_retry)
+        return response
+
+    def _record(self, method: str, endpoint: str, started: float, response: Any = None,
+                data: Any = None, auth_retry: bool = False):
+        """Append the metrics of a request to the profile file, if profiling is enabled."""
+        if not self.profile_file:
+            return
+        latency = time.time() - started
+        try:
+            line = json.dumps({
+                'time': started,
+                'latency': latency,
+                'method': method,
+                'endpoint': endpoint,
+                'status': getattr(response, 'status_code', None),
+                'bytes_out': len(json.dumps(data)) if data is not None else 0,
+                'bytes_in': len(response.content or b'') if response is not None else 0,
+                'auth_retry': auth_retry,
+            })
+            with self._profile_lock:
+                with open(self.profile_file, 'a', encoding='utf-8') as f:
+                    f.write(line + '\\n')
+        except (OSError, TypeError, ValueError):
+            # Profiling must never break a request
+            pass
+
+    def _handle_response(self, method: str, endpoint: str, response: requests.Response) -> Any:
+        """Decode a response, raising CriblAPIError for error status codes."""
         if response.status_code >= 400:
-            raise CriblAPIError(f"{method} {endpoint} failed: {response.status_code} {response.text}")
+            try:
+                body = response.json()
+            except ValueError:
+                body = response.text
+            raise CriblAPIError(f"{method} {endpoint} failed: {response.status_code} {response.text}",
+                                status_code=response.status_code, endpoint=endpoint, body=body)
         
         if response.content:
             return response.json()
         return {}
 
+    def _request(self, method: str, endpoint: str, **kwargs) -> Any:
+        """Make an API request with automatic token refresh."""
+        response = self._send(method, endpoint, **kwargs)
+        return self._handle_response(method, endpoint, response)
+
     def get(self, endpoint: str, params: Optional[Dict] = None) -> Any:
         """GET request."""
         return self._request('GET', endpoint, params=params)
 
+    def get_or_none(self, endpoint: str, params: Optional[Dict] = None) -> Any:
+        """GET request returning None if the resource does not exist (404)."""
+        response = self._send('GET', endpoint, params=params)
+        if response.status_code == 404:
+            return None
+        return self._handle_response('GET', endpoint, response)
+
     def post(self, endpoint: str, data: Optional[Dict] = None) -> Any:
         """POST request."""
         return self._request('POST', endpoint, json=data)
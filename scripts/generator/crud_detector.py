@@ -9,6 +9,8 @@ import re
 from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 
+from .argspec import format_argspec, format_doc, option_spec
+
 
 class CRUDDetector:
     """Detect resources with CRUD operations from OpenAPI spec."""
@@ -69,6 +71,9 @@ class CRUDDetector:
                         schema = self._extract_schema(operation)
                         if schema:
                             resource_map[base_path]['schemas']['create'] = schema
+                        variants = self._extract_variants(operation)
+                        if variants:
+                            resource_map[base_path]['schemas']['variants'] = variants
         
         # Filter resources that have sufficient CRUD operations
         crud_resources = self._filter_crud_resources(resource_map)
@@ -109,20 +114,31 @@ class CRUDDetector:
         else:
             return endpoint, False
     
-    def _extract_schema(self, operation: Dict) -> Optional[Dict]:
-        """Extract schema from operation request body."""
+    def _request_schema(self, operation: Dict) -> Dict:
+        """Return the raw JSON request body schema of an operation."""
         request_body = operation.get('requestBody', {})
         content = request_body.get('content', {})
         json_content = content.get('application/json', {})
-        schema = json_content.get('schema', {})
+        return json_content.get('schema', {})
+    
+    def _extract_schema(self, operation: Dict) -> Optional[Dict]:
+        """Extract the (resolved) schema properties from operation request body."""
+        schema = self._request_schema(operation)
         
         if '$ref' in schema:
             return self.parser._resolve_schema_ref(schema['$ref'])
-        elif 'properties' in schema:
-            return schema.get('properties', {})
+        elif 'properties' in schema or 'allOf' in schema:
+            return self.parser.resolver.properties(schema)
         
         return None
     
+    def _extract_variants(self, operation: Dict) -> Optional[Dict]:
+        """Extract oneOf/anyOf variants and discriminator of the request body."""
+        schema = self._request_schema(operation)
+        if not schema:
+            return None
+        return self.parser.resolver.variants(schema)
+    
     def _filter_crud_resources(self, resource_map: Dict) -> List[Dict]:
         """
         Filter resources that have sufficient CRUD operations.
@@ -241,14 +257,10 @@ class CRUDDetector:
                 # ID is handled separately
                 continue
             
-            param_type = self.parser._convert_type(prop_def)
-            description = prop_def.get('description', '') or prop_def.get('title', '')
-            
-            params[prop_name] = {
-                'type': param_type,
-                'description': description,
-                'required': False  # Will be determined from required array
-            }
+            # Type, description and nested options/elements/choices; top-level
+            # options stay optional (state=absent only needs the ID)
+            params[prop_name] = option_spec(prop_def)
+            params[prop_name]['required'] = False
         
         return params
     
@@ -261,20 +273,7 @@ class CRUDDetector:
         lines = []
         
         for name, info in params.items():
-            lines.append(f"    {name}:")
-            lines.append(f"        description:")
-            
-            # Handle description
-            desc = info['description'] or f'The {name} parameter'
-            lines.append(f"            - {desc}")
-            
-            lines.append(f"        type: {info['type']}")
-            
-            # Add elements for lists
-            if info['type'] == 'list':
-                lines.append(f"        elements: str")
-            
-            lines.append(f"        required: false")
+            lines.extend(format_doc(name, info))
         
         return '\n'.join(lines)
     
@@ -287,8 +286,7 @@ class CRUDDetector:
         lines = []
         
         for name, info in params.items():
-            param_def = f"        {name}=dict(type='{info['type']}', required=False)"
-            lines.append(param_def)
+            lines.append(format_argspec(name, info))
         
         return ',\n'.join(lines) if lines else ''
 
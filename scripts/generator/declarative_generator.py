@@ -5,23 +5,35 @@ Generates declarative, idempotent Ansible modules for common resources.
 """
 
 from pathlib import Path
-from typing import Dict, List, Optional
-from .templates import DeclarativeTemplate, ExampleTemplate
+from typing import Dict, List, Optional, Set
+from .output import GeneratedFiles
+from .templates import DeclarativeTemplate, ExampleTemplate, ResourceRegistryTemplate
 
 
 class DeclarativeGenerator:
     """Generate declarative Ansible modules."""
 
-    def __init__(self, base_output_dir: Path, parser=None):
+    def __init__(self, base_output_dir: Path, parser=None, files: GeneratedFiles = None):
         self.base_output_dir = base_output_dir
+        self.files = files if files is not None else GeneratedFiles()
         self.template = DeclarativeTemplate()
         self.example_template = ExampleTemplate()
         self.parser = parser
         self.detected_resources = None
 
-    def detect_and_generate(self, products: List[str] = None):
+    def detect_and_generate(self, products: List[str] = None, affected_paths: Set[str] = None):
         """
         Auto-detect resources with CRUD operations and generate declarative modules.
+
+        Args:
+            products: Products to generate (all when None)
+            affected_paths: Paths changed since the previous spec; modules of
+                other resources are kept as they are when they exist.  None
+                generates every module.
+
+        Returns:
+            List of dicts with product, module_name, resource and whether the
+            module was generated again (changed)
         """
         if not self.parser:
             print("  [WARNING] No parser provided, skipping auto-detection")
@@ -55,6 +67,17 @@ class DeclarativeGenerator:
                 module_name = resource['resource_name']
                 module_file = modules_dir / f"{module_name}.py"
                 
+                if affected_paths is not None and \
+                        not {resource['base_path'], resource['id_path']} & affected_paths and \
+                        self.files.keep(module_file):
+                    generated.append({
+                        'product': product,
+                        'module_name': module_name,
+                        'resource': resource,
+                        'changed': False
+                    })
+                    continue
+                
                 # Get parameters from resource schema
                 params = detector.get_resource_params(resource)
                 extra_params_doc = detector.format_params_for_module(params)
@@ -65,6 +88,14 @@ class DeclarativeGenerator:
                 # Determine update method (PATCH or PUT)
                 update_method = resource.get('update_method', 'PATCH')
                 
+                # Pipelines diff and patch their functions individually
+                resource_class = self.template.RESOURCE_CLASSES.get(resource['base_path'], 'CriblResource')
+                extra_returns_doc = ''
+                if resource_class == 'CriblPipeline':
+                    extra_params_doc = '\n'.join(filter(None, [extra_params_doc, self.template.pipeline_params_doc()]))
+                    extra_params_spec = ',\n'.join(filter(None, [extra_params_spec, self.template.pipeline_params_spec()]))
+                    extra_returns_doc = self.template.pipeline_returns_doc()
+                
                 code = self.template.create_resource_module(
                     resource_name=resource['resource_name'],
                     resource_name_title=resource['resource_title'],
@@ -73,26 +104,68 @@ class DeclarativeGenerator:
                     id_param=resource['id_param'],
                     extra_params_doc=extra_params_doc,
                     extra_params_spec=extra_params_spec,
-                    update_method=update_method
+                    update_method=update_method,
+                    resource_class=resource_class,
+                    extra_returns_doc=extra_returns_doc
                 )
                 
-                with open(module_file, 'w', encoding='utf-8') as f:
-                    f.write(code)
+                self.files.write(module_file, code)
                 
                 generated.append({
                     'product': product,
                     'module_name': module_name,
-                    'resource': resource
+                    'resource': resource,
+                    'changed': True
                 })
                 print(f"    [OK] {module_name}")
         
         return generated
     
-    def generate_all(self, products: List[str] = None):
+    def generate_all(self, products: List[str] = None, affected_paths: Set[str] = None):
         """Generate all declarative modules (wrapper for backward compatibility)."""
-        generated = self.detect_and_generate(products)
+        generated = self.detect_and_generate(products, affected_paths)
         self.generate_examples(generated)
+        self.generate_resource_registry(products)
         return generated
+
+    def generate_resource_registry(self, products: List[str] = None):
+        """
+        Write the registry of all detected resource types to each collection.
+        
+        The registry always covers every product so that multi-resource
+        modules (e.g. config_apply) can address any resource type.
+        """
+        if not self.detected_resources:
+            return
+        
+        if products is None:
+            products = ['core', 'stream', 'edge', 'search', 'lake']
+        
+        entries = []
+        seen = set()
+        for product in ['core', 'stream', 'edge', 'search', 'lake']:
+            for resource in self.detected_resources.get(product, []):
+                name = resource['resource_name']
+                # Qualify names that collide across products (e.g. search/lake datasets)
+                if name in seen:
+                    name = f"{product}_{name}"
+                seen.add(name)
+                entries.append(ResourceRegistryTemplate.registry_entry(
+                    name=name,
+                    product=product,
+                    endpoint=resource['base_path'],
+                    id_param=resource['id_param'],
+                    update_method=resource.get('update_method', 'PATCH')
+                ))
+        
+        code = ResourceRegistryTemplate.create_registry_module('\n'.join(entries))
+        
+        for product in products:
+            target_dir = self.base_output_dir / product / 'plugins' / 'module_utils'
+            target_dir.mkdir(parents=True, exist_ok=True)
+            self.files.write(target_dir / 'cribl_resource_types.py', code)
+        
+        print(f"  [REGISTRY] Wrote {len(entries)} resource types")
     
     def generate_examples(self, generated_modules: List[Dict]):
         """Generate example playbooks for declarative modules."""
@@ -125,14 +198,12 @@ class DeclarativeGenerator:
                 )
                 
                 example_file = examples_dir / f"{module_name}_example.yml"
-                with open(example_file, 'w', encoding='utf-8') as f:
-                    f.write(example_content)
+                self.files.write(example_file, example_content)
             
             # Generate combined example
             combined_example = self._generate_combined_example(product, modules)
             combined_file = examples_dir / f"declarative_resources.yml"
-            with open(combined_file, 'w', encoding='utf-8') as f:
-                f.write(combined_example)
+            self.files.write(combined_file, combined_example)
             
             print(f"    [EXAMPLES] Generated {len(modules) + 1} examples for {product}")
     
@@ -193,15 +264,14 @@ class DeclarativeGenerator:
             source_file = temp_file
         
         # Copy to all collections
-        import shutil
+        content = source_file.read_text(encoding='utf-8')
         for product in products:
             target_dir = self.base_output_dir / product / 'plugins' / 'module_utils'
             target_dir.mkdir(parents=True, exist_ok=True)
             target_file = target_dir / 'cribl_declarative.py'
             
             # Copy if it doesn't exist or is different from source
-            if not target_file.exists() or target_file.resolve() != source_file.resolve():
-                shutil.copy(source_file, target_file)
+            if target_file.resolve() != source_file.resolve() and self.files.write(target_file, content):
                 print(f"  [COPY] Copied declarative base classes to {product}")
 
     def _create_base_classes(self, target_file: Path):
@@ -209,12 +279,10 @@ class DeclarativeGenerator:
         # Read from the template in the repo if available
         template_file = Path('resources/module_utils/cribl_declarative.py')
         if template_file.exists():
-            import shutil
-            shutil.copy(template_file, target_file)
+            self.files.write(target_file, template_file.read_text(encoding='utf-8'))
         else:
             # Create a minimal version
-            with open(target_file, 'w', encoding='utf-8') as f:
-                f.write('''# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+            self.files.write(target_file, '''# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
 # Declarative base classes for Cribl Ansible modules
 # See: resources/module_utils/cribl_declarative.py
 
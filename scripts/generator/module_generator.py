@@ -6,7 +6,7 @@ Generates imperative Ansible modules from OpenAPI operations.
 
 import re
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict
 from .templates import ModuleTemplate
 
 
@@ -48,7 +48,8 @@ class ModuleGenerator:
             self.template.examples(module_name, summary, self.product),
             self.template.returns(),
             self.template.imports(self.product),
-            self._generate_main_function(endpoint, method, params)
+            self._generate_module_spec(endpoint, method, params),
+            self.template.main_function()
         ]
         
         return ''.join(code_parts)
@@ -56,75 +57,42 @@ class ModuleGenerator:
     def _generate_documentation(self, module_name: str, endpoint: str, method: str,
                                 summary: str, description: str, params: Dict) -> str:
         """Generate DOCUMENTATION block."""
-        params_doc = self._format_params_doc(params)
+        params_doc = self._format_params_doc(endpoint, params)
         return self.template.documentation(
             module_name, summary, description, 
             endpoint, method, self.product, params_doc
         )
 
-    def _format_params_doc(self, params: Dict) -> str:
+    def _format_params_doc(self, endpoint: str, params: Dict) -> str:
         """Format parameters for documentation."""
         docs = []
         for name, info in params.items():
+            _, required = self._param_location(endpoint, name, info)
             doc = f"""    {name}:
         description:
             - {info['description'] or f'The {name} parameter'}
         type: {info['type']}
-        required: {str(info['required']).lower()}"""
+        required: {str(required).lower()}"""
             docs.append(doc)
         return '\n'.join(docs)
 
-    def _generate_main_function(self, endpoint: str, method: str, params: Dict) -> str:
-        """Generate main() function."""
-        arg_spec = self._format_arg_spec(params)
-        path_params = re.findall(r'\{([^}]+)\}', endpoint)
-        
-        code = self.template.main_function_start(arg_spec)
-        # Define endpoint first, before any substitution
-        # Allow modules to use the original endpoint↴ still supporting worker 
-        # group prefixing.
-        code += f'''
-        endpoint = "{endpoint}"
-        if worker_group:
-            endpoint = f"/m/{{worker_group}}{endpoint}"
-        '''
-        code += self._generate_endpoint_substitution(endpoint, path_params)
-        code += self._generate_data_preparation(params, path_params)
-        code += self.template.api_call_without_endpoint_def(method)
-        
-        return code
+    @staticmethod
+    def _param_location(endpoint: str, name: str, info: Dict):
+        """Return where a parameter is sent and whether it is required."""
+        location = 'path' if name in re.findall(r'\{([^}]+)\}', endpoint) else info.get('location', 'body')
+        # A body property sharing a path parameter's name must not make it optional
+        return location, True if location == 'path' else info['required']
 
-    def _format_arg_spec(self, params: Dict) -> str:
-        """Format argument_spec dict."""
+    def _generate_module_spec(self, endpoint: str, method: str, params: Dict) -> str:
+        """Generate the MODULE_SPEC dict run by cribl_runtime."""
         specs = []
         for name, info in params.items():
-            spec = f"            {name}=dict(type='{info['type']}', required={info['required']})"
-            specs.append(spec)
-        return ',\n'.join(specs)
-
-    def _generate_endpoint_substitution(self, endpoint: str, path_params: List[str]) -> str:
-        """Generate path parameter substitution code."""
-        if not path_params:
-            return ''
-        
-        code = '\n'
-        for param in path_params:
-            code += f'''        {param} = module.params.get('{param}')
-        endpoint = endpoint.replace('{{{{ {param} }}}}', str({param}))
-'''
-        return code
-
-    def _generate_data_preparation(self, params: Dict, path_params: List[str]) -> str:
-        """Generate data dictionary preparation code."""
-        code = '''
-        data = {}
-'''
-        for name in params.keys():
-            if name not in path_params:
-                code += f'''        if module.params.get('{name}') is not None:
-            data['{name}'] = module.params['{name}']
-'''
-        return code
+            location, required = self._param_location(endpoint, name, info)
+            specs.append(
+                f"        {name!r}: dict(type={info['type']!r}, required={required}, "
+                f"location={location!r}),\n"
+            )
+        return self.template.module_spec(endpoint, method, ''.join(specs))
 
     def write_module(self, module_name: str, code: str):
         """Write module to file."""
@@ -4,19 +4,13 @@ OpenAPI Specification Parser
 Handles loading and parsing OpenAPI/Swagger specifications.
 """
 
-import yaml
 import re
 from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 
-# PyYAML's SafeLoader treats a bare "=" key as the YAML 1.1 special "default
-# value" tag (tag:yaml.org,2002:value) and aborts with a ConstructorError.
-# The Cribl OpenAPI schema contains literal "=" scalars, so register a
-# constructor that loads them as plain strings.
-yaml.SafeLoader.add_constructor(
-    'tag:yaml.org,2002:value',
-    lambda loader, node: loader.construct_scalar(node),
-)
+from .argspec import convert_type
+from .schema_resolver import SchemaResolver
+from .spec_cache import load_spec
 
 
 class OpenAPIParser:
@@ -53,26 +47,61 @@ class OpenAPIParser:
     def __init__(self, spec_file: str):
         self.spec_file = Path(spec_file)
         self.spec = None
+        self._resolver = None
+        self._categorizer = None
+        self._categories = {}
 
     def load(self) -> Dict:
         """Load the OpenAPI specification from file."""
         print(f"Loading OpenAPI spec from {self.spec_file}...")
-        with open(self.spec_file, 'r', encoding='utf-8') as f:
-            self.spec = yaml.safe_load(f)
+        self.spec = load_spec(str(self.spec_file))
         print(f"Loaded spec version {self.spec['info']['version']}")
         return self.spec
 
+    @property
+    def resolver(self) -> SchemaResolver:
+        """Memoizing $ref resolver for the loaded spec."""
+        if self._resolver is None or self._resolver.spec is not self.spec:
+            self._resolver = SchemaResolver(self.spec or {})
+        return self._resolver
+
     def get_endpoints(self) -> Dict:
         """Get all endpoints from the spec."""
         return self.spec.get('paths', {})
 
+    @staticmethod
+    def compile_patterns(product_patterns: Dict[str, List[str]]) -> Tuple[re.Pattern, List[str]]:
+        """
+        Compile product patterns into a single alternation regex.
+
+        Each pattern becomes a named group, in PRODUCT_PATTERNS order; regex
+        alternation tries alternatives left to right, so the first matching
+        pattern wins exactly as when the patterns are matched one by one.
+
+        Returns:
+            Tuple of (compiled regex, product of each group index)
+        """
+        alternatives = []
+        products = []
+        for product, patterns in product_patterns.items():
+            for pattern in patterns:
+                alternatives.append(f'(?P<p{len(products)}>{pattern})')
+                products.append(product)
+        return re.compile('|'.join(alternatives)), products
+
     def categorize_endpoint(self, endpoint: str) -> str:
         """Determine which product collection an endpoint belongs to."""
-        for product, patterns in self.PRODUCT_PATTERNS.items():
-            for pattern in patterns:
-                if re.match(pattern, endpoint):
-                    return product
-        return 'core'
+        product = self._categories.get(endpoint)
+        if product is not None:
+            return product
+
+        if self._categorizer is None:
+            self._categorizer = self.compile_patterns(self.PRODUCT_PATTERNS)
+        regex, products = self._categorizer
+        match = regex.match(endpoint)
+        product = products[int(match.lastgroup[1:])] if match else 'core'
+        self._categories[endpoint] = product
+        return product
 
     def get_operation_info(self, operation: Dict) -> Tuple[str, str]:
         """Extract operation summary and description."""
@@ -145,32 +174,9 @@ class OpenAPIParser:
         return params
 
     def _resolve_schema_ref(self, ref: str) -> Dict:
-        """Resolve a $ref to actual schema properties."""
-        ref_path = ref.split('/')
-        schema = self.spec
-        for part in ref_path:
-            if part == '#':
-                continue
-            schema = schema.get(part, {})
-        return schema.get('properties', {})
+        """Resolve a $ref to its schema properties (nested refs resolved, allOf flattened)."""
+        return self.resolver.properties(ref)
 
     def _convert_type(self, schema: Dict) -> str:
         """Convert OpenAPI type to Ansible module type."""
-        type_map = {
-            'string': 'str',
-            'integer': 'int',
-            'number': 'float',
-            'boolean': 'bool',
-            'array': 'list',
-            'object': 'dict'
-        }
-        # Defend against non-dict schemas (e.g. JSON Schema boolean values).
-        if not isinstance(schema, dict):
-            return 'str'
-        schema_type = schema.get('type', 'str')
-        # OpenAPI 3.1 allows `type` to be a list (e.g. ['string', 'null']);
-        # use the first non-null type when that happens.
-        if isinstance(schema_type, list):
-            schema_type = next((t for t in schema_type if t != 'null'), 'str')
-        return type_map.get(schema_type, 'str')
-
+        return convert_type(schema)
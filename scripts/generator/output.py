@@ -0,0 +1,223 @@
+"""
+Generated Output Tracking
+
+Writes generated files only when their content changed and removes stale
+files precisely, using a manifest of content hashes kept in the output
+directory, so unchanged files keep their mtimes across runs.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+
+MANIFEST_NAME = '.generated_manifest.json'
+
+# Bumped whenever the manifest layout changes
+MANIFEST_FORMAT = 1
+
+
+def content_sha256(content: str) -> str:
+    """Return the sha256 of text content."""
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+class GeneratedFiles:
+    """
+    Track the files written by a generator run.
+
+    Each file is compared with the manifest of the previous run (and, when its
+    size or mtime changed since, with the file itself) and only written when
+    its content differs.  Files listed in the manifest but not produced by the
+    current run are stale and removed by prune().
+    """
+
+    def __init__(self, root: Path = None):
+        """
+        Initialize the tracker.
+
+        Args:
+            root: Output directory holding the manifest, or None to only skip
+                writes of unchanged files without a manifest
+        """
+        self.root = Path(root) if root is not None else None
+        self.previous = self._load()
+        self.files = {}
+        self.status = {}
+        self.removed = []
+        self._lock = threading.Lock()
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.root / MANIFEST_NAME
+
+    @property
+    def has_manifest(self) -> bool:
+        """Whether a previous run left a manifest."""
+        return bool(self.previous)
+
+    def _load(self) -> Dict:
+        if self.root is None:
+            return {}
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if data.get('format') != MANIFEST_FORMAT:
+            return {}
+        return data.get('files', {})
+
+    def _key(self, path: Path) -> str:
+        """Return the manifest key of a path (relative to the root when inside it)."""
+        path = Path(os.path.abspath(path))
+        if self.root is not None:
+            try:
+                return path.relative_to(os.path.abspath(self.root)).as_posix()
+            except ValueError:
+                pass
+        return str(path)
+
+    def _path(self, key: str) -> Path:
+        if os.path.isabs(key):
+            return Path(key)
+        return self.root / key
+
+    def needs_write(self, path: Path, content: str) -> bool:
+        """
+        Record a file produced by this run and return whether it must be written.
+
+        Safe to call from several threads.
+        """
+        key = self._key(path)
+        digest = content_sha256(content)
+        entry = self.previous.get(key)
+
+        status = None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            stat = None
+        if stat is None:
+            status = 'added'
+        elif entry is not None and entry['sha256'] == digest and \
+                entry.get('size') == stat.st_size and entry.get('mtime_ns') == stat.st_mtime_ns:
+            status = None
+        else:
+            # No trustworthy manifest entry: compare with the file itself
+            with open(path, 'rb') as f:
+                if hashlib.sha256(f.read()).hexdigest() != digest:
+                    status = 'changed'
+
+        with self._lock:
+            self.files[key] = digest
+            # A file written twice in a run keeps the status of its first write
+            if self.status.get(key) is None:
+                self.status[key] = status
+        return status is not None
+
+    def keep(self, path: Path) -> bool:
+        """
+        Record an existing file as produced by this run without rendering it again.
+
+        Returns:
+            Whether the file exists; when it does not, the caller must write it
+        """
+        key = self._key(path)
+        entry = self.previous.get(key)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return False
+        if entry is not None and entry.get('size') == stat.st_size and \
+                entry.get('mtime_ns') == stat.st_mtime_ns:
+            digest = entry['sha256']
+        else:
+            with open(path, 'rb') as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+
+        with self._lock:
+            self.files[key] = digest
+            self.status.setdefault(key, None)
+        return True
+
+    def write(self, path: Path, content: str) -> bool:
+        """
+        Write a file if its content changed.
+
+        Returns:
+            Whether the file was written
+        """
+        if not self.needs_write(path, content):
+            return False
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        return True
+
+    def prune(self, scopes: Iterable[Path]) -> List[str]:
+        """
+        Remove files of the previous run that this run did not produce.
+
+        Args:
+            scopes: Directories whose stale files may be removed (e.g. the
+                products generated by this run)
+
+        Returns:
+            Manifest keys of the removed files
+        """
+        prefixes = [self._key(scope).rstrip('/') + '/' for scope in scopes]
+        removed = []
+        for key in sorted(self.previous):
+            if key in self.files or not any(key.startswith(prefix) for prefix in prefixes):
+                continue
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+            removed.append(key)
+        self.removed.extend(removed)
+        return removed
+
+    def save(self):
+        """
+        Write the manifest of this run.
+
+        Entries of the previous run outside this run's files are kept unless
+        they were pruned, so partial runs (e.g. a single product) do not forget
+        the other products.
+        """
+        if self.root is None:
+            return
+        removed = set(self.removed)
+        files = dict((key, entry) for key, entry in self.previous.items() if key not in removed)
+        for key, digest in self.files.items():
+            try:
+                stat = os.stat(self._path(key))
+            except OSError:
+                continue
+            files[key] = {'sha256': digest, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_name(f'.{MANIFEST_NAME}.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'format': MANIFEST_FORMAT, 'files': files}, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+
+    def changes(self, status: str) -> List[str]:
+        """Return the sorted manifest keys of files 'added', 'changed' or 'removed' by this run."""
+        if status == 'removed':
+            return sorted(self.removed)
+        return sorted(key for key, value in self.status.items() if value == status)
+
+    def summary(self) -> Dict[str, int]:
+        """Return the number of added, changed, removed and unchanged files."""
+        return {
+            'added': len(self.changes('added')),
+            'changed': len(self.changes('changed')),
+            'removed': len(self.removed),
+            'unchanged': sum(1 for value in self.status.values() if value is None),
+        }
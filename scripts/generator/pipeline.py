@@ -0,0 +1,120 @@
+"""
+Generation Pipeline
+
+Renders imperative modules in worker processes and writes them from a single
+bounded writer thread, so output does not depend on the number of workers.
+"""
+
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from .module_generator import ModuleGenerator
+
+
+class ModuleTask(NamedTuple):
+    """One (endpoint, method) work item, with everything needed to render it."""
+    product: str
+    module_name: str
+    endpoint: str
+    method: str
+    operation: Dict
+    params: Dict
+    summary: str
+    description: str
+
+
+# Generators reused by the tasks a worker process renders
+_GENERATORS = {}
+
+
+def render_module(task: ModuleTask) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Render the code of a module.
+
+    Runs in worker processes, so it only depends on the task.
+
+    Returns:
+        Tuple of (code, error message)
+    """
+    generator = _GENERATORS.get(task.product)
+    if generator is None:
+        generator = _GENERATORS[task.product] = ModuleGenerator(None, task.product)
+    try:
+        code = generator.generate(
+            task.module_name, task.endpoint, task.method, task.operation,
+            task.params, task.summary, task.description
+        )
+    except Exception as e:
+        return None, str(e)
+    return code, None
+
+
+def render_modules(tasks: List[ModuleTask], jobs: int = None) -> Iterator[Tuple[ModuleTask, Optional[str], Optional[str]]]:
+    """
+    Render modules, in worker processes when jobs is greater than one.
+
+    Results are yielded in task order whatever the number of workers.
+
+    Yields:
+        Tuples of (task, code, error message)
+    """
+    jobs = jobs or os.cpu_count() or 1
+    if jobs <= 1 or len(tasks) <= 1:
+        for task in tasks:
+            yield (task,) + render_module(task)
+        return
+
+    chunksize = max(1, len(tasks) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        for task, result in zip(tasks, executor.map(render_module, tasks, chunksize=chunksize)):
+            yield (task,) + result
+
+
+class BoundedWriter:
+    """
+    Write files from a background thread through a bounded queue.
+
+    Rendering keeps going while files are written, and at most max_pending
+    rendered files are held in memory.  Errors are raised by close().
+    """
+
+    def __init__(self, max_pending: int = 64):
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._error = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def write(self, path: Path, content: str):
+        """Queue a file to be written, blocking while the queue is full."""
+        self._queue.put((path, content))
+
+    def close(self):
+        """Wait for queued files to be written."""
+        self._queue.put(None)
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            if self._error is not None:
+                continue
+            path, content = item
+            try:
+                with open(path, 'w', encoding='utf-8') as f:
+                    f.write(content)
+            except OSError as e:
+                self._error = e
@@ -0,0 +1,259 @@
+"""
+Schema Resolver
+
+Resolves $ref pointers of an OpenAPI specification recursively, memoized by
+ref string, flattening allOf composition and keeping oneOf/anyOf variants
+and discriminators as metadata.
+"""
+
+from typing import Dict, Iterator, Optional
+
+
+# Marks a $ref that points back at a schema still being resolved
+CYCLE_MARKER = 'x-cycle'
+
+# Refs nested deeper than this are left unresolved (resolve_ref them on demand)
+MAX_REF_DEPTH = 64
+
+
+def iter_refs(node) -> Iterator[str]:
+    """Yield every $ref string found in a schema or operation, at any depth."""
+    stack = [node]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, dict):
+            ref = item.get('$ref')
+            if isinstance(ref, str):
+                yield ref
+            stack.extend(item.values())
+        elif isinstance(item, list):
+            stack.extend(item)
+
+
+class SchemaResolver:
+    """
+    Resolve schemas of an OpenAPI specification.
+
+    Every $ref is resolved once; later lookups of the same ref return the
+    same (shared) object, so callers must not modify resolved schemas.
+
+    A ref's result never depends on the order refs are resolved in: within
+    a group of mutually recursive schemas, the ref being resolved expands the
+    other members one level and cuts every further reference to the group
+    with a cycle marker.
+    """
+
+    def __init__(self, spec: Dict):
+        self.spec = spec
+        # (ref, shallow) -> (resolved, ref levels) of results not cut at MAX_REF_DEPTH
+        self._resolved = {}
+        # (ref, shallow, depth) -> resolved, for results cut at MAX_REF_DEPTH
+        self._cut = {}
+        # ref -> its group of mutually recursive refs (strongly connected component)
+        self._component = {}
+        # Component, root ref and shallowness of the ref being resolved
+        self._scope = None
+        self._depth = 0
+        self._height = 0
+        self._cutoff = False
+
+    def lookup(self, ref: str) -> Dict:
+        """Return the raw schema a local JSON pointer ($ref) points to."""
+        node = self.spec
+        for part in ref.lstrip('#').split('/'):
+            if not part:
+                continue
+            part = part.replace('~1', '/').replace('~0', '~')
+            if not isinstance(node, dict):
+                return {}
+            node = node.get(part, {})
+        return node if isinstance(node, dict) else {}
+
+    def _find_components(self, ref: str):
+        """Assign the refs reachable from ref to their strongly connected components (Tarjan)."""
+        index = {ref: 0}
+        low = {ref: 0}
+        stack = [ref]
+        on_stack = {ref}
+        work = [(ref, iter(set(iter_refs(self.lookup(ref)))))]
+        while work:
+            node, children = work[-1]
+            for child in children:
+                if child in self._component:
+                    continue
+                if child not in index:
+                    index[child] = low[child] = len(index)
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(set(iter_refs(self.lookup(child))))))
+                    break
+                if child in on_stack:
+                    low[node] = min(low[node], index[child])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        self._component[member] = node
+                        if member == node:
+                            break
+
+    def resolve_ref(self, ref: str) -> Dict:
+        """
+        Return the fully resolved schema of a $ref.
+
+        A reference back into the group of recursive schemas being resolved
+        is left as {'$ref': ref, 'x-cycle': True}, and refs nested more than
+        MAX_REF_DEPTH levels deep as {'$ref': ref}.
+        """
+        if self._depth >= MAX_REF_DEPTH:
+            self._cutoff = True
+            return {'$ref': ref}
+        if ref not in self._component:
+            self._find_components(ref)
+        component = self._component[ref]
+
+        # Shallow results cut every reference to their own component
+        shallow = False
+        if self._scope is not None and self._scope[0] == component:
+            if self._scope[2] or self._scope[1] == ref:
+                self._height = max(self._height, 1)
+                return {'$ref': ref, CYCLE_MARKER: True}
+            shallow = True
+
+        cached = self._resolved.get((ref, shallow))
+        if cached is not None and self._depth + cached[1] <= MAX_REF_DEPTH:
+            self._height = max(self._height, cached[1])
+            return cached[0]
+        cut_key = (ref, shallow, self._depth)
+        if cut_key in self._cut:
+            self._cutoff = True
+            return self._cut[cut_key]
+
+        outer = (self._scope, self._height, self._cutoff)
+        self._scope, self._height, self._cutoff = (component, ref, shallow), 0, False
+        self._depth += 1
+        try:
+            resolved = self.resolve(self.lookup(ref))
+            height, cutoff = self._height + 1, self._cutoff
+        finally:
+            self._depth -= 1
+            self._scope, self._height, self._cutoff = outer
+
+        # A result cut at MAX_REF_DEPTH depends on the depth it was resolved at
+        if cutoff:
+            self._cut[cut_key] = resolved
+            self._cutoff = True
+        else:
+            self._resolved[(ref, shallow)] = (resolved, height)
+            self._height = max(self._height, height)
+        return resolved
+
+    def resolve(self, schema):
+        """
+        Resolve a schema: follow $refs, flatten allOf and resolve nested
+        properties, items, additionalProperties and oneOf/anyOf variants.
+        """
+        if not isinstance(schema, dict):
+            return schema
+        if '$ref' in schema:
+            return self.resolve_ref(schema['$ref'])
+
+        # Resolve the schema's own keys; allOf parts are resolved already
+        own = dict((k, v) for k, v in schema.items() if k != 'allOf')
+        if isinstance(own.get('properties'), dict):
+            own['properties'] = dict(
+                (name, self.resolve(prop)) for name, prop in own['properties'].items())
+        if 'items' in own:
+            own['items'] = self.resolve(own['items'])
+        if isinstance(own.get('additionalProperties'), dict):
+            own['additionalProperties'] = self.resolve(own['additionalProperties'])
+        for key in ('oneOf', 'anyOf'):
+            if isinstance(own.get(key), list):
+                own[key] = [self.resolve(variant) for variant in own[key]]
+
+        if not schema.get('allOf'):
+            return own
+        resolved = {}
+        for part in schema['allOf']:
+            self._merge(resolved, self.resolve(part))
+        self._merge(resolved, own, override=True)
+        return resolved
+
+    @staticmethod
+    def _merge(target: Dict, source, override: bool = False):
+        """Merge an allOf part (or the schema's own keys, with override) into target."""
+        if not isinstance(source, dict):
+            return
+        for key, value in source.items():
+            if key == 'properties' and isinstance(value, dict):
+                properties = dict(target.get('properties') or {})
+                properties.update(value)
+                target['properties'] = properties
+            elif key == 'required' and isinstance(value, list):
+                required = list(target.get('required') or [])
+                required.extend(name for name in value if name not in required)
+                target['required'] = required
+            elif override or key not in target:
+                target[key] = value
+
+    def properties(self, schema) -> Dict:
+        """Return the resolved (allOf-flattened) properties of a schema or $ref string."""
+        if isinstance(schema, str):
+            schema = self.resolve_ref(schema)
+        else:
+            schema = self.resolve(schema)
+        if not isinstance(schema, dict):
+            return {}
+        return schema.get('properties') or {}
+
+    def variants(self, schema) -> Optional[Dict]:
+        """
+        Return the oneOf/anyOf metadata of a schema or $ref string.
+
+        Returns:
+            Dict with kind ('oneOf' or 'anyOf'), the discriminator property
+            name and mapping, and one entry per variant (its discriminator
+            value, when known, and resolved schema), or None
+        """
+        raw = {'$ref': schema} if isinstance(schema, str) else schema
+        seen = set()
+        # Follow the $ref chain to the schema declaring the variants
+        while isinstance(raw, dict) and '$ref' in raw and raw['$ref'] not in seen:
+            seen.add(raw['$ref'])
+            raw = self.lookup(raw['$ref'])
+        resolved = self.resolve(raw)
+        if not isinstance(resolved, dict):
+            return None
+        kind = next((key for key in ('oneOf', 'anyOf') if isinstance(resolved.get(key), list)), None)
+        if kind is None:
+            return None
+
+        discriminator = resolved.get('discriminator') or {}
+        property_name = discriminator.get('propertyName')
+        mapping = discriminator.get('mapping') or {}
+        by_ref = dict((ref, value) for value, ref in mapping.items())
+        raw_variants = raw.get(kind) or []
+
+        variants = []
+        for index, variant in enumerate(resolved[kind]):
+            raw_variant = raw_variants[index] if index < len(raw_variants) else {}
+            value = by_ref.get(raw_variant.get('$ref')) if isinstance(raw_variant, dict) else None
+            if value is None and property_name and isinstance(variant, dict):
+                # Fall back to a single-valued enum of the discriminator property
+                prop = (variant.get('properties') or {}).get(property_name) or {}
+                enum = prop.get('enum') if isinstance(prop, dict) else None
+                if isinstance(enum, list) and len(enum) == 1:
+                    value = enum[0]
+            variants.append({'value': value, 'schema': variant})
+
+        return {
+            'kind': kind,
+            'discriminator': property_name,
+            'mapping': mapping,
+            'variants': variants,
+        }
@@ -0,0 +1,105 @@
+"""
+OpenAPI Specification Cache
+
+Parses the OpenAPI specification once per content hash and keeps the parsed
+object in a pickle file, so later generator runs skip YAML parsing entirely.
+"""
+
+import hashlib
+import os
+import pickle
+from pathlib import Path
+from typing import Dict, Optional
+
+import yaml
+
+
+def _construct_value(loader, node):
+    return loader.construct_scalar(node)
+
+
+# PyYAML's SafeLoader treats a bare "=" key as the YAML 1.1 special "default
+# value" tag (tag:yaml.org,2002:value) and aborts with a ConstructorError.
+# The Cribl OpenAPI schema contains literal "=" scalars, so register a
+# constructor that loads them as plain strings.
+yaml.SafeLoader.add_constructor('tag:yaml.org,2002:value', _construct_value)
+
+# libyaml's loader is an order of magnitude faster than the pure-Python one
+SpecLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+SpecLoader.add_constructor('tag:yaml.org,2002:value', _construct_value)
+
+# Bumped whenever the cached representation changes
+CACHE_FORMAT = 1
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent.parent.parent / '.cache' / 'openapi'
+
+# Specs already loaded by this process, by content hash
+_LOADED = {}
+
+
+def file_sha256(path: str) -> str:
+    """Return the sha256 of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_dir() -> Path:
+    """Return the cache directory (CRIBL_SPEC_CACHE_DIR overrides the default)."""
+    return Path(os.environ.get('CRIBL_SPEC_CACHE_DIR') or DEFAULT_CACHE_DIR)
+
+
+def load_spec(path: str, use_cache: bool = True) -> Dict:
+    """
+    Load an OpenAPI specification, from the cache when its content was parsed before.
+
+    The same object is returned to every caller of a process, so the spec is
+    parsed at most once per run and not at all once the cache is warm.
+
+    Args:
+        path: Path to the OpenAPI YAML file
+        use_cache: Read and write the on-disk cache
+
+    Returns:
+        Parsed specification
+    """
+    digest = file_sha256(path)
+    if digest in _LOADED:
+        return _LOADED[digest]
+
+    cache_file = cache_dir() / f'{digest}.pickle'
+    spec = _read_cache(cache_file) if use_cache else None
+    if spec is None:
+        with open(path, 'r', encoding='utf-8') as f:
+            spec = yaml.load(f, Loader=SpecLoader)
+        if use_cache:
+            _write_cache(cache_file, spec)
+
+    _LOADED[digest] = spec
+    return spec
+
+
+def _read_cache(cache_file: Path) -> Optional[Dict]:
+    """Return the cached spec, or None when missing, stale or unreadable."""
+    try:
+        with open(cache_file, 'rb') as f:
+            entry = pickle.load(f)
+    except Exception:
+        return None
+    if not isinstance(entry, dict) or entry.get('format') != CACHE_FORMAT:
+        return None
+    return entry.get('spec')
+
+
+def _write_cache(cache_file: Path, spec: Dict):
+    """Write the cache entry atomically; failures only cost the next run a parse."""
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_name(f'.{cache_file.name}.{os.getpid()}')
+        with open(tmp_file, 'wb') as f:
+            pickle.dump({'format': CACHE_FORMAT, 'spec': spec}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, cache_file)
+    except (OSError, pickle.PicklingError):
+        pass
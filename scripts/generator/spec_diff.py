@@ -0,0 +1,97 @@
+"""
+Specification Diff
+
+Structural diff of two OpenAPI specifications: paths and operations added,
+removed or changed, where an operation also counts as changed when any
+schema it references, directly or through other schemas, changed.
+"""
+
+from typing import Dict, Iterator, List, Set, Tuple
+
+from .schema_resolver import SchemaResolver, iter_refs
+
+
+# Path item keys that are not operations
+PATH_ITEM_KEYS = ('parameters', 'servers', 'summary', 'description', '$ref')
+
+
+def iter_operations(spec: Dict) -> Iterator[Tuple[str, str, Dict]]:
+    """Yield (path, method, operation) for every operation of a spec, with path-level parameters."""
+    for path, path_item in (spec.get('paths') or {}).items():
+        if not isinstance(path_item, dict):
+            continue
+        for method, operation in path_item.items():
+            if method in PATH_ITEM_KEYS or not isinstance(operation, dict):
+                continue
+            yield path, method, {'operation': operation, 'parameters': path_item.get('parameters')}
+
+
+class SpecDiff:
+    """
+    Compare an old and a new specification.
+
+    Attributes:
+        added, removed, changed: Sorted (path, method) operations
+        changed_refs: Sorted $refs, reachable from the new spec's operations,
+            whose content differs between the specs
+    """
+
+    def __init__(self, old_spec: Dict, new_spec: Dict):
+        self.old = SchemaResolver(old_spec)
+        self.new = SchemaResolver(new_spec)
+
+        old_operations = dict(((path, method), op) for path, method, op in iter_operations(old_spec))
+        new_operations = dict(((path, method), op) for path, method, op in iter_operations(new_spec))
+
+        dependencies = self._dependencies(new_operations.values())
+        self.changed_refs = sorted(
+            ref for ref in dependencies if self.old.lookup(ref) != self.new.lookup(ref))
+        affected_refs = self._dependents(dependencies, self.changed_refs)
+
+        self.added = sorted(key for key in new_operations if key not in old_operations)
+        self.removed = sorted(key for key in old_operations if key not in new_operations)
+        self.changed = sorted(
+            key for key, op in new_operations.items()
+            if key in old_operations and (
+                op != old_operations[key] or any(ref in affected_refs for ref in iter_refs(op))))
+
+    def _dependencies(self, operations) -> Dict[str, Set[str]]:
+        """Return the refs reachable from the operations, each with the refs it uses directly."""
+        dependencies = {}
+        pending = [ref for op in operations for ref in iter_refs(op)]
+        while pending:
+            ref = pending.pop()
+            if ref in dependencies:
+                continue
+            dependencies[ref] = set(iter_refs(self.new.lookup(ref)))
+            pending.extend(dependencies[ref] - set(dependencies))
+        return dependencies
+
+    @staticmethod
+    def _dependents(dependencies: Dict[str, Set[str]], changed: List[str]) -> Set[str]:
+        """Return the changed refs and every ref that uses one of them, transitively."""
+        users = {}
+        for ref, used in dependencies.items():
+            for dependency in used:
+                users.setdefault(dependency, set()).add(ref)
+        affected = set(changed)
+        pending = list(changed)
+        while pending:
+            for user in users.get(pending.pop(), ()):
+                if user not in affected:
+                    affected.add(user)
+                    pending.append(user)
+        return affected
+
+    @property
+    def affected(self) -> Set[Tuple[str, str]]:
+        """Operations whose modules must be generated again (added or changed)."""
+        return set(self.added) | set(self.changed)
+
+    @property
+    def affected_paths(self) -> Set[str]:
+        """Paths with an added, removed or changed operation."""
+        return set(path for path, _ in self.added + self.removed + self.changed)
+
+    def is_empty(self) -> bool:
+        return not (self.added or self.removed or self.changed)
@@ -112,157 +112,81 @@ msg:
     def imports(product: str) -> str:
         return f'''
 from ansible.module_utils.basic import AnsibleModule
-from ansible_collections.cribl.{product}.plugins.module_utils.cribl_api import (
-    CriblAPIClient,
-    CriblAPIError
+from ansible_collections.cribl.{product}.plugins.module_utils.cribl_runtime import (
+    module_args,
+    run_module
 )
 '''
 
     @staticmethod
-    def main_function_start(arg_spec: str) -> str:
+    def module_spec(endpoint: str, method: str, params_spec: str) -> str:
+        """MODULE_SPEC consumed by cribl_runtime; params_spec holds one line per parameter, newline-terminated."""
         return f'''
 
-def main():
-    module = AnsibleModule(
-        argument_spec=dict(
-            session=dict(type='dict', required=False),
-            base_url=dict(type='str', required=False),
-            token=dict(type='str', required=False, no_log=True),
-            validate_certs=dict(type='bool', default=False),
-            timeout=dict(type='int', default=30),
-            state=dict(type='str', default='present', choices=['present', 'absent']),
-            worker_group=dict(type='str', required=False),
-{arg_spec}
-        ),
-        required_one_of=[['session', 'token']],
-        mutually_exclusive=[['session', 'base_url']],
-        supports_check_mode=True,
-    )
-
-    session = module.params.get('session')
-    base_url = module.params.get('base_url')
-    token = module.params.get('token')
-    validate_certs = module.params['validate_certs']
-    timeout = module.params['timeout']
-    state = module.params['state']
-    worker_group = module.params.get('worker_group')
-
-    try:
-        # Initialize client with session or token
-        if session:
-            client = CriblAPIClient(session=session)
-        else:
-            client = CriblAPIClient(
-                base_url=base_url,
-                token=token,
-                validate_certs=validate_certs,
-                timeout=timeout
-            )
+MODULE_SPEC = {{
+    'endpoint': {endpoint!r},
+    'method': {method.upper()!r},
+    'params': {{
+{params_spec}    }},
+}}
 '''
 
     @staticmethod
-    def api_call(endpoint: str, method: str) -> str:
-        """Legacy method - kept for compatibility"""
-        return f'''
-        endpoint = "{endpoint}"
-        
-        if module.check_mode:
-            module.exit_json(
-                changed=True,
-                msg="Check mode: Would perform {method.upper()} request to {{endpoint}}",
-                endpoint=endpoint
-            )
-
-        method = "{method.upper()}"
-        if method == "GET":
-            response = client.get(endpoint, params=data if data else None)
-            changed = False
-        elif method == "POST":
-            response = client.post(endpoint, data=data if data else None)
-            changed = True
-        elif method == "PUT":
-            response = client.put(endpoint, data=data if data else None)
-            changed = True
-        elif method == "PATCH":
-            response = client.patch(endpoint, data=data if data else None)
-            changed = True
-        elif method == "DELETE":
-            response = client.delete(endpoint)
-            changed = True
-        else:
-            module.fail_json(msg=f"Unsupported method: {{method}}")
-
-        module.exit_json(
-            changed=changed,
-            msg=f"{{method}} request to {{endpoint}} successful",
-            response=response
-        )
+    def main_function() -> str:
+        return '''
 
-    except CriblAPIError as e:
-        module.fail_json(msg=str(e))
-    except Exception as e:
-        module.fail_json(msg=f"Unexpected error: {{str(e)}}")
+def main():
+    run_module(AnsibleModule(**module_args(MODULE_SPEC)), MODULE_SPEC)
 
 
 if __name__ == '__main__':
     main()
 '''
 
-    @staticmethod
-    def api_call_without_endpoint_def(method: str) -> str:
-        """API call logic without endpoint definition (endpoint already defined)"""
-        return f'''
-        if module.check_mode:
-            module.exit_json(
-                changed=True,
-                msg="Check mode: Would perform {method.upper()} request to {{endpoint}}",
-                endpoint=endpoint
-            )
 
-        method = "{method.upper()}"
-        if method == "GET":
-            response = client.get(endpoint, params=data if data else None)
-            changed = False
-        elif method == "POST":
-            response = client.post(endpoint, data=data if data else None)
-            changed = True
-        elif method == "PUT":
-            response = client.put(endpoint, data=data if data else None)
-            changed = True
-        elif method == "PATCH":
-            response = client.patch(endpoint, data=data if data else None)
-            changed = True
-        elif method == "DELETE":
-            response = client.delete(endpoint)
-            changed = True
-        else:
-            module.fail_json(msg=f"Unsupported method: {{method}}")
+class DeclarativeTemplate:
+    """Templates for declarative Ansible modules."""
 
-        module.exit_json(
-            changed=changed,
-            msg=f"{{method}} request to {{endpoint}} successful",
-            response=response
-        )
+    # Endpoints managed by a specialised resource class in cribl_declarative
+    RESOURCE_CLASSES = {
+        '/pipelines': 'CriblPipeline',
+    }
 
-    except CriblAPIError as e:
-        module.fail_json(msg=str(e))
-    except Exception as e:
-        module.fail_json(msg=f"Unexpected error: {{str(e)}}")
+    @staticmethod
+    def pipeline_params_doc() -> str:
+        """Documentation of the options consumed by CriblPipeline."""
+        return '''    function_key:
+        description:
+            - Function field used as the stable key matching desired functions to existing ones.
+            - Functions without the field, or all functions when omitted, are keyed by their
+              function ID and their occurrence among functions with the same ID.
+            - Changes are compared and reported per function, and server defaults of unset
+              function fields never cause an update.
+        type: str
+        required: false'''
 
+    @staticmethod
+    def pipeline_params_spec() -> str:
+        """Argument spec of the options consumed by CriblPipeline."""
+        return "        function_key=dict(type='str', required=False)"
 
-if __name__ == '__main__':
-    main()
+    @staticmethod
+    def pipeline_returns_doc() -> str:
+        """Return documentation of the keys added by CriblPipeline."""
+        return '''function_changes:
+    description: Keys of the added, removed, modified and moved pipeline functions
+    type: dict
+    returned: when the pipeline functions are updated
+    sample: {"added": ["mask#0"], "removed": [], "modified": ["eval#1"], "moved": []}
 '''
 
-
-class DeclarativeTemplate:
-    """Templates for declarative Ansible modules."""
-
     @staticmethod
     def create_resource_module(resource_name: str, resource_name_title: str, 
                                product: str, endpoint_base: str, id_param: str,
                                extra_params_doc: str = "", extra_params_spec: str = "", 
-                               update_method: str = "PATCH") -> str:
+                               update_method: str = "PATCH",
+                               resource_class: str = "CriblResource",
+                               extra_returns_doc: str = "") -> str:
         return f'''#!/usr/bin/python
 # -*- coding: utf-8 -*-
 
@@ -298,6 +222,57 @@ options:
             - If omitted, the resource is managed globally (leader node or default context).
         type: str
         required: false
+    worker_groups:
+        description:
+            - Worker Group IDs to reconcile the same desired state in, concurrently.
+            - Use C(all) for every worker group on the leader.
+            - Mutually exclusive with C(worker_group).
+        type: list
+        elements: str
+        required: false
+    parallelism:
+        description:
+            - Maximum number of worker groups reconciled concurrently with C(worker_groups).
+        type: int
+        default: 8
+    max_fail_percentage:
+        description:
+            - Percentage of worker groups in C(worker_groups) that may fail without failing the task.
+        type: int
+        default: 0
+    state_file:
+        description:
+            - Path of a local state file recording content hashes of applied resources.
+            - If the desired state is unchanged since it was last applied and the worker group's
+              config version has not moved, the resource is reported unchanged without being read.
+            - Can also be set with the C(CRIBL_STATE_FILE) environment variable.
+        type: path
+        required: false
+    state_check_ttl:
+        description:
+            - Seconds a worker group config version check recorded in C(state_file) is reused
+              by later runs without asking the server again.
+            - C(0) checks once per task.
+        type: int
+        default: 0
+    change_journal:
+        description:
+            - Path of a change journal recording worker groups with uncommitted changes.
+            - Use M(cribl.core.commit_deploy) at the end of the play to commit and deploy each changed
+              worker group once.
+            - Can also be set with the C(CRIBL_CHANGE_JOURNAL) environment variable.
+        type: path
+        required: false
+    conflict_retries:
+        description:
+            - Before an update, the resource is read again and its revision (C(version) or
+              C(updatedAt), or a content hash when it has neither) compared with the state the change
+              was computed from, so concurrent edits by other runs are not silently overwritten.
+            - On a conflict, or a 409 or 412 response, the resource is re-read, re-diffed and the
+              update retried up to this many times before failing.
+            - C(0) disables the check and its extra read.
+        type: int
+        default: 3
     state:
         description:
             - Desired state of the {resource_name}.
@@ -344,6 +319,15 @@ EXAMPLES = r\'\'\'
     worker_group: production
     state: absent
 
+- name: Ensure {resource_name} exists in every worker group
+  cribl.{product}.{resource_name}:
+    session: "{{{{ cribl_session.session }}}}"
+    {id_param}: my_{resource_name}
+    worker_groups: all
+    parallelism: 16
+    max_fail_percentage: 10
+    state: present
+
 # Alternative: Direct authentication with token
 - name: Ensure {resource_name} exists
   cribl.{product}.{resource_name}:
@@ -365,8 +349,13 @@ msg:
 resource:
     description: Current state of the resource
     type: dict
-    returned: when state=present
-\'\'\'
+    returned: when state=present and worker_groups is not used
+results:
+    description: Per worker group results, each with worker_group, changed, failed and msg keys
+    type: list
+    elements: dict
+    returned: when worker_groups is used
+{extra_returns_doc}\'\'\'
 
 from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.cribl.{product}.plugins.module_utils.cribl_api import (
@@ -374,25 +363,40 @@ from ansible_collections.cribl.{product}.plugins.module_utils.cribl_api import (
     CriblAPIError
 )
 from ansible_collections.cribl.{product}.plugins.module_utils.cribl_declarative import (
-    CriblResource,
-    create_declarative_module_args
+    {resource_class},
+    create_change_journal,
+    create_declarative_module_args,
+    create_state_store,
+    ensure_state_in_groups,
+    normalize_state,
+    resolve_worker_groups
 )
 
 
-def main():
+def module_args():
+    """Return the AnsibleModule keyword arguments (also used by the cribl_declarative action plugin)."""
     argument_spec = create_declarative_module_args()
     argument_spec.update(dict(
         {id_param}=dict(type='str', required=True),
 {extra_params_spec}
     ))
-
-    module = AnsibleModule(
+    return dict(
         argument_spec=argument_spec,
         required_one_of=[['session', 'token']],
-        mutually_exclusive=[['session', 'base_url']],
+        mutually_exclusive=[['session', 'base_url'], ['worker_group', 'worker_groups']],
         supports_check_mode=True,
     )
 
+
+def run_module(module, client=None):
+    """
+    Reconcile the resource and exit the module.
+
+    Args:
+        module: AnsibleModule, or the controller-side equivalent of the action plugin
+        client: Optional CriblAPIClient shared between tasks
+    """
+    common_args = create_declarative_module_args()
     session = module.params.get('session')
     base_url = module.params.get('base_url')
     token = module.params.get('token')
@@ -400,14 +404,16 @@ def main():
     timeout = module.params['timeout']
     
     resource_id = module.params['{id_param}']
+    resource_options = dict((key, module.params.get(key)) for key in {resource_class}.MODULE_OPTIONS)
     worker_group = module.params.get('worker_group')
+    worker_groups = module.params.get('worker_groups')
     state = module.params['state']
 
     try:
         # Initialize client with session or token
-        if session:
+        if client is None and session:
             client = CriblAPIClient(session=session)
-        else:
+        elif client is None:
             client = CriblAPIClient(
                 base_url=base_url,
                 token=token,
@@ -415,24 +421,50 @@ def main():
                 timeout=timeout
             )
 
-        resource = CriblResource(module, client, resource_id, '{endpoint_base}', worker_group=worker_group)
+        state_store = create_state_store(module)
+        change_journal = create_change_journal(module)
 
+        desired_state = None
         if state == 'present':
             desired_state = {{'{id_param}': resource_id}}
             # Add any additional parameters from module.params
             for key, value in module.params.items():
-                if key not in ['session', 'base_url', 'token', 'validate_certs', 'timeout', 'state', '{id_param}', 'worker_group']:
+                if key not in common_args and key not in resource_options and key != '{id_param}':
                     if value is not None:
                         # Special handling for 'conf' dict - merge for inputs/outputs only
                         if key == 'conf' and isinstance(value, dict) and '{resource_name}' in ['input', 'output']:
                             desired_state.update(value)
                         else:
-                            desired_state[key] = value
-            
-            result = resource.ensure_state(state, desired_state, update_method='{update_method}')
+                            # Drop the None AnsibleModule sets for unset suboptions
+                            desired_state[key] = normalize_state(value)
+
+        if worker_groups:
+            # Fan out the same desired state to several worker groups
+            result = ensure_state_in_groups(
+                module, client, resource_id, '{endpoint_base}',
+                resolve_worker_groups(client, worker_groups), state, desired_state,
+                update_method='{update_method}',
+                parallelism=module.params['parallelism'],
+                max_fail_percentage=module.params['max_fail_percentage'],
+                state_store=state_store,
+                change_journal=change_journal,
+                conflict_retries=module.params['conflict_retries'],
+                resource_options=resource_options
+            )
         else:
-            result = resource.ensure_state(state)
+            resource = {resource_class}(module, client, resource_id, '{endpoint_base}',
+                                     worker_group=worker_group, state_store=state_store,
+                                     change_journal=change_journal,
+                                     conflict_retries=module.params['conflict_retries'],
+                                     **resource_options)
+            result = resource.ensure_state(state, desired_state, update_method='{update_method}')
 
+        if state_store is not None:
+            state_store.save()
+        if change_journal is not None:
+            change_journal.save()
+        if result.get('failed'):
+            module.fail_json(**result)
         module.exit_json(**result)
 
     except CriblAPIError as e:
@@ -441,6 +473,10 @@ def main():
         module.fail_json(msg=f"Unexpected error: {{str(e)}}")
 
 
+def main():
+    run_module(AnsibleModule(**module_args()))
+
+
 if __name__ == '__main__':
     main()
 '''
@@ -1016,4 +1052,40 @@ class ExampleTemplate:
     # {", ".join(remaining_modules)}
 '''
         return ''
-        return ''
\ No newline at end of file
+        return ''
+
+
+class ResourceRegistryTemplate:
+    """Template for the generated resource type registry."""
+
+    @staticmethod
+    def create_registry_module(entries: str) -> str:
+        """Generate the cribl_resource_types module_utils file."""
+        return f'''# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+# This file was automatically generated from the Cribl OpenAPI specification
+
+"""
+Registry of declarative Cribl resource types detected by the generator.
+
+Maps each resource type name to its collection, API endpoint, ID parameter
+and update method so multi-resource modules can address any resource type.
+"""
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+RESOURCE_TYPES = {{
+{entries}
+}}
+'''
+
+    @staticmethod
+    def registry_entry(name: str, product: str, endpoint: str,
+                       id_param: str, update_method: str) -> str:
+        """Generate a single registry entry."""
+        return f'''    '{name}': {{
+        'product': '{product}',
+        'endpoint': '{endpoint}',
+        'id_param': '{id_param}',
+        'update_method': '{update_method}',
+    }},'''
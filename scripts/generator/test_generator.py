@@ -28,27 +28,38 @@ class DeclarativeTestGenerator:
             except Exception as e:
                 print(f"    [WARNING] Could not remove {Path(test_file).name}: {e}")
     
-    def generate_tests(self, generated_modules: List[Dict]):
+    def generate_tests(self, generated_modules: List[Dict], products: List[str] = None):
         """
         Generate tests for all generated declarative modules.
         
         Args:
             generated_modules: List of dicts with module info from DeclarativeGenerator
+            products: Only regenerate the test files of these products (removing
+                those left without modules) instead of all of them
         """
-        if not generated_modules:
+        if not generated_modules and products is None:
             return
         
         # Clear old test files first
-        self._clear_old_tests()
+        if products is None:
+            self._clear_old_tests()
         
         # Group by product
         by_product = {}
         for module_info in generated_modules:
             product = module_info['product']
+            if products is not None and product not in products:
+                continue
             if product not in by_product:
                 by_product[product] = []
             by_product[product].append(module_info)
         
+        for product in products or []:
+            test_file = self.base_test_dir / f"test_{product}_declarative.py"
+            if product not in by_product and test_file.exists():
+                test_file.unlink()
+                print(f"    [CLEANUP] Removed old test file: {test_file.name}")
+        
         # Generate test file for each product
         for product, modules in by_product.items():
             self._generate_product_tests(product, modules)
@@ -3,6 +3,7 @@
 import pytest
 import os
 from pathlib import Path
+from unittest.mock import Mock
 
 
 @pytest.fixture
@@ -71,3 +72,18 @@ def sample_module_data():
         }
     }
 
+
+@pytest.fixture
+def collections_client():
+    """Return a factory of mock API clients listing collections (endpoint -> items) and worker groups."""
+    def make(collections, groups=('default',)):
+        def get_or_none(endpoint):
+            if endpoint in collections:
+                return {'count': len(collections[endpoint]), 'items': collections[endpoint]}
+            return None
+
+        client = Mock()
+        client.get_or_none.side_effect = get_or_none
+        client.get.return_value = {'count': len(groups), 'items': [{'id': group} for group in groups]}
+        return client
+    return make
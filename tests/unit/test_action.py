@@ -0,0 +1,137 @@
+"""
+Unit tests for the controller-side declarative action plugin.
+"""
+
+import importlib.util
+import pytest
+from pathlib import Path
+from unittest.mock import Mock
+import sys
+import os
+
+# Add the collection to the Python path (use build directory where modules are generated)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../build'))
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / 'scripts'))
+
+from ansible_collections.cribl.core.plugins.action.cribl_declarative import (
+    ControllerModule,
+    ModuleExit,
+    list_no_log_values,
+    shared_client,
+    validate_module_args
+)
+from generator.collection_manager import CollectionManager
+from generator.templates import DeclarativeTemplate
+
+
+@pytest.fixture
+def user_module(tmp_path):
+    """Render the declarative user module and import it."""
+    path = tmp_path / 'user.py'
+    path.write_text(DeclarativeTemplate.create_resource_module(
+        'user', 'User', 'core', '/system/users', 'id',
+        extra_params_doc="    email:\n        description:\n            - Email.\n        type: str\n        required: false",
+        extra_params_spec="        email=dict(type='str', required=False)"))
+    spec = importlib.util.spec_from_file_location('cribl_test_user', str(path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class TestControllerModule:
+    """Test running declarative modules in-process."""
+
+    def test_validate_applies_defaults_and_rules(self, user_module):
+        """Test arguments are validated with the module's own argument spec."""
+        params, no_log_values, errors = validate_module_args(
+            {'token': 'secret', 'base_url': 'https://cribl', 'id': 'bob'}, user_module.module_args())
+
+        assert errors == []
+        assert params['state'] == 'present'
+        assert params['conflict_retries'] == 3
+        assert 'secret' in no_log_values
+
+        _, _, errors = validate_module_args({'base_url': 'https://cribl', 'id': 'bob'},
+                                            user_module.module_args())
+        assert errors
+
+    def test_no_log_values_from_fallbacks(self, monkeypatch):
+        """Test no_log values set through an environment fallback are collected."""
+        from ansible.module_utils.basic import env_fallback
+
+        monkeypatch.setenv('CRIBL_TEST_TOKEN', 'from-env')
+        params, no_log_values, errors = validate_module_args({}, {'argument_spec': dict(
+            token=dict(type='str', no_log=True, fallback=(env_fallback, ['CRIBL_TEST_TOKEN'])),
+        )})
+
+        assert errors == []
+        assert params['token'] == 'from-env'
+        assert no_log_values == {'from-env'}
+
+    def test_no_log_suboptions(self):
+        """Test no_log values of suboptions and containers are collected."""
+        spec = dict(
+            outputs=dict(type='list', elements='dict', options=dict(
+                name=dict(type='str'),
+                secret=dict(type='str', no_log=True),
+            )),
+            keys=dict(type='list', no_log=True),
+        )
+        params = {'outputs': [{'name': 'a', 'secret': 's1'}, {'name': 'b', 'secret': None}],
+                  'keys': ['k1', 2]}
+
+        assert list_no_log_values(spec, params) == {'s1', 'k1', '2'}
+
+    def test_unredactable_no_log_value_raises(self):
+        """Test values that cannot be redacted fail instead of being skipped."""
+        with pytest.raises(TypeError):
+            validate_module_args({'token': object()}, {'argument_spec': dict(
+                token=dict(type='raw', no_log=True),
+            )})
+
+    def test_run_module_in_process(self, user_module):
+        """Test the module reconciles through the given client and exits with its result."""
+        params, no_log_values, _ = validate_module_args(
+            {'token': 'secret', 'base_url': 'https://cribl', 'id': 'bob', 'email': 'bob@example.com'},
+            user_module.module_args())
+        client = Mock()
+        client.get_or_none.return_value = None
+        client.post.return_value = {'id': 'bob', 'email': 'bob@example.com', 'note': 'secret'}
+
+        with pytest.raises(ModuleExit) as exc:
+            user_module.run_module(ControllerModule(params, no_log_values=no_log_values), client=client)
+
+        assert exc.value.result['changed'] is True
+        assert exc.value.result['resource']['note'] == 'VALUE_SPECIFIED_IN_NO_LOG_PARAMETER'
+        client.post.assert_called_once_with('/system/users', data={'id': 'bob', 'email': 'bob@example.com'})
+
+    def test_fail_json(self):
+        """Test failures are returned as failed results."""
+        with pytest.raises(ModuleExit) as exc:
+            ControllerModule({}).fail_json(msg='boom')
+
+        assert exc.value.result == {'failed': True, 'msg': 'boom'}
+
+    def test_shared_client_reused(self, user_module):
+        """Test one client is created per set of connection settings."""
+        params = {'token': 't1', 'base_url': 'https://cribl', 'validate_certs': False, 'timeout': 30}
+
+        first = shared_client(user_module, params)
+
+        assert shared_client(user_module, dict(params)) is first
+        assert shared_client(user_module, dict(params, token='t2')) is not first
+
+
+class TestRuntimeYml:
+    """Test meta/runtime.yml routing."""
+
+    def test_declarative_modules_routed(self, tmp_path):
+        """Test declarative modules are redirected to the action plugin and grouped."""
+        import yaml
+
+        manager = CollectionManager(tmp_path)
+        manager.write_runtime_yml('stream', ['pipeline', 'output'])
+        runtime = yaml.safe_load((tmp_path / 'stream' / 'meta' / 'runtime.yml').read_text())
+
+        assert runtime['action_groups'] == {'cribl': ['output', 'pipeline']}
+        assert runtime['plugin_routing']['action']['pipeline'] == {'redirect': 'cribl.stream.cribl_declarative'}
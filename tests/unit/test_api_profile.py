@@ -0,0 +1,68 @@
+"""
+Unit tests for the api_profile callback plugin.
+"""
+
+import sys
+import os
+
+# Add the collection to the Python path (use build directory where modules are generated)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../build'))
+
+from ansible_collections.cribl.core.plugins.callback.api_profile import (
+    build_report,
+    normalize_endpoint,
+    percentile,
+    read_records
+)
+
+
+def _record(time, latency, endpoint='/system/outputs/s3', method='GET', **kwargs):
+    record = {'time': time, 'latency': latency, 'method': method, 'endpoint': endpoint,
+              'status': 200, 'bytes_out': 0, 'bytes_in': 10, 'auth_retry': False}
+    record.update(kwargs)
+    return record
+
+
+class TestAggregation:
+    """Test aggregating request records."""
+
+    def test_percentile(self):
+        """Test nearest-rank percentiles."""
+        values = list(range(1, 101))
+
+        assert percentile(values, 50) == 50
+        assert percentile(values, 95) == 95
+        assert percentile(values, 99) == 99
+        assert percentile([], 95) == 0.0
+
+    def test_normalize_endpoint(self):
+        """Test worker groups are collapsed."""
+        assert normalize_endpoint('/m/default/system/outputs/s3') == '/m/{group}/system/outputs/s3'
+        assert normalize_endpoint('/system/users') == '/system/users'
+
+    def test_report_by_endpoint_and_task(self):
+        """Test records are grouped per endpoint and attributed to the running task."""
+        records = [
+            _record(10.5, 0.010, '/m/default/system/outputs/s3'),
+            _record(10.6, 0.030, '/m/edge/system/outputs/s3'),
+            _record(20.1, 0.200, '/master/groups', auth_retry=True),
+            _record(20.2, 0.500, '/auth/password', method='LOGIN'),
+        ]
+
+        report = build_report(records, [(10.0, 'outputs'), (20.0, 'groups')])
+
+        assert report['total']['requests'] == 3
+        assert report['total']['logins'] == 1
+        assert report['total']['auth_retries'] == 1
+        assert [e['endpoint'] for e in report['endpoints']] == [
+            'GET /master/groups', 'GET /m/{group}/system/outputs/s3']
+        assert report['endpoints'][1]['requests'] == 2
+        assert [(t['task'], t['requests'], t['logins']) for t in report['tasks']] == [
+            ('outputs', 2, 0), ('groups', 1, 1)]
+
+    def test_read_records_skips_partial_lines(self, tmp_path):
+        """Test a truncated last line does not break reading."""
+        spool = tmp_path / 'spool.jsonl'
+        spool.write_text('{"time": 1, "latency": 0.1}\n{"time": 2, "lat')
+
+        assert read_records(str(spool)) == [{'time': 1, 'latency': 0.1}]
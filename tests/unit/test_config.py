@@ -0,0 +1,374 @@
+"""
+Unit tests for multi-resource desired-state helpers.
+"""
+
+import pytest
+from unittest.mock import Mock
+import sys
+import os
+
+# Add the collection to the Python path (use build directory where modules are generated)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../build'))
+
+from ansible_collections.cribl.core.plugins.module_utils.cribl_config import (
+    ConfigApplier,
+    ConfigPlanner,
+    CriblConfigError,
+    build_dependency_graph,
+    dependency_levels,
+    parse_document,
+    resolve_path,
+    state_hash
+)
+from ansible_collections.cribl.core.plugins.module_utils.cribl_api import (
+    CriblAPIError
+)
+from ansible_collections.cribl.core.plugins.module_utils.cribl_declarative import (
+    CriblResource
+)
+from ansible_collections.cribl.core.plugins.module_utils.cribl_state import (
+    CriblStateStore
+)
+
+
+def _keys(levels):
+    return [[f"{n.resource_type}/{n.resource_id}" for n in level] for level in levels]
+
+
+class TestDocumentParsing:
+    """Test parsing of desired-state documents."""
+
+    def test_parse_accepts_plural_types(self):
+        """Test plural type names resolve to registered resource types."""
+        nodes = parse_document({'outputs': [{'id': 's3'}], 'pipeline': [{'id': 'main'}]})
+
+        assert sorted(n.key for n in nodes) == [('output', 's3'), ('pipeline', 'main')]
+
+    def test_parse_pops_state(self):
+        """Test per-item state is removed from the desired configuration."""
+        nodes = parse_document({'output': [{'id': 's3', 'state': 'absent'}]})
+
+        assert nodes[0].state == 'absent'
+        assert 'state' not in nodes[0].desired_state
+
+    def test_parse_unknown_type(self):
+        """Test unknown resource types are rejected."""
+        with pytest.raises(CriblConfigError, match="Unknown resource type"):
+            parse_document({'widget': [{'id': 'x'}]})
+
+    def test_parse_duplicate(self):
+        """Test duplicate resources are rejected."""
+        with pytest.raises(CriblConfigError, match="Duplicate"):
+            parse_document({'output': [{'id': 's3'}, {'id': 's3'}]})
+
+    def test_resolve_path_through_lists(self):
+        """Test list paths descend into every element."""
+        route = {'routes': [{'output': 'a'}, {'output': 'b'}, {'pipeline': 'p'}]}
+
+        assert resolve_path(route, 'routes[].output') == ['a', 'b']
+
+
+class TestDependencyLevels:
+    """Test dependency graph construction."""
+
+    def test_routes_after_outputs_and_pipelines(self):
+        """Test routes are applied after the outputs and pipelines they reference."""
+        nodes = parse_document({
+            'route': [{'id': 'default', 'routes': [{'output': 's3', 'pipeline': 'main'}]}],
+            'output': [{'id': 's3'}],
+            'pipeline': [{'id': 'main'}],
+        })
+
+        assert _keys(dependency_levels(nodes)) == [
+            ['output/s3', 'pipeline/main'],
+            ['route/default'],
+        ]
+
+    def test_secrets_before_inputs(self):
+        """Test secrets and certificates precede inputs and outputs."""
+        nodes = parse_document({
+            'input': [{'id': 'syslog', 'connections': [{'output': 's3'}]}],
+            'output': [{'id': 's3'}],
+            'secret': [{'id': 'token'}],
+        })
+
+        assert _keys(dependency_levels(nodes)) == [
+            ['secret/token'],
+            ['output/s3'],
+            ['input/syslog'],
+        ]
+
+    def test_external_references_ignored(self):
+        """Test references to resources outside the document add no edges."""
+        nodes = parse_document({'route': [{'id': 'default', 'routes': [{'output': 'devnull'}]}]})
+
+        assert build_dependency_graph(nodes) == {('route', 'default'): set()}
+
+    def test_cycle_detected(self):
+        """Test dependency cycles raise an error."""
+        nodes = parse_document({
+            'output': [{'id': 'o', 'pipeline': 'p'}],
+            'route': [{'id': 'p', 'output': 'o'}],
+            'pipeline': [{'id': 'p'}],
+        })
+        graph = build_dependency_graph(nodes)
+        graph[('pipeline', 'p')].add(('output', 'o'))
+
+        with pytest.raises(CriblConfigError, match="Dependency cycle"):
+            dependency_levels(nodes, graph)
+
+
+class TestConfigApplier:
+    """Test level-by-level application."""
+
+    def _applier(self, client):
+        module = Mock()
+        module.check_mode = False
+        return ConfigApplier(module, client, worker_group='default', parallelism=4)
+
+    def test_apply_creates_in_order(self):
+        """Test resources are created with worker group prefixed endpoints."""
+        client = Mock()
+        client.get_or_none.return_value = None
+        client.post.return_value = {}
+
+        nodes = parse_document({
+            'route': [{'id': 'default', 'routes': [{'output': 's3'}]}],
+            'output': [{'id': 's3'}],
+        })
+        result = self._applier(client).apply(nodes)
+
+        assert result['changed'] is True
+        assert result['failed'] is False
+        endpoints = [c.args[0] for c in client.post.call_args_list]
+        assert endpoints == ['/m/default/system/outputs', '/m/default/routes']
+
+    def test_dependents_skipped_on_failure(self):
+        """Test resources depending on a failed resource are skipped."""
+        client = Mock()
+        client.get_or_none.return_value = None
+        client.post.side_effect = CriblAPIError("POST failed: 500")
+
+        nodes = parse_document({
+            'route': [{'id': 'default', 'routes': [{'output': 's3'}]}],
+            'output': [{'id': 's3'}],
+        })
+        result = self._applier(client).apply(nodes)
+
+        by_key = dict(((r['type'], r['id']), r) for r in result['results'])
+        assert result['failed'] is True
+        assert by_key[('output', 's3')]['failed'] is True
+        assert by_key[('route', 'default')]['skipped'] is True
+        assert client.post.call_count == 1
+
+    def test_absent_deleted_in_reverse_order(self):
+        """Test removals delete dependents before their dependencies."""
+        client = Mock()
+        client.get_or_none.return_value = {'id': 'existing'}
+        client.delete.return_value = {}
+
+        nodes = parse_document({
+            'output': [{'id': 's3', 'state': 'absent'}],
+            'route': [{'id': 'default', 'routes': [{'output': 's3'}], 'state': 'absent'}],
+        })
+        self._applier(client).apply(nodes)
+
+        endpoints = [c.args[0] for c in client.delete.call_args_list]
+        assert endpoints == ['/m/default/routes/default', '/m/default/system/outputs/s3']
+
+
+class TestConfigPlan:
+    """Test the plan/apply split."""
+
+    def _module(self):
+        module = Mock()
+        module.check_mode = False
+        return module
+
+    def test_plan_computes_operations(self):
+        """Test the plan records create/update/noop with observed hashes."""
+        existing = {
+            '/m/default/system/outputs/s3': {'id': 's3', 'bucket': 'old'},
+            '/m/default/pipelines/main': {'id': 'main', 'conf': {}},
+        }
+
+        client = Mock()
+        client.get.return_value = {'items': [{'id': 'default', 'configVersion': 'abc'}]}
+        client.get_or_none.side_effect = existing.get
+
+        nodes = parse_document({
+            'output': [{'id': 's3', 'bucket': 'new'}],
+            'pipeline': [{'id': 'main', 'conf': {}}],
+            'route': [{'id': 'default', 'routes': [{'output': 's3', 'pipeline': 'main'}]}],
+        })
+        plan = ConfigPlanner(client, worker_group='default').plan(nodes)
+
+        assert plan['scope_version'] == 'abc'
+        assert plan['summary'] == {'create': 1, 'update': 1, 'delete': 0, 'noop': 1}
+        assert plan['levels'] == [['output/s3'], ['route/default']]
+        ops = dict((op['id'], op) for op in plan['operations'])
+        assert ops['s3']['observed_hash'] == state_hash(existing['/m/default/system/outputs/s3'])
+        assert ops['default']['depends_on'] == ['output/s3']
+
+    def test_apply_plan_skips_reads_when_version_unchanged(self):
+        """Test a plan executes without per-resource reads if the group did not move."""
+        client = Mock()
+        client.get.return_value = {'items': [{'configVersion': 'abc'}]}
+        plan = {
+            'format': 1, 'worker_group': 'default', 'scope_version': 'abc',
+            'levels': [['output/s3']],
+            'operations': [{'type': 'output', 'id': 's3', 'action': 'create',
+                            'desired_state': {'id': 's3'}, 'observed_hash': None, 'depends_on': []}],
+        }
+
+        result = ConfigApplier(self._module(), client, worker_group='default').apply_plan(plan)
+
+        assert result['verified'] is False
+        assert result['changed'] is True
+        client.get.assert_called_once_with('/master/groups/default')
+        client.post.assert_called_once_with('/m/default/system/outputs', data={'id': 's3'})
+
+    def test_apply_plan_detects_concurrent_modification(self):
+        """Test a resource changed since planning is not overwritten."""
+        client = Mock()
+        client.get.return_value = {'items': [{'configVersion': 'moved'}]}
+        client.get_or_none.return_value = {'id': 's3', 'bucket': 'changed-by-someone-else'}
+        plan = {
+            'format': 1, 'worker_group': 'default', 'scope_version': 'abc',
+            'levels': [['output/s3']],
+            'operations': [{'type': 'output', 'id': 's3', 'action': 'update',
+                            'desired_state': {'id': 's3', 'bucket': 'new'},
+                            'observed_hash': state_hash({'id': 's3', 'bucket': 'old'}),
+                            'depends_on': []}],
+        }
+
+        result = ConfigApplier(self._module(), client, worker_group='default').apply_plan(plan)
+
+        assert result['verified'] is True
+        assert result['failed'] is True
+        assert 'modified after the plan' in result['results'][0]['msg']
+        assert not client.patch.called
+
+    def test_apply_plan_merges_pipeline_update(self):
+        """Test a planned pipeline update keeps server-set fields of its functions."""
+        client = Mock()
+        client.get.return_value = {'items': [{'configVersion': 'abc'}]}
+        client.get_or_none.return_value = {'id': 'main', 'conf': {'functions': [
+            {'id': 'eval', 'conf': {'add': []}, 'groupId': 'g1'}]}}
+        plan = {
+            'format': 1, 'worker_group': 'default', 'scope_version': 'abc',
+            'levels': [['pipeline/main']],
+            'operations': [{'type': 'pipeline', 'id': 'main', 'action': 'update',
+                            'desired_state': {'id': 'main', 'conf': {'functions': [
+                                {'id': 'eval', 'conf': {'add': [{'name': 'x'}]}}]}},
+                            'observed_hash': None, 'depends_on': []}],
+        }
+
+        result = ConfigApplier(self._module(), client, worker_group='default').apply_plan(plan)
+
+        assert result['changed'] is True
+        written = client.patch.call_args[1]['data']
+        assert written['conf']['functions'][0]['groupId'] == 'g1'
+        assert written['conf']['functions'][0]['conf'] == {'add': [{'name': 'x'}]}
+
+    def test_apply_plan_rejects_other_target(self):
+        """Test a plan made for another server or worker group is not executed."""
+        client = Mock()
+        client.base_url = 'https://cribl.example.com'
+        plan = {'format': 1, 'base_url': 'https://other.example.com', 'worker_group': 'default',
+                'scope_version': 'abc', 'levels': [], 'operations': []}
+
+        with pytest.raises(CriblConfigError, match='other.example.com'):
+            ConfigApplier(self._module(), client, worker_group='default').apply_plan(plan)
+
+        plan['base_url'] = 'https://cribl.example.com/'
+        with pytest.raises(CriblConfigError, match='worker group'):
+            ConfigApplier(self._module(), client, worker_group='edge').apply_plan(plan)
+        assert not client.get.called
+
+
+class TestStateStore:
+    """Test the content-fingerprint state store."""
+
+    def _client(self, version='v1'):
+        client = Mock()
+        client.base_url = 'https://cribl.example.com'
+        client.get.return_value = {'items': [{'id': 'default', 'configVersion': version}]}
+        return client
+
+    def _module(self):
+        module = Mock()
+        module.check_mode = False
+        return module
+
+    def test_unchanged_resource_not_read(self, tmp_path):
+        """Test a recorded resource is skipped while the group version is unchanged."""
+        path = str(tmp_path / 'state.json')
+        store = CriblStateStore(path)
+        store.record(self._client(), 'default', '/m/default/system/outputs', 's3', {'id': 's3', 'bucket': 'a'})
+        store.save()
+
+        client = self._client()
+        resource = CriblResource(self._module(), client, 's3', '/system/outputs',
+                                 worker_group='default', state_store=CriblStateStore(path))
+        result = resource.ensure_state('present', {'id': 's3', 'bucket': 'a'})
+
+        assert result['changed'] is False
+        assert 'unchanged since last apply' in result['msg']
+        client.get.assert_called_once_with('/master/groups/default')
+
+    def test_changed_desired_state_is_read(self, tmp_path):
+        """Test a different desired state falls back to reading the resource."""
+        store = CriblStateStore(str(tmp_path / 'state.json'))
+        client = self._client()
+        store.record(client, 'default', '/system/outputs', 's3', {'id': 's3', 'bucket': 'a'})
+
+        assert store.is_unchanged(client, 'default', '/system/outputs', 's3', {'id': 's3', 'bucket': 'b'}) is False
+
+    def test_moved_group_invalidates(self, tmp_path):
+        """Test entries recorded at another group version are not trusted."""
+        path = str(tmp_path / 'state.json')
+        store = CriblStateStore(path)
+        store.record(self._client('v1'), 'default', '/system/outputs', 's3', {'id': 's3'})
+        store.save()
+
+        reloaded = CriblStateStore(path)
+        assert reloaded.is_unchanged(self._client('v2'), 'default', '/system/outputs', 's3', {'id': 's3'}) is False
+
+    def test_version_checked_once_per_store(self, tmp_path):
+        """Test the group version is requested once for many resources."""
+        store = CriblStateStore(str(tmp_path / 'state.json'))
+        client = self._client()
+        for name in ['a', 'b', 'c']:
+            store.record(client, 'default', '/system/outputs', name, {'id': name})
+
+        assert client.get.call_count == 1
+
+    def test_check_ttl_reuses_saved_version(self, tmp_path):
+        """Test a recent version check is reused by later runs with check_ttl."""
+        path = str(tmp_path / 'state.json')
+        store = CriblStateStore(path, check_ttl=300)
+        store.record(self._client(), 'default', '/system/outputs', 's3', {'id': 's3'})
+        store.save()
+
+        client = self._client()
+        assert CriblStateStore(path, check_ttl=300).is_unchanged(
+            client, 'default', '/system/outputs', 's3', {'id': 's3'}) is True
+        assert not client.get.called
+
+    def test_delete_forgets_entry(self, tmp_path):
+        """Test deleting a resource removes its fingerprint."""
+        path = str(tmp_path / 'state.json')
+        store = CriblStateStore(path)
+        client = self._client()
+        store.record(client, 'default', '/m/default/system/outputs', 's3', {'id': 's3'})
+        store.save()
+
+        client.get_or_none.return_value = {'id': 's3'}
+        store = CriblStateStore(path)
+        CriblResource(self._module(), client, 's3', '/system/outputs',
+                      worker_group='default', state_store=store).ensure_state('absent')
+        store.save()
+
+        key = CriblStateStore.key(client.base_url, 'default', '/m/default/system/outputs', 's3')
+        assert CriblStateStore(path).lookup(key) is None
@@ -11,8 +11,13 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../build'))
 
 from ansible_collections.cribl.core.plugins.module_utils.cribl_declarative import (
+    CriblPipeline,
     CriblResource,
-    create_declarative_module_args
+    create_declarative_module_args,
+    diff_functions,
+    ensure_state_in_groups,
+    resolve_worker_groups,
+    resource_class_for
 )
 from ansible_collections.cribl.core.plugins.module_utils.cribl_api import (
     CriblAPIError
@@ -67,6 +72,30 @@ class TestCriblResource:
         
         assert resource.needs_update(current, desired) == True
 
+    def test_get_current_state_not_found_status(self):
+        """Test a missing resource is detected from the status code, not the message."""
+        client = Mock()
+        client.get_or_none.return_value = None
+        
+        resource = CriblResource(Mock(), client, 'test', '/system/test')
+        
+        assert resource.get_current_state() is None
+        client.get_or_none.assert_called_once_with('/system/test/test')
+
+    def test_get_current_state_already_exists_not_missing(self):
+        """Test errors mentioning an existing entity are not mistaken for not found."""
+        client = Mock()
+        client.get_or_none.side_effect = CriblAPIError(
+            "GET /system/test/test failed: 500", status_code=500,
+            body={'message': 'Entity with id test already exists'})
+        
+        resource = CriblResource(Mock(), client, 'test', '/system/test')
+        
+        with pytest.raises(CriblAPIError) as exc_info:
+            resource.get_current_state()
+        assert exc_info.value.status_code == 500
+        assert exc_info.value.endpoint == '/system/test/test'
+
     def test_ensure_present_creates_new_resource(self):
         """Test ensure_state creates resource when it doesn't exist."""
         module = Mock()
@@ -343,6 +372,240 @@ class TestDeclarativeModuleArgs:
         assert args['timeout']['default'] == 30
 
 
+class TestWorkerGroupFanOut:
+    """Test reconciling one resource in several worker groups."""
+
+    def _module(self):
+        module = Mock()
+        module.check_mode = False
+        return module
+
+    def test_resolve_all(self):
+        """Test 'all' expands to every worker group on the leader."""
+        client = Mock()
+        client.get.return_value = {'count': 2, 'items': [{'id': 'default'}, {'id': 'edge'}]}
+
+        assert resolve_worker_groups(client, ['edge', 'all']) == ['edge', 'default']
+        client.get.assert_called_once_with('/master/groups')
+
+    def test_reconciles_each_group(self):
+        """Test the desired state is applied under every group's endpoint."""
+        client = Mock()
+        client.get_or_none.return_value = None
+        client.post.return_value = {'id': 'main'}
+
+        result = ensure_state_in_groups(self._module(), client, 'main', '/pipelines',
+                                        ['a', 'b', 'c'], 'present', {'id': 'main'})
+
+        assert result['changed'] is True
+        assert result['failed'] is False
+        assert [r['worker_group'] for r in result['results']] == ['a', 'b', 'c']
+        endpoints = sorted(c.args[0] for c in client.post.call_args_list)
+        assert endpoints == ['/m/a/pipelines', '/m/b/pipelines', '/m/c/pipelines']
+
+    def test_max_fail_percentage(self):
+        """Test failures only fail the result beyond the allowed percentage."""
+        def post(endpoint, data=None):
+            if endpoint.startswith('/m/bad/'):
+                raise CriblAPIError("POST failed: 500")
+            return data
+
+        client = Mock()
+        client.get_or_none.return_value = None
+        client.post.side_effect = post
+        groups = ['g1', 'g2', 'g3', 'bad']
+
+        strict = ensure_state_in_groups(self._module(), client, 'main', '/pipelines',
+                                        groups, 'present', {'id': 'main'})
+        tolerant = ensure_state_in_groups(self._module(), client, 'main', '/pipelines',
+                                          groups, 'present', {'id': 'main'}, max_fail_percentage=25)
+
+        assert strict['failed'] is True
+        assert tolerant['failed'] is False
+        by_group = dict((r['worker_group'], r) for r in tolerant['results'])
+        assert by_group['bad']['failed'] is True
+        assert by_group['g1']['changed'] is True
+
+
+class TestOptimisticConcurrency:
+    """Test version checks on read-modify-write updates."""
+
+    def _resource(self, client, **kwargs):
+        module = Mock()
+        module.check_mode = False
+        return CriblResource(module, client, 's3', '/system/outputs', raise_errors=True, **kwargs)
+
+    def test_concurrent_change_is_rediffed_and_retried(self):
+        """Test an update computed from a stale read is re-diffed against the fresh state."""
+        client = Mock()
+        client.get_or_none.side_effect = [
+            {'id': 's3', 'bucket': 'a', 'region': 'x', 'updatedAt': 1},  # initial read
+            {'id': 's3', 'bucket': 'a', 'region': 'y', 'updatedAt': 2},  # changed before our write
+            {'id': 's3', 'bucket': 'a', 'region': 'y', 'updatedAt': 2},  # re-read after conflict
+            {'id': 's3', 'bucket': 'a', 'region': 'y', 'updatedAt': 2},  # version check on retry
+        ]
+        client.patch.return_value = {'id': 's3', 'bucket': 'b', 'region': 'y'}
+
+        result = self._resource(client).ensure_state('present', {'id': 's3', 'bucket': 'b'})
+
+        assert result['changed'] is True
+        client.patch.assert_called_once_with('/system/outputs/s3', data={'id': 's3', 'bucket': 'b'})
+
+    def test_revision_field_compared(self):
+        """Test the server's revision field decides, not unrelated differences in the response."""
+        client = Mock()
+        client.get_or_none.side_effect = [
+            {'id': 's3', 'bucket': 'a', 'version': 'v1', 'status': 'starting'},
+            {'id': 's3', 'bucket': 'a', 'version': 'v1', 'status': 'running'},
+        ]
+
+        result = self._resource(client).ensure_state('present', {'id': 's3', 'bucket': 'b'})
+
+        assert result['changed'] is True
+        assert client.get_or_none.call_count == 2
+        client.patch.assert_called_once()
+
+    def test_concurrent_change_reaching_desired_state(self):
+        """Test no write is made when a concurrent change already produced the desired state."""
+        client = Mock()
+        client.get_or_none.side_effect = [
+            {'id': 's3', 'bucket': 'a'},
+            {'id': 's3', 'bucket': 'b'},
+            {'id': 's3', 'bucket': 'b'},
+        ]
+
+        result = self._resource(client).ensure_state('present', {'id': 's3', 'bucket': 'b'})
+
+        assert result['changed'] is False
+        assert not client.patch.called
+
+    def test_version_check_disabled(self):
+        """Test conflict_retries=0 writes without the extra read."""
+        client = Mock()
+        client.get_or_none.return_value = {'id': 's3', 'bucket': 'a'}
+
+        self._resource(client, conflict_retries=0).ensure_state('present', {'id': 's3', 'bucket': 'b'})
+
+        client.get_or_none.assert_called_once_with('/system/outputs/s3')
+        client.patch.assert_called_once()
+
+    def test_server_conflict_status_retried(self):
+        """Test 412 responses from the server are retried like 409."""
+        client = Mock()
+        client.get_or_none.return_value = {'id': 's3', 'bucket': 'a'}
+        client.patch.side_effect = [
+            CriblAPIError("PATCH failed: 412", status_code=412),
+            {'id': 's3', 'bucket': 'b'},
+        ]
+
+        result = self._resource(client).ensure_state('present', {'id': 's3', 'bucket': 'b'})
+
+        assert result['changed'] is True
+        assert client.patch.call_count == 2
+
+    def test_conflict_retries_exhausted(self):
+        """Test the update fails once the retries are used up."""
+        versions = iter(range(100))
+        client = Mock()
+        client.get_or_none.side_effect = lambda endpoint: {'id': 's3', 'bucket': 'a', 'version': next(versions)}
+
+        with pytest.raises(CriblAPIError, match="modified since it was read"):
+            self._resource(client, conflict_retries=2).ensure_state('present', {'id': 's3', 'bucket': 'b'})
+        assert not client.patch.called
+
+
+PIPELINE = {
+    'id': 'main',
+    'conf': {
+        'output': 'default',
+        'functions': [
+            {'id': 'eval', 'filter': 'true', 'disabled': False, 'conf': {'add': [{'name': 'a', 'value': '1'}]}},
+            {'id': 'drop', 'filter': 'level==\'debug\'', 'conf': {}},
+            {'id': 'eval', 'filter': 'true', 'conf': {'add': [{'name': 'b', 'value': '2'}]}, 'groupId': 'g1'},
+        ]
+    }
+}
+
+
+class TestPipelineFunctions:
+    """Test function-level diffing of pipelines."""
+
+    def _pipeline(self, client, check_mode=False, **kwargs):
+        module = Mock()
+        module.check_mode = check_mode
+        return CriblPipeline(module, client, 'main', '/pipelines', raise_errors=True,
+                             conflict_retries=0, **kwargs)
+
+    def test_resource_class_for(self):
+        """Test pipelines get the function-level resource class."""
+        assert resource_class_for('/pipelines') is CriblPipeline
+        assert resource_class_for('/system/outputs') is CriblResource
+
+    def test_diff_functions_by_id_and_occurrence(self):
+        """Test functions sharing an ID are told apart by their occurrence."""
+        functions = PIPELINE['conf']['functions']
+        desired = [dict(functions[0]), dict(functions[2], filter='false')]
+
+        assert diff_functions(functions, desired) == {
+            'added': [], 'removed': ['drop#0'], 'modified': ['eval#1'], 'moved': []}
+
+    def test_diff_functions_by_user_key(self):
+        """Test a user-supplied key field matches moved functions."""
+        current = [{'id': 'eval', 'description': 'first'}, {'id': 'eval', 'description': 'second'}]
+        desired = [{'id': 'eval', 'description': 'second'}, {'id': 'eval', 'description': 'first'}]
+
+        assert diff_functions(current, desired)['modified'] == ['eval#0', 'eval#1']
+        assert diff_functions(current, desired, key_field='description') == {
+            'added': [], 'removed': [], 'modified': [], 'moved': ['second', 'first']}
+
+    def test_server_normalized_fields_skip_write(self):
+        """Test unset defaults and server-added fields do not cause an update."""
+        client = Mock()
+        client.get_or_none.return_value = PIPELINE
+        desired = {'id': 'main', 'conf': {'functions': [
+            {'id': 'eval', 'conf': {'add': [{'name': 'a', 'value': '1'}]}},
+            {'id': 'drop', 'filter': 'level==\'debug\'', 'disabled': False},
+            {'id': 'eval', 'conf': {'add': [{'name': 'b', 'value': '2'}]}, 'description': None},
+        ]}}
+
+        result = self._pipeline(client).ensure_state('present', desired)
+
+        assert result['changed'] is False
+        assert not client.patch.called
+
+    def test_update_reports_and_patches_changed_function(self):
+        """Test only the changed function is reported and server fields are kept in the write."""
+        client = Mock()
+        client.get_or_none.return_value = PIPELINE
+        functions = [dict(f) for f in PIPELINE['conf']['functions']]
+        functions[2] = {'id': 'eval', 'conf': {'add': [{'name': 'b', 'value': '3'}]}}
+        desired = {'id': 'main', 'conf': {'functions': functions}}
+
+        result = self._pipeline(client).ensure_state('present', desired)
+
+        assert result['changed'] is True
+        assert result['function_changes'] == {'added': [], 'removed': [], 'modified': ['eval#1'], 'moved': []}
+        assert list(result['diff']['after']['functions']) == ['eval#1']
+        written = client.patch.call_args.kwargs['data']
+        assert written['conf']['output'] == 'default'
+        assert written['conf']['functions'][2] == {
+            'id': 'eval', 'filter': 'true', 'groupId': 'g1', 'conf': {'add': [{'name': 'b', 'value': '3'}]}}
+
+    def test_check_mode_reports_moves(self):
+        """Test reordering functions is reported as moves in check mode."""
+        client = Mock()
+        client.get_or_none.return_value = PIPELINE
+        functions = PIPELINE['conf']['functions']
+        desired = {'id': 'main', 'conf': {'functions': [functions[1], functions[0], functions[2]]}}
+
+        result = self._pipeline(client, check_mode=True).ensure_state('present', desired)
+
+        assert result['changed'] is True
+        assert result['function_changes']['moved'] == ['drop#0', 'eval#0']
+        assert result['diff']['after']['function_order'] == ['drop#0', 'eval#0', 'eval#1']
+        assert not client.patch.called
+
+
 @pytest.mark.integration
 class TestDeclarativeIntegration:
     """Integration tests for declarative modules (requires running Cribl instance)."""
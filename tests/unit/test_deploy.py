@@ -0,0 +1,148 @@
+"""
+Unit tests for batched commit and deploy of worker groups.
+"""
+
+from unittest.mock import Mock
+import sys
+import os
+
+# Add the collection to the Python path (use build directory where modules are generated)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../build'))
+
+from ansible_collections.cribl.core.plugins.module_utils.cribl_deploy import (
+    GroupDeployer
+)
+from ansible_collections.cribl.core.plugins.module_utils.cribl_declarative import (
+    CriblResource
+)
+from ansible_collections.cribl.core.plugins.module_utils.cribl_state import (
+    ChangeJournal,
+    CriblStateStore
+)
+
+
+BASE_URL = 'https://cribl.example.com'
+
+
+def _client(deployed='abc1234', deploying=0):
+    client = Mock()
+    client.base_url = BASE_URL
+    client.post.return_value = {'count': 1, 'items': [{'commit': 'abc1234def'}]}
+    client.get.return_value = {'items': [{'configVersion': deployed, 'deployingWorkerCount': deploying}]}
+    return client
+
+
+class TestChangeJournal:
+    """Test the change journal hook in CriblResource."""
+
+    def test_changes_recorded_per_group(self, tmp_path):
+        """Test resource changes under a worker group mark the group dirty."""
+        path = str(tmp_path / 'journal.json')
+        module = Mock()
+        module.check_mode = False
+        client = _client()
+        client.get_or_none.return_value = None
+
+        journal = ChangeJournal(path)
+        for group in ['default', 'edge', 'default']:
+            CriblResource(module, client, 's3', '/system/outputs', worker_group=group,
+                          change_journal=journal).ensure_state('present', {'id': 's3'})
+        journal.save()
+
+        assert ChangeJournal(path).dirty_groups(BASE_URL) == {
+            'default': ['/m/default/system/outputs/s3'],
+            'edge': ['/m/edge/system/outputs/s3'],
+        }
+
+    def test_unchanged_and_global_resources_not_recorded(self, tmp_path):
+        """Test no-op reconciles and resources outside worker groups are not journaled."""
+        path = str(tmp_path / 'journal.json')
+        module = Mock()
+        module.check_mode = False
+        client = _client()
+        client.get_or_none.return_value = {'id': 's3'}
+
+        journal = ChangeJournal(path)
+        CriblResource(module, client, 's3', '/system/outputs', worker_group='default',
+                      change_journal=journal).ensure_state('present', {'id': 's3'})
+        CriblResource(module, client, 'admin', '/system/users',
+                      change_journal=journal).delete_resource(None)
+        journal.save()
+
+        assert journal.dirty_groups(BASE_URL) == {}
+
+    def test_clear(self, tmp_path):
+        """Test committed groups are removed from the journal."""
+        path = str(tmp_path / 'journal.json')
+        journal = ChangeJournal(path)
+        journal.record(BASE_URL, 'default', '/m/default/routes/default')
+        journal.record(BASE_URL, 'edge', '/m/edge/routes/default')
+        journal.save()
+
+        journal.clear(BASE_URL, ['default'])
+
+        assert list(ChangeJournal(path).dirty_groups(BASE_URL)) == ['edge']
+
+
+class TestGroupDeployer:
+    """Test one commit and one deploy per worker group."""
+
+    def test_commit_and_deploy_each_group_once(self):
+        """Test each group is committed and deployed with the commit ID."""
+        client = _client()
+        result = GroupDeployer(client, 'msg', poll_interval=0).run(['edge', 'default', 'edge'])
+
+        assert result['changed'] is True
+        assert result['failed'] is False
+        assert [r['worker_group'] for r in result['results']] == ['default', 'edge']
+        commits = sorted(c.kwargs['data']['group'] for c in client.post.call_args_list)
+        assert commits == ['default', 'edge']
+        client.patch.assert_any_call('/master/groups/edge/deploy', data={'version': 'abc1234def'})
+        assert client.patch.call_count == 2
+
+    def test_nothing_to_commit(self):
+        """Test groups without pending changes are not deployed."""
+        client = _client()
+        client.post.return_value = {'count': 0, 'items': []}
+
+        result = GroupDeployer(client, 'msg').run(['default'])
+
+        assert result['changed'] is False
+        assert not client.patch.called
+
+    def test_wait_times_out(self):
+        """Test a deploy that never completes fails the group."""
+        client = _client(deploying=3)
+
+        result = GroupDeployer(client, 'msg', deploy_timeout=0, poll_interval=0.01).run(['default'])
+
+        assert result['failed'] is True
+        assert 'Timed out' in result['results'][0]['msg']
+
+    def test_deploy_rebases_state_store(self, tmp_path):
+        """Test state entries follow the group to the deployed config version once the deploy lands."""
+        store = CriblStateStore(str(tmp_path / 'state.json'))
+        client = _client(deployed='old')
+        store.record(client, 'default', '/m/default/system/outputs', 's3', {'id': 's3'})
+
+        # configVersion stays at the old version until the deploy completes
+        versions = iter(['old', 'old', 'abc1234def'])
+        client.get.side_effect = lambda endpoint: {'items': [{'configVersion': next(versions)}]}
+        GroupDeployer(client, 'msg', state_store=store, poll_interval=0).run(['default'])
+        store.save()
+
+        reloaded = CriblStateStore(str(tmp_path / 'state.json'))
+        client.get.side_effect = None
+        client.get.return_value = {'items': [{'configVersion': 'abc1234def'}]}
+        assert reloaded.is_unchanged(client, 'default', '/m/default/system/outputs', 's3', {'id': 's3'}) is True
+
+    def test_no_rebase_without_wait(self, tmp_path):
+        """Test entries are left alone when the deploy is not waited for."""
+        store = CriblStateStore(str(tmp_path / 'state.json'))
+        client = _client(deployed='old')
+        store.record(client, 'default', '/m/default/system/outputs', 's3', {'id': 's3'})
+        store.rebase = Mock()
+
+        GroupDeployer(client, 'msg', state_store=store, wait=False).run(['default'])
+
+        assert not store.rebase.called
@@ -0,0 +1,165 @@
+"""
+Unit tests for drift detection.
+"""
+
+import pytest
+from unittest.mock import Mock
+import sys
+import os
+
+# Add the collection to the Python path (use build directory where modules are generated)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../build'))
+
+from ansible_collections.cribl.core.plugins.module_utils import cribl_drift
+from ansible_collections.cribl.core.plugins.module_utils.cribl_drift import (
+    DriftScanner
+)
+from ansible_collections.cribl.core.plugins.module_utils.cribl_config import (
+    CriblConfigError,
+    read_desired_tree
+)
+from ansible_collections.cribl.core.plugins.module_utils.cribl_declarative import (
+    diff_states
+)
+from ansible_collections.cribl.core.plugins.module_utils.cribl_api import (
+    CriblAPIError
+)
+
+
+class TestDesiredTree:
+    """Test reading desired-state directories."""
+
+    def test_read_tree(self, tmp_path, monkeypatch):
+        """Test worker group, _global and type directories map to documents."""
+        monkeypatch.setitem(cribl_drift.RESOURCE_TYPES, 'widget', {'endpoint': '/system/widgets', 'id_param': 'name'})
+        monkeypatch.setitem(cribl_drift.RESOURCE_TYPES, 'gadget', {'endpoint': '/gadgets', 'id_param': 'id'})
+        (tmp_path / 'default' / 'widgets').mkdir(parents=True)
+        (tmp_path / 'default' / 'widgets' / 'w1.yml').write_text('type: s3\nsize: 2\n')
+        (tmp_path / '_global' / 'gadget').mkdir(parents=True)
+        (tmp_path / '_global' / 'gadget' / 'g1.json').write_text('{"id": "g1", "roles": ["admin"]}')
+
+        tree = read_desired_tree(str(tmp_path))
+
+        assert tree == {
+            None: {'gadget': [{'id': 'g1', 'roles': ['admin']}]},
+            'default': {'widget': [{'name': 'w1', 'type': 's3', 'size': 2}]},
+        }
+
+    def test_unknown_type_directory(self, tmp_path):
+        """Test directories that are not resource types are rejected."""
+        (tmp_path / 'default' / 'widgets').mkdir(parents=True)
+
+        with pytest.raises(CriblConfigError, match="Unknown resource type"):
+            read_desired_tree(str(tmp_path))
+
+
+class TestDiffStates:
+    """Test the normalizing comparator."""
+
+    def test_ignores_unset_and_metadata_fields(self):
+        """Test only fields set in the desired state are compared."""
+        current = {'id': 's3', 'bucket': 'logs', 'region': 'us-east-1', 'updatedAt': 1, 'extra': None}
+
+        assert diff_states(current, {'id': 's3', 'bucket': 'logs', 'extra': None}) == {}
+        assert diff_states(current, {'bucket': 'new'}) == {'bucket': {'before': 'logs', 'after': 'new'}}
+
+    def test_nested_none_values_dropped(self):
+        """Test unset nested values do not count as differences."""
+        current = {'conf': {'functions': [{'id': 'eval', 'filter': 'true'}]}}
+        desired = {'conf': {'functions': [{'id': 'eval', 'filter': 'true', 'description': None}]}}
+
+        assert diff_states(current, desired) == {}
+
+
+class TestDriftScanner:
+    """Test drift scanning."""
+
+    def test_lists_each_collection_once_per_group(self, collections_client):
+        """Test resources are compared from one list request per collection and group."""
+        client = collections_client({
+            '/m/default/system/outputs': [{'id': 's3', 'bucket': 'old'}, {'id': 'devnull'}],
+            '/m/edge/system/outputs': [{'id': 's3', 'bucket': 'new'}],
+        })
+        desired = {'output': [{'id': 's3', 'bucket': 'new'}, {'id': 'splunk'}]}
+
+        report = DriftScanner(client).scan({'default': desired, 'edge': desired}, worker_groups=['default', 'edge'])
+
+        assert client.get_or_none.call_count == 2
+        assert report['summary'] == {'in_sync': 1, 'drifted': 1, 'missing': 2, 'unmanaged': 0, 'errors': 0}
+        drifted = [e for e in report['drift'] if e['status'] == 'drifted']
+        assert drifted == [{'worker_group': 'default', 'type': 'output', 'id': 's3', 'status': 'drifted',
+                            'diff': {'bucket': {'before': 'old', 'after': 'new'}}}]
+
+    def test_report_unmanaged(self, collections_client):
+        """Test live resources missing from the tree are reported when requested."""
+        client = collections_client({'/m/default/system/outputs': [{'id': 's3'}, {'id': 'devnull'}]})
+
+        report = DriftScanner(client).scan({'default': {'output': [{'id': 's3'}]}},
+                                           resource_types=['output'], report_unmanaged=True)
+
+        assert [(e['id'], e['status']) for e in report['drift']] == [('devnull', 'unmanaged')]
+
+    def test_scans_every_group_by_default(self, collections_client):
+        """Test groups on the leader without files in the tree are scanned for unmanaged resources."""
+        client = collections_client({
+            '/m/default/system/outputs': [{'id': 's3'}],
+            '/m/edge/system/outputs': [{'id': 'devnull'}],
+        }, groups=['default', 'edge'])
+
+        report = DriftScanner(client).scan({'default': {'output': [{'id': 's3'}]}},
+                                           resource_types=['output'], report_unmanaged=True)
+
+        client.get.assert_called_once_with('/master/groups')
+        assert [(e['worker_group'], e['id'], e['status']) for e in report['drift']] == [
+            ('edge', 'devnull', 'unmanaged')]
+
+    def test_single_instance_has_no_groups(self, collections_client):
+        """Test a leader without worker groups scans the tree's scopes."""
+        client = collections_client({'/system/outputs': [{'id': 's3'}]})
+        client.get.side_effect = CriblAPIError("GET failed: 404", status_code=404)
+
+        report = DriftScanner(client).scan({None: {'output': [{'id': 's3'}]}})
+
+        assert report['summary']['in_sync'] == 1
+
+    def test_matched_by_id_param(self, collections_client, monkeypatch):
+        """Test live resources are matched on the type's ID field rather than id."""
+        monkeypatch.setitem(cribl_drift.RESOURCE_TYPES, 'widget', {'endpoint': '/system/widgets', 'id_param': 'name'})
+        client = collections_client({'/m/default/system/widgets': [{'id': 'internal-1', 'name': 'w1', 'size': 2}]})
+
+        report = DriftScanner(client).scan({'default': {'widget': [{'name': 'w1', 'size': 2}]}})
+
+        assert report['summary']['in_sync'] == 1
+        assert report['drift'] == []
+
+    def test_pipeline_compared_like_apply(self, collections_client):
+        """Test server-set function fields are not drift, matching the pipeline resource class."""
+        client = collections_client({'/m/default/pipelines': [{'id': 'main', 'conf': {'functions': [
+            {'id': 'eval', 'conf': {'add': []}, 'groupId': 'g1', 'disabled': False}]}}]})
+        desired = {'id': 'main', 'conf': {'functions': [{'id': 'eval', 'conf': {'add': []}}]}}
+
+        report = DriftScanner(client).scan({'default': {'pipeline': [desired]}}, resource_types=['pipeline'])
+
+        assert report['summary']['in_sync'] == 1
+        assert report['drift'] == []
+
+    def test_never_writes(self, collections_client):
+        """Test the scan only issues GET requests."""
+        client = collections_client({'/m/default/system/outputs': []})
+
+        DriftScanner(client).scan({'default': {'output': [{'id': 's3'}]}})
+
+        assert not client.post.called
+        assert not client.patch.called
+        assert not client.put.called
+        assert not client.delete.called
+
+    def test_list_errors_reported(self):
+        """Test collections that fail to list are reported without aborting the scan."""
+        client = Mock()
+        client.get_or_none.side_effect = CriblAPIError("GET failed: 500", status_code=500)
+
+        report = DriftScanner(client).scan({'default': {'output': [{'id': 's3'}]}}, worker_groups=['default'])
+
+        assert report['summary']['errors'] == 1
+        assert report['errors'][0]['type'] == 'output'
@@ -0,0 +1,88 @@
+"""
+Unit tests for configuration export.
+"""
+
+from unittest.mock import Mock
+import sys
+import os
+
+# Add the collection to the Python path (use build directory where modules are generated)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../build'))
+
+from ansible_collections.cribl.core.plugins.module_utils.cribl_export import (
+    ConfigExporter,
+    render_resource
+)
+from ansible_collections.cribl.core.plugins.module_utils.cribl_config import (
+    read_desired_tree
+)
+from ansible_collections.cribl.core.plugins.module_utils.cribl_api import (
+    CriblAPIError
+)
+
+
+OUTPUTS = [
+    {'id': 's3', 'type': 's3', 'bucket': 'logs', 'updatedAt': 1, 'region': None},
+    {'id': 'devnull', 'type': 'devnull'},
+]
+
+
+class TestRenderResource:
+    """Test normalized rendering."""
+
+    def test_stable_and_normalized(self):
+        """Test keys are sorted and server timestamps and unset values dropped."""
+        assert render_resource(OUTPUTS[0]) == 'bucket: logs\nid: s3\ntype: s3\n'
+        assert render_resource({'b': 1, 'a': 2}, 'json') == '{\n  "a": 2,\n  "b": 1\n}\n'
+
+
+class TestConfigExporter:
+    """Test exporting collections to a tree."""
+
+    def test_export_round_trips(self, collections_client, tmp_path):
+        """Test exported files are read back by read_desired_tree."""
+        client = collections_client({'/m/default/system/outputs': OUTPUTS})
+
+        report = ConfigExporter(client, str(tmp_path)).export(['default'], resource_types=['output'])
+
+        assert report['summary']['added'] == 2
+        assert read_desired_tree(str(tmp_path)) == {'default': {'output': [
+            {'id': 'devnull', 'type': 'devnull'},
+            {'id': 's3', 'type': 's3', 'bucket': 'logs'},
+        ]}}
+
+    def test_unchanged_files_skipped(self, collections_client, tmp_path):
+        """Test files with unchanged content are not rewritten."""
+        client = collections_client({'/system/outputs': OUTPUTS})
+        ConfigExporter(client, str(tmp_path)).export([None], resource_types=['output'])
+        path = tmp_path / '_global' / 'output' / 's3.yml'
+        mtime = path.stat().st_mtime_ns
+
+        report = ConfigExporter(client, str(tmp_path)).export([None], resource_types=['output'])
+
+        assert report['summary']['unchanged'] == 2
+        assert report['files'] == []
+        assert path.stat().st_mtime_ns == mtime
+
+    def test_prune_and_check_mode(self, collections_client, tmp_path):
+        """Test stale files are pruned, and check mode changes nothing."""
+        ConfigExporter(collections_client({'/system/outputs': OUTPUTS}), str(tmp_path)).export(
+            [None], resource_types=['output'])
+        client = collections_client({'/system/outputs': OUTPUTS[:1]})
+
+        report = ConfigExporter(client, str(tmp_path), prune=True, check_mode=True).export(
+            [None], resource_types=['output'])
+        assert report['summary']['removed'] == 1
+        assert (tmp_path / '_global' / 'output' / 'devnull.yml').exists()
+
+        ConfigExporter(client, str(tmp_path), prune=True).export([None], resource_types=['output'])
+        assert not (tmp_path / '_global' / 'output' / 'devnull.yml').exists()
+
+    def test_list_errors_reported(self, tmp_path):
+        """Test collections that fail to list are reported without aborting the export."""
+        client = Mock()
+        client.get_or_none.side_effect = CriblAPIError("GET failed: 500", status_code=500)
+
+        report = ConfigExporter(client, str(tmp_path)).export(['default'], resource_types=['output', 'pipeline'])
+
+        assert report['summary']['errors'] == 2
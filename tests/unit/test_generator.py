@@ -4,6 +4,7 @@ import pytest
 from pathlib import Path
 import sys
 import yaml
+from unittest.mock import Mock
 
 # Add parent directory to path to import the generator
 sys.path.insert(0, str(Path(__file__).parent.parent.parent / 'scripts'))
@@ -145,3 +146,495 @@ def test_galaxy_yml_format(collections_dir):
         assert len(galaxy_data["authors"]) > 0
         assert len(galaxy_data["description"]) > 0
 
+
+
+@pytest.mark.unit
+@pytest.mark.generator
+def test_resource_registry_generation(tmp_path):
+    """Test the resource type registry is written to every collection."""
+    from generator import DeclarativeGenerator
+
+    generator = DeclarativeGenerator(tmp_path)
+    generator.detected_resources = {
+        'stream': [{'resource_name': 'pipeline', 'base_path': '/pipelines',
+                    'id_param': 'id', 'update_method': 'PATCH'}],
+        'search': [{'resource_name': 'dataset', 'base_path': '/search/datasets',
+                    'id_param': 'id', 'update_method': 'PATCH'}],
+        'lake': [{'resource_name': 'dataset', 'base_path': '/products/lake/lakes/{lakeId}/datasets',
+                  'id_param': 'id', 'update_method': 'PATCH'}],
+    }
+    generator.generate_resource_registry(['core', 'stream'])
+
+    for product in ['core', 'stream']:
+        namespace = {}
+        registry_file = tmp_path / product / 'plugins' / 'module_utils' / 'cribl_resource_types.py'
+        exec(registry_file.read_text(), namespace)
+        registry = namespace['RESOURCE_TYPES']
+
+        assert registry['pipeline']['endpoint'] == '/pipelines'
+        assert registry['dataset']['product'] == 'search'
+        assert registry['lake_dataset']['product'] == 'lake'
+
+
+@pytest.mark.unit
+@pytest.mark.generator
+def test_spec_cache(tmp_path, monkeypatch):
+    """Test the parsed spec is cached by content hash and read back without parsing."""
+    from generator import spec_cache
+    from generate_modules import extract_version_from_schema
+
+    spec_file = tmp_path / 'spec.yml'
+    spec_file.write_text("info:\n  version: 4.14.0-837595d5\npaths:\n  /x:\n    =: literal\n")
+    monkeypatch.setenv('CRIBL_SPEC_CACHE_DIR', str(tmp_path / 'cache'))
+    monkeypatch.setattr(spec_cache, '_LOADED', {})
+
+    spec = spec_cache.load_spec(str(spec_file))
+    assert spec['paths']['/x'] == {'=': 'literal'}
+    digest = spec_cache.file_sha256(str(spec_file))
+    assert (tmp_path / 'cache' / f'{digest}.pickle').exists()
+
+    # A warm cache is read without invoking the YAML parser
+    monkeypatch.setattr(spec_cache, '_LOADED', {})
+    monkeypatch.setattr(spec_cache.yaml, 'load', Mock(side_effect=AssertionError('parsed')))
+    assert spec_cache.load_spec(str(spec_file)) == spec
+    assert extract_version_from_schema(str(spec_file)) == '4.14.0'
+
+
+@pytest.mark.unit
+@pytest.mark.generator
+def test_parallel_generation_is_deterministic(tmp_path, monkeypatch):
+    """Test imperative modules are identical whatever the number of workers."""
+    spec_file = tmp_path / 'spec.yml'
+    spec_file.write_text(yaml.safe_dump({
+        'info': {'version': '4.14.0'},
+        'paths': {
+            '/system/users': {'get': {'summary': 'List users'}, 'post': {'summary': 'Create user'}},
+            '/system/users/{id}': {'delete': {'summary': 'Delete user'}},
+            '/pipelines': {'get': {'summary': 'List pipelines'}},
+            '/old': {'get': {'summary': 'Old', 'deprecated': True}},
+        },
+    }))
+    monkeypatch.setenv('CRIBL_SPEC_CACHE_DIR', str(tmp_path / 'cache'))
+
+    outputs = []
+    for jobs in (1, 2):
+        out = tmp_path / f'out{jobs}'
+        generator = CriblModuleGenerator(str(spec_file), str(out))
+        assert generator.generate_imperative_modules(jobs=jobs) == 4
+        outputs.append(dict(
+            (str(path.relative_to(out)), path.read_text())
+            for path in sorted(out.glob('*/plugins/modules/*.py'))))
+
+    assert outputs[0] == outputs[1]
+    assert 'core/plugins/modules/system_users_id_delete.py' in outputs[0]
+    assert 'stream/plugins/modules/pipelines_get.py' in outputs[0]
+
+
+@pytest.mark.unit
+@pytest.mark.generator
+def test_incremental_generation(tmp_path, monkeypatch):
+    """Test unchanged files are not rewritten and stale files are pruned via the manifest."""
+    paths = {
+        '/system/users': {'get': {'summary': 'List users'}},
+        '/system/roles': {'get': {'summary': 'List roles'}},
+    }
+    spec_file = tmp_path / 'spec.yml'
+    monkeypatch.setenv('CRIBL_SPEC_CACHE_DIR', str(tmp_path / 'cache'))
+    out = tmp_path / 'out'
+    modules_dir = out / 'core' / 'plugins' / 'modules'
+
+    def run():
+        spec_file.write_text(yaml.safe_dump({'info': {'version': '4.14.0'}, 'paths': paths}))
+        generator = CriblModuleGenerator(str(spec_file), str(out))
+        generator.generate_imperative_modules(jobs=1)
+        generator.finish('core')
+        return generator.files
+
+    first = run()
+    assert 'core/plugins/modules/system_users_get.py' in first.changes('added')
+    (modules_dir / 'custom.py').write_text('# hand-written\n')
+    mtime = (modules_dir / 'system_users_get.py').stat().st_mtime_ns
+
+    second = run()
+    assert second.summary()['added'] == second.summary()['changed'] == second.summary()['removed'] == 0
+    assert (modules_dir / 'system_users_get.py').stat().st_mtime_ns == mtime
+
+    del paths['/system/roles']
+    third = run()
+    assert third.changes('removed') == ['core/plugins/modules/system_roles_get.py']
+    assert not (modules_dir / 'system_roles_get.py').exists()
+    assert (modules_dir / 'custom.py').exists()
+
+
+@pytest.mark.unit
+@pytest.mark.generator
+def test_module_spec_generation():
+    """Test imperative modules are generated as a MODULE_SPEC run by cribl_runtime."""
+    from generator.module_generator import ModuleGenerator
+
+    params = {
+        # Body property sharing the path parameter's name
+        'id': {'description': '', 'type': 'str', 'required': False, 'location': 'body'},
+        'conf': {'description': '', 'type': 'dict', 'required': False, 'location': 'body'},
+    }
+    code = ModuleGenerator(None, 'stream').generate(
+        'system_inputs_id', '/system/inputs/{id}', 'patch', {}, params, 'Update input', 'Update an input')
+
+    compile(code, 'module', 'exec')
+    namespace = {}
+    exec(code[code.index('MODULE_SPEC = '):code.index('def main():')], namespace)
+    assert namespace['MODULE_SPEC'] == {
+        'endpoint': '/system/inputs/{id}',
+        'method': 'PATCH',
+        'params': {
+            'id': dict(type='str', required=True, location='path'),
+            'conf': dict(type='dict', required=False, location='body'),
+        },
+    }
+    assert "    id:\n        description:\n            - The id parameter\n        type: str\n        required: true" in code
+    assert "    conf:\n        description:\n            - The conf parameter\n        type: dict\n        required: false" in code
+    assert 'cribl.stream.plugins.module_utils.cribl_runtime import' in code
+
+
+@pytest.mark.unit
+@pytest.mark.generator
+class TestSchemaResolver:
+    """Test the memoizing $ref resolver."""
+
+    SPEC = {'components': {'schemas': {
+        'Base': {'type': 'object', 'required': ['id'], 'properties': {'id': {'type': 'string'}}},
+        'Output': {'allOf': [
+            {'$ref': '#/components/schemas/Base'},
+            {'type': 'object', 'required': ['type'], 'properties': {
+                'type': {'type': 'string'},
+                'tls': {'$ref': '#/components/schemas/Tls'},
+            }},
+        ]},
+        'Tls': {'type': 'object', 'properties': {'disabled': {'type': 'boolean'}}},
+        'Node': {'type': 'object', 'properties': {'children': {
+            'type': 'array', 'items': {'$ref': '#/components/schemas/Node'}}}},
+        'S3': {'type': 'object', 'properties': {'type': {'type': 'string', 'enum': ['s3']}}},
+        'Kafka': {'type': 'object', 'properties': {'type': {'type': 'string', 'enum': ['kafka']}}},
+        'AnyOutput': {
+            'oneOf': [{'$ref': '#/components/schemas/S3'}, {'$ref': '#/components/schemas/Kafka'}],
+            'discriminator': {'propertyName': 'type',
+                              'mapping': {'s3': '#/components/schemas/S3'}},
+        },
+    }}}
+
+    def test_all_of_flattened(self):
+        """Test allOf parts are merged with nested refs resolved."""
+        from generator.schema_resolver import SchemaResolver
+
+        resolver = SchemaResolver(self.SPEC)
+        output = resolver.resolve_ref('#/components/schemas/Output')
+
+        assert output['required'] == ['id', 'type']
+        assert sorted(output['properties']) == ['id', 'tls', 'type']
+        assert output['properties']['tls']['properties']['disabled'] == {'type': 'boolean'}
+        assert resolver.resolve_ref('#/components/schemas/Output') is output
+
+    def test_cycles(self):
+        """Test a recursive schema is cut with a cycle marker."""
+        from generator.schema_resolver import SchemaResolver, CYCLE_MARKER
+
+        node = SchemaResolver(self.SPEC).resolve_ref('#/components/schemas/Node')
+
+        assert node['properties']['children']['items'] == {
+            '$ref': '#/components/schemas/Node', CYCLE_MARKER: True}
+
+    def test_cycles_independent_of_order(self):
+        """Test mutually recursive schemas resolve the same whichever is resolved first."""
+        from generator.schema_resolver import SchemaResolver, CYCLE_MARKER
+
+        a_ref, b_ref = '#/components/schemas/A', '#/components/schemas/B'
+        spec = {'components': {'schemas': {
+            'A': {'type': 'object', 'properties': {'b': {'$ref': b_ref}}},
+            'B': {'type': 'object', 'properties': {'a': {'$ref': a_ref}}},
+        }}}
+
+        fresh = SchemaResolver(spec).resolve_ref(b_ref)
+        resolver = SchemaResolver(spec)
+        resolver.resolve_ref(a_ref)
+        after_a = resolver.resolve_ref(b_ref)
+
+        assert after_a == fresh
+        assert fresh['properties']['a']['properties']['b'] == {'$ref': b_ref, CYCLE_MARKER: True}
+
+    def test_depth_limit_independent_of_order(self, monkeypatch):
+        """Test refs cut at the depth limit resolve the same whichever is resolved first."""
+        from generator import schema_resolver
+
+        monkeypatch.setattr(schema_resolver, 'MAX_REF_DEPTH', 3)
+        spec = {'components': {'schemas': dict(
+            (f'S{i}', {'type': 'object', 'properties': {'next': {'$ref': f'#/components/schemas/S{i + 1}'}}})
+            for i in range(6))}}
+        first = '#/components/schemas/S0'
+
+        fresh = schema_resolver.SchemaResolver(spec).resolve_ref(first)
+        resolver = schema_resolver.SchemaResolver(spec)
+        resolver.resolve_ref('#/components/schemas/S2')
+        after_deeper = resolver.resolve_ref(first)
+
+        assert after_deeper == fresh
+        assert fresh['properties']['next']['properties']['next']['properties']['next'] == {
+            '$ref': '#/components/schemas/S3'}
+
+    def test_variants(self):
+        """Test oneOf variants expose discriminator values from mapping or enum."""
+        from generator.schema_resolver import SchemaResolver
+
+        variants = SchemaResolver(self.SPEC).variants('#/components/schemas/AnyOutput')
+
+        assert variants['kind'] == 'oneOf'
+        assert variants['discriminator'] == 'type'
+        assert [v['value'] for v in variants['variants']] == ['s3', 'kafka']
+
+
+def _categorize_by_loop(endpoint):
+    """Reference categorization: match PRODUCT_PATTERNS one by one."""
+    import re
+    from generator.openapi_parser import OpenAPIParser
+
+    for product, patterns in OpenAPIParser.PRODUCT_PATTERNS.items():
+        for pattern in patterns:
+            if re.match(pattern, endpoint):
+                return product
+    return 'core'
+
+
+@pytest.mark.unit
+@pytest.mark.generator
+@pytest.mark.parametrize('endpoint,product', [
+    ('/system/inputs', 'stream'),
+    ('/system/inputs/{id}', 'stream'),
+    ('/system/inputsx', 'stream'),
+    ('/system/outputs/{id}/status', 'stream'),
+    ('/system/input', 'core'),
+    ('/system/users', 'core'),
+    ('/system/', 'core'),
+    ('/system', 'core'),
+    ('/systems/inputs', 'core'),
+    ('/edge/processes', 'edge'),
+    ('/edge', 'core'),
+    ('/search/jobs', 'search'),
+    ('/jobs', 'core'),
+    ('/products/lake/lakes', 'lake'),
+    ('/products/search', 'core'),
+    ('/pipelines', 'stream'),
+    ('/packs/{id}', 'stream'),
+    ('/p/{pack}/pipelines', 'stream'),
+    ('/lib', 'core'),
+    ('/healthz', 'core'),
+    ('/unknown', 'core'),
+])
+def test_compiled_categorizer(endpoint, product):
+    """Test the compiled categorizer against the pattern-by-pattern semantics."""
+    from generator.openapi_parser import OpenAPIParser
+
+    parser = OpenAPIParser('unused.yml')
+    assert _categorize_by_loop(endpoint) == product
+    assert parser.categorize_endpoint(endpoint) == product
+    # Cached result
+    assert parser.categorize_endpoint(endpoint) == product
+
+
+@pytest.mark.unit
+@pytest.mark.generator
+def test_compiled_categorizer_spec_paths(openapi_spec_path):
+    """Test the compiled categorizer on every path of the spec."""
+    from generator.openapi_parser import OpenAPIParser
+
+    if not openapi_spec_path.exists():
+        pytest.skip('OpenAPI spec not available')
+    parser = OpenAPIParser(str(openapi_spec_path))
+    parser.load()
+
+    for endpoint in parser.get_endpoints():
+        assert parser.categorize_endpoint(endpoint) == _categorize_by_loop(endpoint), endpoint
+
+
+@pytest.mark.unit
+@pytest.mark.generator
+def test_benchmark_synthetic_spec(tmp_path, monkeypatch):
+    """Test the benchmark's synthetic spec exercises the generator and regressions are reported."""
+    from generator.bench import synthetic_spec, write_spec, compare
+    from generator.openapi_parser import OpenAPIParser
+    from generator.crud_detector import CRUDDetector
+
+    spec = synthetic_spec(paths=40, schemas=30, ref_depth=5, enum_size=50)
+    assert len(spec['paths']) == 40
+    assert len(spec['components']['schemas']) == 30
+    assert synthetic_spec(paths=40, schemas=30, ref_depth=5, enum_size=50) == spec
+
+    monkeypatch.setenv('CRIBL_SPEC_CACHE_DIR', str(tmp_path / 'cache'))
+    parser = OpenAPIParser(str(write_spec(tmp_path / 'spec.yml', paths=40, schemas=30, ref_depth=5)))
+    parser.load()
+    resources = CRUDDetector(parser).detect_resources()
+    assert sum(len(found) for found in resources.values()) == 20
+    assert all(resources[product] for product in ('core', 'stream', 'edge', 'search', 'lake'))
+
+    baseline = {'load': {'wall_s': 1.0, 'peak_rss_mb': 100.0}}
+    assert compare({'load': {'wall_s': 1.2, 'peak_rss_mb': 110.0}}, baseline) == []
+    assert len(compare({'load': {'wall_s': 2.0, 'peak_rss_mb': 200.0}}, baseline)) == 2
+
+
+@pytest.mark.unit
+@pytest.mark.generator
+def test_regenerate_since_previous_spec(tmp_path, monkeypatch, capsys):
+    """Test --since only regenerates modules affected by the spec diff, transitive $refs included."""
+    from generator.spec_diff import SpecDiff
+
+    def body(schema):
+        return {'content': {'application/json': {'schema': {'$ref': f'#/components/schemas/{schema}'}}}}
+
+    def spec(version, address, roles=True, teams=False):
+        paths = {
+            '/system/users': {'get': {'summary': 'List users'},
+                              'post': {'summary': 'Create user', 'requestBody': body('User')}},
+            '/system/users/{id}': {'get': {'summary': 'Get user'}, 'delete': {'summary': 'Delete user'}},
+        }
+        if roles:
+            paths['/system/roles'] = {'get': {'summary': 'List roles'}}
+        if teams:
+            paths['/system/teams'] = {'get': {'summary': 'List teams'}}
+        return {
+            'info': {'version': version},
+            'paths': paths,
+            'components': {'schemas': {
+                'User': {'allOf': [{'$ref': '#/components/schemas/Contact'},
+                                   {'type': 'object', 'properties': {'id': {'type': 'string'}}}]},
+                'Contact': {'allOf': [{'$ref': '#/components/schemas/Address'}]},
+                'Address': {'type': 'object', 'properties': address},
+            }},
+        }
+
+    old_file = tmp_path / 'old.yml'
+    new_file = tmp_path / 'new.yml'
+    old_file.write_text(yaml.safe_dump(spec('4.14.0', {'city': {'type': 'string'}})))
+    new_file.write_text(yaml.safe_dump(spec(
+        '4.15.0', {'city': {'type': 'string'}, 'zip': {'type': 'string'}}, roles=False, teams=True)))
+    monkeypatch.setenv('CRIBL_SPEC_CACHE_DIR', str(tmp_path / 'cache'))
+    # Declarative tests are generated relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'tests' / 'integration').mkdir(parents=True)
+    out = tmp_path / 'out'
+    modules_dir = out / 'core' / 'plugins' / 'modules'
+
+    diff = SpecDiff(yaml.safe_load(old_file.read_text()), yaml.safe_load(new_file.read_text()))
+    assert diff.added == [('/system/teams', 'get')]
+    assert diff.removed == [('/system/roles', 'get')]
+    assert diff.changed == [('/system/users', 'post')]
+    assert diff.changed_refs == ['#/components/schemas/Address']
+
+    generator = CriblModuleGenerator(str(old_file), str(out))
+    generator.generate_imperative_modules(jobs=1)
+    generator.generate_declarative_modules('core')
+    generator.finish('core')
+    mtimes = dict((path.name, path.stat().st_mtime_ns) for path in modules_dir.glob('*.py'))
+
+    generator = CriblModuleGenerator(str(new_file), str(out))
+    generator.diff_since(str(old_file))
+    generator.generate_imperative_modules(jobs=1)
+    generator.generate_declarative_modules('core')
+    generator.finish('core')
+    generator.print_changelog()
+
+    assert generator.changes['imperative'] == {
+        'added': [('core', 'system_teams_get')],
+        'removed': [('core', 'system_roles_get')],
+        'changed': [('core', 'system_users_post')],
+    }
+    assert generator.changes['declarative']['changed'] == [('core', 'user')]
+    assert 'zip' in (modules_dir / 'system_users_post.py').read_text()
+    assert (modules_dir / 'system_users_get.py').stat().st_mtime_ns == mtimes['system_users_get.py']
+    assert (modules_dir / 'system_teams_get.py').exists()
+    assert not (modules_dir / 'system_roles_get.py').exists()
+    assert (tmp_path / 'tests' / 'unit' / 'test_core_declarative.py').exists()
+    output = capsys.readouterr().out
+    assert '+ cribl.core.system_teams_get' in output
+    assert '~ cribl.core.user (declarative)' in output
+
+
+@pytest.mark.unit
+@pytest.mark.generator
+def test_regenerate_unchanged_spec_writes_nothing(tmp_path, monkeypatch):
+    """Test a second run over the same spec leaves every file, meta/runtime.yml included, untouched."""
+    spec_file = tmp_path / 'spec.yml'
+    spec_file.write_text(yaml.safe_dump({'info': {'version': '4.14.0'}, 'paths': {
+        '/system/users': {'get': {'summary': 'List users'}, 'post': {'summary': 'Create user'}},
+        '/system/users/{id}': {'get': {'summary': 'Get user'}, 'delete': {'summary': 'Delete user'}},
+    }}))
+    monkeypatch.setenv('CRIBL_SPEC_CACHE_DIR', str(tmp_path / 'cache'))
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'tests' / 'integration').mkdir(parents=True)
+    out = tmp_path / 'out'
+
+    for _ in range(2):
+        generator = CriblModuleGenerator(str(spec_file), str(out))
+        generator.generate_imperative_modules(jobs=1)
+        generator.generate_declarative_modules('core')
+        generator.finish('core')
+
+    assert generator.files.summary()['changed'] == 0
+    assert generator.files.summary()['added'] == 0
+    runtime = yaml.safe_load((out / 'core' / 'meta' / 'runtime.yml').read_text())
+    assert runtime['action_groups'] == {'cribl': ['user']}
+
+
+@pytest.mark.unit
+@pytest.mark.generator
+def test_nested_argspec_validation():
+    """Test declarative argspecs carry nested options, elements, choices and required flags."""
+    arg_spec = pytest.importorskip('ansible.module_utils.common.arg_spec')
+    from generator.crud_detector import CRUDDetector
+    from generator.argspec import MAX_OPTION_DEPTH
+
+    def nested(depth):
+        if depth == 0:
+            return {'type': 'string'}
+        return {'type': 'object', 'properties': {'next': nested(depth - 1)}}
+
+    schema = {
+        'mode': {'type': 'string', 'enum': ['push', 'pull']},
+        'tls': {'type': 'object', 'required': ['certPath', 'minVersion'], 'properties': {
+            'certPath': {'type': 'string'},
+            'minVersion': {'type': 'string', 'default': 'TLSv1.2'},
+            'disabled': {'type': 'boolean'},
+        }},
+        'rules': {'type': 'array', 'items': {'type': 'object', 'required': ['name'], 'properties': {
+            'name': {'type': 'string'}, 'weight': {'type': 'integer'}}}},
+        'metadata': {'type': 'object', 'additionalProperties': True, 'properties': {'a': {'type': 'string'}}},
+        'labels': {'type': 'object', 'additionalProperties': {}, 'properties': {'a': {'type': 'string'}}},
+        'closed': {'type': 'object', 'additionalProperties': False, 'properties': {'a': {'type': 'string'}}},
+        'deep': nested(MAX_OPTION_DEPTH + 2),
+    }
+    detector = CRUDDetector(Mock())
+    params = detector.get_resource_params({'resource_name': 'thing', 'schemas': {'create': schema}})
+
+    namespace = {}
+    exec('argument_spec = dict(\n' + detector.format_params_for_argspec(params) + '\n)', namespace)
+    argument_spec = namespace['argument_spec']
+    assert argument_spec['mode'] == dict(type='str', required=False, choices=['push', 'pull'])
+    assert argument_spec['tls']['options']['certPath'] == dict(type='str', required=True)
+    assert argument_spec['tls']['options']['minVersion'] == dict(type='str')
+    assert argument_spec['rules']['elements'] == 'dict'
+    assert argument_spec['metadata'] == dict(type='dict', required=False)
+    assert argument_spec['labels'] == dict(type='dict', required=False)
+    assert argument_spec['closed']['options'] == {'a': dict(type='str')}
+    level = argument_spec['deep']
+    for _ in range(MAX_OPTION_DEPTH):
+        level = level['options']['next']
+    assert level == dict(type='dict')
+
+    docs = yaml.safe_load(detector.format_params_for_module(params))
+    assert docs['tls']['suboptions']['certPath']['required'] is True
+    assert docs['mode']['choices'] == ['push', 'pull']
+
+    validator = arg_spec.ArgumentSpecValidator(argument_spec)
+    result = validator.validate({'tls': {'certPath': '/x'}, 'rules': [{'name': 'a', 'weight': 1}],
+                                 'labels': {'a': 'x', 'extra': 'y'}})
+    assert not result.error_messages, result.error_messages
+    for bad in ({'mode': 'sideways'}, {'tls': {'disabled': True}}, {'tls': {'certPath': '/x', 'typo': 1}},
+                {'rules': [{'weight': 1}]}):
+        assert validator.validate(bad).error_messages, bad
@@ -0,0 +1,105 @@
+"""
+Unit tests for the Cribl inventory plugin.
+"""
+
+from unittest.mock import Mock
+import sys
+import os
+
+# Add the collection to the Python path (use build directory where modules are generated)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../build'))
+
+from ansible.inventory.data import InventoryData
+
+from ansible_collections.cribl.core.plugins.inventory.cribl import (
+    InventoryModule,
+    discover,
+    list_workers
+)
+
+
+GROUPS = {'count': 3, 'items': [
+    {'id': 'default', 'configVersion': 'abc', 'tags': 'prod, eu'},
+    {'id': 'edge_linux', 'isFleet': True, 'tags': ['prod']},
+    {'id': 'staging'},
+]}
+
+
+def _worker(group, n):
+    return {'id': f'{group}-{n}', 'group': group, 'status': 'healthy',
+            'info': {'hostname': f'{group}-{n}.example.com'}}
+
+
+def _client(workers_per_group=3):
+    def get(endpoint, params=None):
+        if endpoint == '/master/groups':
+            return GROUPS
+        group = params['filterExp'].split("'")[1]
+        workers = [_worker(group, n) for n in range(workers_per_group)]
+        page = workers[params['offset']:params['offset'] + params['limit']]
+        return {'count': len(workers), 'items': page}
+
+    client = Mock()
+    client.get.side_effect = get
+    return client
+
+
+class TestDiscovery:
+    """Test listing groups and worker nodes."""
+
+    def test_list_workers_pages(self):
+        """Test worker nodes are listed page by page until the count is reached."""
+        client = _client(workers_per_group=5)
+
+        workers = list_workers(client, 'default', page_size=2)
+
+        assert [w['id'] for w in workers] == [f'default-{n}' for n in range(5)]
+        assert client.get.call_count == 3
+
+    def test_filters(self):
+        """Test fleets and unlisted groups can be left out."""
+        client = _client()
+
+        result = discover(client, worker_groups=['default', 'edge_linux'], include_fleets=False)
+
+        assert [g['id'] for g in result['groups']] == ['default']
+        assert list(result['workers']) == ['default']
+
+
+class TestInventoryModule:
+    """Test building the inventory."""
+
+    def _plugin(self, **options):
+        plugin = InventoryModule()
+        plugin.inventory = InventoryData()
+        defaults = {'strict': False, 'compose': {}, 'groups': {}, 'keyed_groups': []}
+        defaults.update(options)
+        plugin.get_option = lambda name: defaults.get(name)
+        return plugin
+
+    def test_populate(self):
+        """Test groups, fleets, tags and host variables are added."""
+        plugin = self._plugin()
+
+        plugin._populate(discover(_client(workers_per_group=1)))
+        inventory = plugin.inventory
+
+        assert sorted(g.name for g in inventory.groups['cribl_groups'].child_groups) == [
+            'cribl_group_default', 'cribl_group_staging']
+        assert [g.name for g in inventory.groups['cribl_fleets'].child_groups] == ['cribl_fleet_edge_linux']
+        assert sorted(h.name for h in inventory.groups['cribl_tag_prod'].get_hosts()) == [
+            'default-0.example.com', 'edge_linux-0.example.com']
+        assert inventory.groups['cribl_group_default'].vars['cribl_config_version'] == 'abc'
+        host = inventory.get_host('default-0.example.com')
+        assert host.vars['cribl_worker_group'] == 'default'
+        assert host.vars['cribl_status'] == 'healthy'
+
+    def test_verify_file(self, tmp_path):
+        """Test only *cribl.yml inventory files are accepted."""
+        good = tmp_path / 'prod.cribl.yml'
+        bad = tmp_path / 'hosts.yml'
+        good.write_text('plugin: cribl.core.cribl\n')
+        bad.write_text('all: {}\n')
+
+        assert InventoryModule().verify_file(str(good)) is True
+        assert InventoryModule().verify_file(str(bad)) is False
@@ -0,0 +1,103 @@
+"""
+Unit tests for the cribl_config lookup plugin.
+"""
+
+import pytest
+from unittest.mock import Mock
+import sys
+import os
+
+# Add the collection to the Python path (use build directory where modules are generated)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../build'))
+
+from ansible.errors import AnsibleError
+
+from ansible_collections.cribl.core.plugins.lookup import cribl_config
+from ansible_collections.cribl.core.plugins.lookup.cribl_config import (
+    LookupModule,
+    resolve_term
+)
+
+
+OPTIONS = {
+    'session': None, 'base_url': 'https://cribl.example.com', 'username': None, 'password': None,
+    'token': 't', 'validate_certs': False, 'timeout': 30, 'worker_group': 'default',
+    'query': None, 'default': None, 'cache_ttl': 0, 'cache_dir': None,
+}
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    cribl_config._RESULTS.clear()
+    yield
+    cribl_config._RESULTS.clear()
+
+
+def _lookup(client, **options):
+    lookup = LookupModule()
+    values = dict(OPTIONS, **options)
+    lookup.set_options = Mock()
+    lookup.get_option = lambda name: values[name]
+    lookup._client = lambda params: client
+    return lookup
+
+
+def _client():
+    client = Mock()
+    client.get_or_none.side_effect = lambda endpoint: {
+        '/m/default/system/outputs/s3': {'count': 1, 'items': [{'id': 's3', 'bucket': 'logs'}]},
+        '/m/default/system/outputs': {'count': 2, 'items': [{'id': 's3'}, {'id': 'devnull'}]},
+    }.get(endpoint)
+    return client
+
+
+class TestResolveTerm:
+    """Test mapping lookup terms to endpoints."""
+
+    def test_terms(self):
+        """Test type/id, type and raw endpoint terms."""
+        assert resolve_term('output/s3', 'default') == ('/m/default/system/outputs/s3', True)
+        assert resolve_term('output') == ('/system/outputs', False)
+        assert resolve_term('/system/settings') == ('/system/settings', True)
+
+    def test_unknown_type(self):
+        """Test unknown resource types are rejected."""
+        with pytest.raises(AnsibleError, match="Unknown Cribl resource type"):
+            resolve_term('widget/x')
+
+
+class TestLookup:
+    """Test reading and memoizing resources."""
+
+    def test_memoized(self):
+        """Test a resource is read once however often it is looked up."""
+        client = _client()
+
+        first = _lookup(client).run(['output/s3', 'output'])
+        second = _lookup(client).run(['output/s3'])
+
+        assert first == [{'id': 's3', 'bucket': 'logs'}, [{'id': 's3'}, {'id': 'devnull'}]]
+        assert second == [first[0]]
+        assert client.get_or_none.call_count == 2
+
+    def test_missing_returns_default(self):
+        """Test missing resources return the default value."""
+        assert _lookup(_client(), default='none').run(['output/splunk']) == ['none']
+
+    def test_disk_cache(self, tmp_path):
+        """Test results are reused from disk within the TTL."""
+        client = _client()
+        _lookup(client, cache_ttl=60, cache_dir=str(tmp_path)).run(['output/s3'])
+        cribl_config._RESULTS.clear()
+
+        result = _lookup(client, cache_ttl=60, cache_dir=str(tmp_path)).run(['output/s3'])
+
+        assert result == [{'id': 's3', 'bucket': 'logs'}]
+        assert client.get_or_none.call_count == 1
+        assert len(list(tmp_path.iterdir())) == 1
+
+    def test_query(self):
+        """Test a JMESPath query projects the resource."""
+        pytest.importorskip('jmespath')
+
+        assert _lookup(_client(), query='bucket').run(['output/s3']) == ['logs']
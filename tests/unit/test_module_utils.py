@@ -134,6 +134,70 @@ class TestCriblAPIClient:
             assert result["id"] == "new_user"
             assert result["email"] == "test@example.com"
 
+    def test_get_or_none_not_found(self):
+        """Test get_or_none returns None on 404 without raising."""
+        client = CriblAPIClient(
+            base_url="https://test.cribl.com",
+            token="test_token"
+        )
+        
+        with patch.object(client.http_session, 'request') as mock_request:
+            mock_response = Mock()
+            mock_response.status_code = 404
+            mock_request.return_value = mock_response
+            
+            assert client.get_or_none("/system/outputs/missing") is None
+            assert not mock_response.json.called
+
+    def test_requests_profiled(self, tmp_path, monkeypatch):
+        """Test request metrics are appended to the profile file when enabled."""
+        import json
+        
+        profile = tmp_path / 'profile.jsonl'
+        monkeypatch.setenv('CRIBL_API_PROFILE', str(profile))
+        client = CriblAPIClient(
+            base_url="https://test.cribl.com",
+            token="test_token"
+        )
+        
+        with patch.object(client.http_session, 'request') as mock_request:
+            unauthorized = Mock(status_code=401, content=b'')
+            ok = Mock(status_code=200, content=b'{"count": 0}')
+            ok.json.return_value = {'count': 0}
+            mock_request.side_effect = [unauthorized, ok]
+            with patch.object(client, '_refresh_token'):
+                client.post("/system/outputs", data={'id': 's3'})
+        
+        records = [json.loads(line) for line in profile.read_text().splitlines()]
+        assert len(records) == 1
+        assert records[0]['method'] == 'POST'
+        assert records[0]['endpoint'] == '/system/outputs'
+        assert records[0]['status'] == 200
+        assert records[0]['bytes_out'] == len('{"id": "s3"}')
+        assert records[0]['bytes_in'] == 12
+        assert records[0]['auth_retry'] is True
+
+    def test_error_carries_status_endpoint_and_body(self):
+        """Test API errors expose the status code, endpoint and parsed body."""
+        client = CriblAPIClient(
+            base_url="https://test.cribl.com",
+            token="test_token"
+        )
+        
+        with patch.object(client.http_session, 'request') as mock_request:
+            mock_response = Mock()
+            mock_response.status_code = 409
+            mock_response.text = '{"message": "Entity with id s3 already exists"}'
+            mock_response.json.return_value = {"message": "Entity with id s3 already exists"}
+            mock_request.return_value = mock_response
+            
+            with pytest.raises(CriblAPIError) as exc_info:
+                client.post("/system/outputs", data={"id": "s3"})
+            
+            assert exc_info.value.status_code == 409
+            assert exc_info.value.endpoint == "/system/outputs"
+            assert exc_info.value.body == {"message": "Entity with id s3 already exists"}
+
     def test_delete_request(self):
         """Test DELETE request."""
         client = CriblAPIClient(
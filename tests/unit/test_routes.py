@@ -0,0 +1,126 @@
+"""
+Unit tests for route table entry management.
+"""
+
+import pytest
+from unittest.mock import Mock
+import sys
+import os
+
+# Add the collection to the Python path (use build directory where modules are generated)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../build'))
+
+from ansible_collections.cribl.stream.plugins.module_utils.cribl_routes import (
+    RouteTable,
+    merge_route_entries
+)
+from ansible_collections.cribl.stream.plugins.module_utils.cribl_api import (
+    CriblAPIError
+)
+
+
+ROUTES = [
+    {'id': 'a1', 'name': 'metrics', 'filter': 'true', 'output': 'prom'},
+    {'id': 'a2', 'name': 'default', 'filter': 'true', 'output': 'default', 'final': True},
+]
+
+
+def _names(routes):
+    return [r['name'] for r in routes]
+
+
+class TestMergeRouteEntries:
+    """Test merging entries into the routes array."""
+
+    def test_no_change(self):
+        """Test entries matching the table produce no changes."""
+        routes, changes = merge_route_entries(ROUTES, [{'name': 'metrics', 'output': 'prom'}])
+
+        assert routes == ROUTES
+        assert not any(changes.values())
+
+    def test_update_keeps_position_and_id(self):
+        """Test updated routes keep their place and server-assigned ID."""
+        routes, changes = merge_route_entries(ROUTES, [{'name': 'metrics', 'output': 's3'}])
+
+        assert routes[0] == {'id': 'a1', 'name': 'metrics', 'filter': 'true', 'output': 's3'}
+        assert changes['updated'] == ['metrics']
+        assert changes['moved'] == []
+
+    def test_position_constraints(self):
+        """Test first/before/after place new and existing routes."""
+        routes, changes = merge_route_entries(ROUTES, [
+            {'name': 'archive', 'output': 's3', 'before': 'default'},
+            {'name': 'drop', 'output': 'devnull', 'position': 'first'},
+            {'name': 'metrics', 'after': 'archive'},
+        ])
+
+        assert _names(routes) == ['drop', 'archive', 'metrics', 'default']
+        assert changes['added'] == ['drop', 'archive']
+
+    def test_absent_and_purge(self):
+        """Test entries can be removed individually or by purging unlisted routes."""
+        routes, changes = merge_route_entries(ROUTES, [{'name': 'metrics', 'state': 'absent'}])
+        assert _names(routes) == ['default']
+        assert changes['removed'] == ['metrics']
+
+        routes, changes = merge_route_entries(ROUTES, [{'name': 'default'}], purge=True)
+        assert _names(routes) == ['default']
+
+    def test_unknown_anchor(self):
+        """Test positioning relative to a missing route is rejected."""
+        with pytest.raises(CriblAPIError, match="unknown route 'nope'"):
+            merge_route_entries(ROUTES, [{'name': 'x', 'before': 'nope'}])
+
+
+class TestRouteTable:
+    """Test applying entries with one read and one write."""
+
+    def _module(self, check_mode=False):
+        module = Mock()
+        module.check_mode = check_mode
+        return module
+
+    def test_single_write_for_many_entries(self):
+        """Test all entries are applied with one PATCH of the whole table."""
+        client = Mock()
+        client.get_or_none.return_value = {'id': 'default', 'routes': ROUTES}
+
+        result = RouteTable(self._module(), client, worker_group='default').apply([
+            {'name': 'archive', 'output': 's3', 'position': 'first'},
+            {'name': 'metrics', 'output': 's3'},
+        ])
+
+        assert result['changed'] is True
+        assert client.get_or_none.call_count == 1
+        client.patch.assert_called_once()
+        endpoint = client.patch.call_args.args[0]
+        table = client.patch.call_args.kwargs['data']
+        assert endpoint == '/m/default/routes/default'
+        assert _names(table['routes']) == ['archive', 'metrics', 'default']
+
+    def test_no_write_when_unchanged(self):
+        """Test nothing is written when the table already matches."""
+        client = Mock()
+        client.get_or_none.return_value = {'id': 'default', 'routes': ROUTES}
+
+        result = RouteTable(self._module(), client).apply([{'name': 'default', 'final': True}])
+
+        assert result['changed'] is False
+        assert not client.patch.called
+
+    def test_concurrent_change_remerged(self):
+        """Test entries are merged again into a fresh table when the write conflicts."""
+        changed = ROUTES + [{'id': 'a3', 'name': 'other', 'output': 'x'}]
+        client = Mock()
+        client.get_or_none.side_effect = [
+            {'id': 'default', 'routes': ROUTES},
+            {'id': 'default', 'routes': changed},
+        ]
+        client.patch.side_effect = [CriblAPIError("PATCH failed: 409", status_code=409), {}]
+
+        RouteTable(self._module(), client).apply([{'name': 'archive', 'output': 's3', 'position': 'first'}])
+
+        assert client.get_or_none.call_count == 2
+        assert client.patch.call_count == 2
+        assert _names(client.patch.call_args.kwargs['data']['routes']) == ['archive', 'metrics', 'default', 'other']
@@ -0,0 +1,99 @@
+"""
+Unit tests for the generic runtime of the imperative modules.
+"""
+
+import pytest
+from unittest.mock import Mock
+import sys
+import os
+
+# Add the collection to the Python path (use build directory where modules are generated)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../build'))
+
+from ansible_collections.cribl.core.plugins.module_utils.cribl_api import CriblAPIError
+from ansible_collections.cribl.core.plugins.module_utils.cribl_runtime import (
+    COMMON_ARGS,
+    argument_spec,
+    build_endpoint,
+    module_args,
+    run_module
+)
+
+
+SPEC = {
+    'endpoint': '/system/inputs/{id}',
+    'method': 'PATCH',
+    'params': {
+        'id': dict(type='str', required=True, location='path'),
+        'type': dict(type='str', required=False, location='body'),
+        'conf': dict(type='dict', required=False, location='body'),
+    },
+}
+
+
+def _module(check_mode=False, **params):
+    module = Mock()
+    module.check_mode = check_mode
+    module.params = dict((name, None) for name in argument_spec(SPEC))
+    module.params.update(validate_certs=False, timeout=30, state='present')
+    module.params.update(params)
+    return module
+
+
+class TestModuleRuntime:
+    """Test argument spec construction and the API call of a module spec."""
+
+    def test_module_args(self):
+        args = module_args(SPEC)
+
+        assert set(COMMON_ARGS) < set(args['argument_spec'])
+        assert args['argument_spec']['id'] == dict(type='str', required=True)
+        assert args['supports_check_mode'] is True
+
+    def test_build_endpoint(self):
+        assert build_endpoint(SPEC, {'id': 'in_syslog'}) == '/system/inputs/in_syslog'
+        assert build_endpoint(SPEC, {'id': 'in_syslog', 'worker_group': 'default'}) == \
+            '/m/default/system/inputs/in_syslog'
+
+    def test_build_endpoint_missing_path_param(self):
+        with pytest.raises(CriblAPIError, match='Missing path parameter: id'):
+            build_endpoint(SPEC, {'id': None})
+
+    def test_run_module(self):
+        client = Mock()
+        client.patch.return_value = {'id': 'in_syslog'}
+        module = _module(id='in_syslog', type='syslog', worker_group='default')
+
+        run_module(module, SPEC, client=client)
+
+        client.patch.assert_called_once_with(
+            '/m/default/system/inputs/in_syslog', data={'type': 'syslog'})
+        module.exit_json.assert_called_once_with(
+            changed=True,
+            msg='PATCH request to /m/default/system/inputs/in_syslog successful',
+            response={'id': 'in_syslog'}
+        )
+
+    def test_get_is_not_a_change(self):
+        client = Mock()
+        client.get.return_value = {'items': []}
+        spec = {'endpoint': '/system/inputs', 'method': 'GET',
+                'params': {'limit': dict(type='int', required=False, location='query')}}
+        module = _module(limit=10)
+
+        run_module(module, spec, client=client)
+
+        client.get.assert_called_once_with('/system/inputs', params={'limit': 10})
+        assert module.exit_json.call_args[1]['changed'] is False
+
+    def test_check_mode(self):
+        client = Mock()
+        module = _module(check_mode=True, id='in_syslog')
+        # exit_json ends the module
+        module.exit_json.side_effect = SystemExit
+
+        with pytest.raises(SystemExit):
+            run_module(module, SPEC, client=client)
+
+        client.patch.assert_not_called()
+        assert module.exit_json.call_args[1]['endpoint'] == '/system/inputs/in_syslog'
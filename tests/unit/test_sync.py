@@ -0,0 +1,157 @@
+"""
+Unit tests for incremental desired-state synchronization.
+"""
+
+import pytest
+from unittest.mock import Mock
+import sys
+import os
+
+# Add the collection to the Python path (use build directory where modules are generated)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../build'))
+
+from ansible_collections.cribl.core.plugins.module_utils.cribl_sync import (
+    ConfigSync,
+    scan_tree
+)
+from ansible_collections.cribl.core.plugins.module_utils.cribl_state import (
+    CriblStateStore
+)
+from ansible_collections.cribl.core.plugins.module_utils.cribl_api import (
+    CriblAPIError
+)
+
+
+def _write(root, rel_path, text):
+    path = root / rel_path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+
+
+def _client(version='v1'):
+    client = Mock()
+    client.base_url = 'https://cribl.example.com'
+    client.get.return_value = {'items': [{'id': 'default', 'configVersion': version}]}
+    client.get_or_none.return_value = None
+    client.post.return_value = {}
+    return client
+
+
+def _module(check_mode=False):
+    module = Mock()
+    module.check_mode = check_mode
+    return module
+
+
+class TestConfigSync:
+    """Test incremental synchronization of a tree."""
+
+    @pytest.fixture
+    def tree(self, tmp_path):
+        root = tmp_path / 'tree'
+        _write(root, 'default/output/s3.yml', 'type: s3\nbucket: logs\n')
+        _write(root, 'default/output/devnull.yml', 'type: devnull\n')
+        return root
+
+    def _sync(self, client, root, state_path, **kwargs):
+        store = CriblStateStore(str(state_path))
+        result = ConfigSync(_module(), client, str(root), store, **kwargs).sync()
+        store.save()
+        return result
+
+    def test_scan_tree(self, tree):
+        """Test files are hashed per group without being parsed."""
+        files = scan_tree(str(tree))['default']
+        assert sorted(files) == ['output/devnull.yml', 'output/s3.yml']
+        assert files['output/s3.yml'][0] == 'output'
+
+    def test_unchanged_tree_not_reconciled(self, tree, tmp_path):
+        """Test a second run without changes makes no resource requests."""
+        state = tmp_path / 'state.json'
+        first = self._sync(_client(), tree, state)
+        assert first['groups'][0]['reconciled'] == 2
+        assert first['changed'] is True
+
+        client = _client()
+        second = self._sync(client, tree, state)
+
+        assert second['changed'] is False
+        assert second['groups'][0]['skipped'] == 2
+        assert not client.get_or_none.called
+        client.get.assert_called_once_with('/master/groups/default')
+
+    def test_only_changed_file_reconciled(self, tree, tmp_path):
+        """Test only the edited file is applied."""
+        state = tmp_path / 'state.json'
+        self._sync(_client(), tree, state)
+        _write(tree, 'default/output/s3.yml', 'type: s3\nbucket: archive\n')
+
+        client = _client()
+        result = self._sync(client, tree, state)
+
+        assert [(r['type'], r['id']) for r in result['results']] == [('output', 's3')]
+        client.get_or_none.assert_called_once_with('/m/default/system/outputs/s3')
+
+    def test_moved_group_reconciles_every_file(self, tree, tmp_path):
+        """Test a moved config version reconciles the whole group."""
+        state = tmp_path / 'state.json'
+        self._sync(_client('v1'), tree, state)
+
+        result = self._sync(_client('v2'), tree, state)
+
+        assert result['groups'][0]['server_changed'] is True
+        assert result['groups'][0]['reconciled'] == 2
+
+    def test_rebase_keeps_manifest(self, tree, tmp_path):
+        """Test a commit rebased in the state store does not force a full run."""
+        state = tmp_path / 'state.json'
+        self._sync(_client('v1'), tree, state)
+        store = CriblStateStore(str(state))
+        store.rebase(_client(), 'default', 'v1', 'v2')
+        store.save()
+
+        result = self._sync(_client('v2'), tree, state)
+
+        assert result['groups'][0]['reconciled'] == 0
+
+    def test_prune_deletes_removed_files(self, tree, tmp_path):
+        """Test resources of removed files are deleted with prune."""
+        state = tmp_path / 'state.json'
+        self._sync(_client(), tree, state)
+        (tree / 'default' / 'output' / 'devnull.yml').unlink()
+
+        client = _client()
+        client.get_or_none.return_value = {'id': 'devnull'}
+        result = self._sync(client, tree, state, prune=True)
+
+        assert result['groups'][0]['removed'] == 1
+        client.delete.assert_called_once_with('/m/default/system/outputs/devnull')
+        assert CriblStateStore(str(state)).sync_manifest(client, 'default', str(tree))['files'].keys() == {
+            'output/s3.yml'}
+
+    def test_failed_resource_retried(self, tree, tmp_path):
+        """Test a file whose resource failed is reconciled again by the next run."""
+        state = tmp_path / 'state.json'
+        client = _client()
+        client.post.side_effect = [CriblAPIError('POST failed: 500'), {}]
+        first = self._sync(client, tree, state)
+        assert first['failed'] is True
+
+        result = self._sync(_client(), tree, state)
+
+        assert result['groups'][0]['reconciled'] == 1
+
+    def test_full_scope_reconciles_global(self, tmp_path):
+        """Test full_scopes reconciles unchanged global files while other groups stay incremental."""
+        root = tmp_path / 'tree'
+        _write(root, '_global/secret/token.yml', 'value: x\n')
+        _write(root, 'default/output/s3.yml', 'type: s3\n')
+        state = tmp_path / 'state.json'
+        self._sync(_client(), root, state)
+
+        result = self._sync(_client(), root, state, full_scopes=[None])
+
+        groups = dict((g['worker_group'], g) for g in result['groups'])
+        assert groups[None]['reconciled'] == 1
+        assert groups[None]['server_changed'] is False
+        assert groups['default']['reconciled'] == 0